@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Upstream Admission Control
+
+Bounded concurrency + queue deadline for upstream-bound work.
+Requests that cannot be admitted before the deadline are shed early
+so cache-served traffic keeps its latency during cold-miss storms.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+
+class AdmissionRejected(Exception):
+    """Raised when upstream work is shed instead of queued"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionSlot:
+    """Held upstream slot; only time after start() counts as service time"""
+
+    def __init__(self):
+        self.started: Optional[float] = None
+
+    def start(self) -> None:
+        """Mark the start of the upstream call"""
+        self.started = time.perf_counter()
+
+
+class AdmissionController:
+    """Semaphore-based admission with queue depth limit and wait deadline"""
+
+    def __init__(self, max_concurrency: int, queue_timeout: float, max_queue: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.queue_timeout = queue_timeout
+        self.max_queue = max(0, max_queue)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # Live gauges
+        self.in_flight = 0
+        self.queue_depth = 0
+        self.peak_queue_depth = 0
+
+        # Counters
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_deadline = 0
+        self.shed_timeout = 0
+
+        # EWMA of upstream service time, seeded with a conservative guess
+        self._avg_service_time = 0.5
+
+    @property
+    def shed_total(self) -> int:
+        return self.shed_queue_full + self.shed_deadline + self.shed_timeout
+
+    def estimated_wait(self) -> float:
+        """Expected queueing delay for a newly arriving request"""
+        ahead = self.in_flight + self.queue_depth - self.max_concurrency
+        if ahead < 0:
+            return 0.0
+        return (ahead + 1) / self.max_concurrency * self._avg_service_time
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait before retrying"""
+        return max(1, math.ceil(self.estimated_wait() + self._avg_service_time))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        return AdmissionRejected(reason, self.retry_after())
+
+    @asynccontextmanager
+    async def admit(self):
+        """
+        Hold an upstream slot for the duration of the block or shed fast.
+
+        Yields an AdmissionSlot. Blocks that call slot.start() feed the
+        service-time average from that point on. Blocks that return without an
+        upstream call, such as a cache re-check hit, leave it untouched, so
+        they do not pull estimated_wait and Retry-After down.
+        """
+        if self.in_flight + self.queue_depth >= self.max_concurrency + self.max_queue:
+            self.shed_queue_full += 1
+            raise self._reject("queue_full")
+
+        if self.estimated_wait() > self.queue_timeout:
+            self.shed_deadline += 1
+            raise self._reject("deadline")
+
+        self.queue_depth += 1
+        self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.shed_timeout += 1
+            raise self._reject("timeout")
+        finally:
+            self.queue_depth -= 1
+
+        self.admitted += 1
+        self.in_flight += 1
+        slot = AdmissionSlot()
+        try:
+            yield slot
+        finally:
+            if slot.started is not None:
+                elapsed = time.perf_counter() - slot.started
+                self._avg_service_time = 0.8 * self._avg_service_time + 0.2 * elapsed
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict:
+        """Snapshot of admission gauges and counters"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queue_timeout_seconds": self.queue_timeout,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "peak_queue_depth": self.peak_queue_depth,
+            "admitted": self.admitted,
+            "shed": {
+                "total": self.shed_total,
+                "queue_full": self.shed_queue_full,
+                "deadline": self.shed_deadline,
+                "timeout": self.shed_timeout,
+            },
+            "avg_upstream_seconds": round(self._avg_service_time, 4),
+            "estimated_wait_seconds": round(self.estimated_wait(), 4),
+        }
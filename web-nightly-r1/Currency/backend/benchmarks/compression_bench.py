@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Compression Level Benchmark
+
+Ratio and compression time per algorithm and level on representative
+Kconvert bodies, used to pick the COMPRESSION_*_LEVEL defaults.
+
+    python benchmarks/compression_bench.py
+
+The defaults sit where a higher level stops buying meaningful ratio for the
+extra time on the rate-table-sized bodies that dominate traffic. That is
+level 1 for all three here, but rerun this after payloads change.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from currency_shared import currency_registry  # noqa: E402
+from compression import BrotliCodec, GzipCodec, ZstdCodec, brotli, zstandard  # noqa: E402
+
+LEVELS = {
+    "zstd": (ZstdCodec, [1, 3, 6, 9]),
+    "br": (BrotliCodec, [1, 4, 6, 9]),
+    "gzip": (GzipCodec, [1, 5, 6, 9]),
+}
+
+
+def payloads():
+    rng = random.Random(3)
+    codes = currency_registry.names()
+    rates = {code: rng.uniform(0.0001, 20000) for code in codes}
+    rates_body = json.dumps({
+        "base_currency": "USD", "conversion_rates": rates, "rates_count": len(rates),
+        "timestamp": time.time(), "processing_time_ms": 0.41, "cache_hit": True,
+        "data_freshness": "live", "snapshot_version": 12,
+    }, separators=(",", ":")).encode()
+    batch_body = json.dumps({
+        "amount": 1250.0, "from_currency": "USD",
+        "conversions": [
+            {"to_currency": code, "exchange_rate": rate, "converted_amount": round(1250.0 * rate, 6)}
+            for code, rate in list(rates.items())[:50]
+        ],
+        "total_conversions": 50, "timestamp": time.time(), "processing_time_ms": 0.9,
+    }, separators=(",", ":")).encode()
+    ndjson_body = "".join(
+        json.dumps({"amount": round(rng.uniform(1, 10000), 2), "converted_EUR": rng.uniform(1, 10000),
+                    "converted_JPY": rng.uniform(100, 1500000)}) + "\n"
+        for _ in range(5000)
+    ).encode()
+    return {"rates (all codes)": rates_body, "batch-convert (50)": batch_body, "file ndjson (5k rows)": ndjson_body}
+
+
+def measure(codec, body: bytes):
+    rounds = max(5, 2_000_000 // len(body))
+    compressed = codec.compress(body)
+    start = time.thread_time()
+    for _ in range(rounds):
+        codec.compress(body)
+    return len(body) / len(compressed), (time.thread_time() - start) / rounds * 1e6
+
+
+def main():
+    available = {"zstd": zstandard is not None, "br": brotli is not None, "gzip": True}
+    for label, body in payloads().items():
+        print(f"\n{label}: {len(body)} bytes")
+        print(f"  {'algorithm':10} {'level':>5} {'ratio':>7} {'us/response':>12} {'saved KB/cpu ms':>16}")
+        for name, (codec_class, levels) in LEVELS.items():
+            if not available[name]:
+                print(f"  {name:10} not installed")
+                continue
+            for level in levels:
+                ratio, micros = measure(codec_class(level), body)
+                saved_per_ms = (len(body) - len(body) / ratio) / 1024 / (micros / 1000)
+                print(f"  {name:10} {level:5d} {ratio:7.2f} {micros:12.1f} {saved_per_ms:16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Fast Path Throughput
+
+Measures requests per second for /api/convert and /api/rates/{base} with the
+raw ASGI fast path and with the FastAPI routes alone.
+
+    python benchmarks/fastpath_bench.py [requests]
+
+That both answer alike is checked by tests/test_fastpath.py. Upstream calls
+go to an in-process stub, so no network or API key is needed.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("JWT_SECRET_KEY", "fastpath-bench-secret-key-0123456789")
+os.environ.setdefault("EXCHANGE_API_KEY", "bench")
+os.environ["FASTPATH_ENABLED"] = "true"
+os.environ["PREWARM_ENABLED"] = "false"
+os.environ["LOOP_LAG_ENABLED"] = "false"
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "1000000000")
+os.environ.pop("REDIS_URL", None)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx  # noqa: E402
+import logging  # noqa: E402
+
+import main_optimized as app_module  # noqa: E402
+
+logging.disable(logging.WARNING)
+
+CLIENT = ("127.0.0.1", 123)
+
+# Verified again after every reset, so both paths skip JWT decoding alike
+BENCH_TOKEN = app_module.create_jwt()
+RATES = {code: 1.0 + index / 7 for index, code in enumerate(app_module.CURRENCIES)}
+RATES["USD"] = 1.0
+
+
+def upstream(request: httpx.Request) -> httpx.Response:
+    base = request.url.path.rsplit("/", 1)[1]
+    rates = {code: value / RATES[base] for code, value in RATES.items()}
+    return httpx.Response(200, json={
+        "result": "success", "base_code": base, "conversion_rates": rates, "time_last_update_unix": 1
+    })
+
+
+def set_fast_path(enabled: bool) -> None:
+    router = app_module.fast_routes
+    if not hasattr(router, "_saved"):
+        router._saved = (dict(router.exact), list(router.prefixes))
+    router.exact, router.prefixes = router._saved if enabled else ({}, [])
+
+
+def reset_state(seed_bases=("USD", "EUR")) -> None:
+    app_module.cache.l1.clear()
+    app_module.cache.l1.hits = app_module.cache.l1.misses = 0
+    app_module.cache_lookups.update(hits=0, misses=0)
+    app_module.popularity.__init__(half_life=app_module.popularity.bases.half_life)
+    app_module.limiter.reset()
+    app_module.cluster.versions.clear()
+    app_module.verified_tokens.__init__(max_entries=app_module.verified_tokens.max_entries)
+    app_module.verify_jwt(BENCH_TOKEN)
+    for base in seed_bases:
+        snapshot = upstream(httpx.Request("GET", f"https://stub/latest/{base}")).json()
+        app_module.cache.set_local(app_module.get_cache_key(base), snapshot, ttl=300)
+
+
+async def throughput(url: str, total: int, concurrency: int) -> float:
+    """Requests per second through the ASGI app alone, without an HTTP client in the loop"""
+    path, _, query = url.partition("?")
+    app = app_module.app
+    
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    
+    async def worker(count: int) -> None:
+        status = []
+        
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+        
+        for _ in range(count):
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+                "query_string": query.encode(), "headers": [(b"host", b"kconvert")],
+                "client": CLIENT, "server": ("kconvert", 80), "state": {},
+            }
+            await app(scope, receive, send)
+        assert set(status) == {200}, status
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(total // concurrency) for _ in range(concurrency)))
+    return (total // concurrency * concurrency) / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    app_module.http_client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+    transport = httpx.ASGITransport(app=app_module.app, client=CLIENT)
+    async with httpx.AsyncClient(transport=transport, base_url="http://kconvert") as client:
+        token = BENCH_TOKEN
+        endpoints = {
+            "convert (pair cached)": f"/api/convert?token={token}&amount=100&from=USD&to=EUR",
+            "convert (base snapshot)": f"/api/convert?token={token}&amount=100&from=EUR&to=JPY",
+            "rates (3 targets)": f"/api/rates/USD?token={token}&targets=EUR,JPY,GBP",
+        }
+        print(f"{'endpoint':<26} {'fastapi rps':>12} {'fast rps':>12} {'gain':>7}")
+        for label, url in endpoints.items():
+            results = []
+            for fast in (False, True):
+                set_fast_path(fast)
+                reset_state()
+                await client.get(f"/api/rates/USD?token={token}&targets=EUR")
+                await throughput(url, 200, 1)
+                results.append(await throughput(url, total, 8))
+            print(f"{label:<26} {results[0]:>12.0f} {results[1]:>12.0f} {results[1] / results[0]:>6.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Fixed-Point Arithmetic Benchmark
+
+Compares float, Decimal and fixed-point conversion on the same random book of
+conversions, for speed and for exactness.
+
+    python benchmarks/fixed_point_bench.py [conversions]
+
+Every path uses the same stored rate (RATE_DIGITS significant digits) and
+rounds half-to-even to the target's minor units. The Decimal result is the
+reference: a mismatch is any conversion whose minor-unit result differs
+from it.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import os
+import random
+import sys
+import time
+from decimal import ROUND_HALF_EVEN, Decimal, localcontext
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from currency_shared import currency_registry  # noqa: E402
+from currency_shared import fixed_point  # noqa: E402
+
+
+def build_book(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    codes = [currency.code for currency in currency_registry.all_currencies()]
+    book = []
+    for _ in range(count):
+        from_code, to_code = rng.choice(codes), rng.choice(codes)
+        from_minor, to_minor = fixed_point.minor_units(from_code), fixed_point.minor_units(to_code)
+        # Rates across the real spread, from ~1e-4 (KWD per IDR) to ~1e5 (IRR per KWD)
+        rate = fixed_point.scale_rate(10 ** rng.uniform(-4, 5))
+        amount_minor = rng.randint(1, 10 ** (9 + from_minor))
+        book.append((amount_minor, from_minor, to_minor, rate))
+    return book
+
+
+def timed(function, count: int):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) / count * 1e9
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    book = build_book(count)
+
+    amounts_text = [fixed_point.format_minor(a, fm) for a, fm, _, _ in book]
+    amounts_float = [float(text) for text in amounts_text]
+    rates_text = [f"{r.units}E-{r.exponent}" for _, _, _, r in book]
+    rates_float = [float(r) for _, _, _, r in book]
+    quanta = [Decimal(1).scaleb(-tm) for _, _, tm, _ in book]
+    to_scale = [10 ** tm for _, _, tm, _ in book]
+
+    def decimal_path():
+        with localcontext() as context:
+            context.prec = 40
+            return [
+                int((Decimal(a) * Decimal(r)).quantize(q, ROUND_HALF_EVEN).scaleb(-q.as_tuple().exponent))
+                for a, r, q in zip(amounts_text, rates_text, quanta)
+            ]
+
+    def float_path():
+        return [round(a * r * s) for a, r, s in zip(amounts_float, rates_float, to_scale)]
+
+    def fixed_path():
+        convert = fixed_point.convert_minor
+        return [convert(a, r, fm, tm) for a, fm, tm, r in book]
+
+    amounts_np = np.array([a for a, _, _, _ in book], dtype=np.int64)
+    units_np = np.array([r.units for _, _, _, r in book], dtype=np.int64)
+    shifts_np = np.array([r.exponent + fm - tm for _, fm, tm, r in book], dtype=np.int64)
+    amounts_f64 = np.array(amounts_float)
+    rates_f64 = np.array(rates_float)
+    scale_f64 = np.array(to_scale, dtype=np.float64)
+
+    def float_numpy_path():
+        return np.round(amounts_f64 * rates_f64 * scale_f64).astype(np.int64).tolist()
+
+    def fixed_numpy_path():
+        return fixed_point.convert_minor_array(amounts_np, units_np, shifts_np).tolist()
+
+    reference, decimal_ns = timed(decimal_path, count)
+    rows = [("Decimal (reference)", decimal_ns, reference)]
+    for label, path in (
+        ("float", float_path),
+        ("fixed int", fixed_path),
+        ("float NumPy f64", float_numpy_path),
+        ("fixed NumPy int64", fixed_numpy_path),
+    ):
+        result, ns = timed(path, count)
+        rows.append((label, ns, result))
+
+    print(f"{count} conversions, rates with {fixed_point.RATE_DIGITS} significant digits\n")
+    print(f"{'path':22} {'ns/conversion':>14} {'vs Decimal':>11} {'mismatches':>11} {'max error':>10}")
+    for label, ns, result in rows:
+        mismatches = sum(1 for got, want in zip(result, reference) if got != want)
+        max_error = max((abs(got - want) for got, want in zip(result, reference)), default=0)
+        print(f"{label:22} {ns:14.0f} {decimal_ns / ns:10.1f}x {mismatches:11d} {max_error:10d}")
+
+    ties = [i for i, (a, fm, tm, r) in enumerate(book)
+            if (a * r.units) % 10 ** max(r.exponent + fm - tm, 0) * 2 == 10 ** max(r.exponent + fm - tm, 0)]
+    print(f"\nexact half-way cases in the book: {len(ties)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Conversion Micro-Batching Benchmark
+
+Checks that micro-batched single conversions answer exactly like unbatched
+ones, then measures throughput and latency with batching off and at several
+windows, from one client up to many concurrent ones.
+
+    python benchmarks/microbatch_bench.py [--app kconvert|mobile] [--mode float|fixed]
+        [--requests N]
+
+Requests go straight to the ASGI app, and every snapshot is already in L1,
+so the numbers isolate what batching changes: one cache read per pair or
+base and one arithmetic pass per batch, against the extra loop iterations a
+request spends waiting in an open batch. With a single client each request
+waits one iteration. The gain only shows up once enough requests arrive
+together to share a batch.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+MOBILE_BACKEND = os.path.join(BACKEND, "..", "..", "currency-mobile-app", "backend")
+
+os.environ.setdefault("JWT_SECRET_KEY", "microbatch-bench-secret-key-0123456789")
+os.environ.setdefault("EXCHANGE_API_KEY", "bench")
+os.environ["FASTPATH_ENABLED"] = "false"
+os.environ["PREWARM_ENABLED"] = "false"
+os.environ["LOOP_LAG_ENABLED"] = "false"
+os.environ["CONVERT_BATCH_ENABLED"] = "false"
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "1000000000")
+os.environ.pop("REDIS_URL", None)
+os.environ.pop("TRAFFIC_RECORD_PATH", None)
+
+sys.path.insert(0, BACKEND)
+
+import httpx  # noqa: E402
+
+from currency_shared.microbatch import MicroBatcher  # noqa: E402
+
+VOLATILE = ("timestamp", "processing_time_ms")
+WARM_BASES = ("USD", "EUR", "JPY", "GBP")
+TARGETS = ("EUR", "USD", "JPY", "GBP", "KWD", "IDR", "CHF")
+WINDOWS_US = (100, 250, 500, 1000)
+CONCURRENCY = (1, 16, 128)
+LOAD_SHARES = (0.5, 0.9)
+
+upstream_calls = [0]
+RATES = {"USD": 1.0, "EUR": 0.92, "JPY": 151.37, "GBP": 0.79, "KWD": 0.3075, "IDR": 15862.5, "CHF": 0.88,
+         "AUD": 1.52, "CAD": 1.36}
+
+
+def upstream(request: httpx.Request) -> httpx.Response:
+    upstream_calls[0] += 1
+    base = request.url.path.rsplit("/", 1)[1]
+    rates = {code: value / RATES[base] for code, value in RATES.items()}
+    return httpx.Response(200, json={
+        "result": "success", "base_code": base, "conversion_rates": rates, "time_last_update_unix": 1
+    })
+
+
+def snapshot(base: str) -> dict:
+    return upstream(httpx.Request("GET", f"https://stub/latest/{base}")).json()
+
+
+class KconvertTarget:
+    def __init__(self):
+        import main_optimized
+        self.module = main_optimized
+        self.app = main_optimized.app
+        main_optimized.http_client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+        self.token = main_optimized.create_jwt()
+
+    def reset(self) -> None:
+        module = self.module
+        module.cache.l1.clear()
+        for base in WARM_BASES:
+            module.cache.set_local(module.get_cache_key(base), snapshot(base), ttl=300)
+        module.limiter.reset()
+        module.cluster.versions.clear()
+
+    def set_batching(self, window_us, max_batch: int = 256):
+        self.module.convert_batcher = MicroBatcher(
+            self.module.resolve_conversions, window=window_us / 1e6, max_batch=max_batch
+        ) if window_us else None
+        return self.module.convert_batcher
+
+    def request(self, amount: float, from_curr: str, to_curr: str, mode: str):
+        query = f"token={self.token}&amount={amount!r}&from={from_curr}&to={to_curr}&mode={mode}"
+        return "GET", "/api/convert", query.encode(), b""
+
+
+class MobileTarget:
+    def __init__(self):
+        # Settings read .env from the working directory
+        os.chdir(MOBILE_BACKEND)
+        sys.path.insert(0, os.path.abspath(MOBILE_BACKEND))
+        from app.main import app
+        from app.services.currency_service import CurrencyService
+        from app.services.upstream_client import UpstreamClient
+        self.app = app
+        self.service = CurrencyService
+        UpstreamClient._client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+
+    def reset(self) -> None:
+        cache = self.service.rates_cache
+        cache.l1.clear()
+        for base in WARM_BASES:
+            cache.set_local(f"rates:{base}", snapshot(base)["conversion_rates"], ttl=300)
+
+    def set_batching(self, window_us, max_batch: int = 256):
+        self.service._batcher = MicroBatcher(
+            self.service._resolve_conversions, window=window_us / 1e6, max_batch=max_batch
+        ) if window_us else None
+        return self.service._batcher
+
+    def request(self, amount: float, from_curr: str, to_curr: str, mode: str):
+        body = json.dumps({"amount": amount, "from_currency": from_curr, "to_currency": to_curr, "mode": mode})
+        return "POST", "/api/v1/convert", b"", body.encode()
+
+
+async def issue(app, method: str, path: str, query: bytes, body: bytes):
+    """(status, body bytes) of one request through the ASGI app"""
+    status, chunks = [0], []
+    sent = [False]
+
+    async def receive():
+        if not sent[0]:
+            sent[0] = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status[0] = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    headers = [(b"host", b"bench"), (b"content-type", b"application/json")]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query, "headers": headers + [(b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 123), "server": ("bench", 80), "state": {},
+    }
+    await app(scope, receive, send)
+    return status[0], b"".join(chunks)
+
+
+def normalized(status: int, body: bytes):
+    data = json.loads(body)
+    if isinstance(data, dict):
+        data = {key: value for key, value in data.items() if key not in VOLATILE}
+    return status, data
+
+
+async def conformance(target) -> int:
+    cases = [
+        (amount, from_curr, to_curr, mode)
+        for amount in (1.0, 12.5, 999.99, 1234567.891)
+        for from_curr, to_curr in (("USD", "EUR"), ("EUR", "JPY"), ("JPY", "KWD"), ("GBP", "IDR"),
+                                   ("USD", "USD"), ("CAD", "EUR"), ("AUD", "CHF"))
+        for mode in ("float", "fixed")
+    ]
+    requests = [target.request(*case) for case in cases]
+    outcomes = []
+    for window_us in (None, 1000):
+        target.reset()
+        batcher = target.set_batching(window_us)
+        # All at once, so with batching on they land in shared windows
+        results = await asyncio.gather(*(issue(target.app, *request) for request in requests))
+        outcomes.append([normalized(*result) for result in results])
+        if batcher:
+            batched = batcher.stats()
+    target.set_batching(None)
+
+    failures = 0
+    for case, expected, actual in zip(cases, *outcomes):
+        if expected != actual:
+            failures += 1
+            print(f"FAIL {case}\n  unbatched: {expected}\n  batched:   {actual}")
+    print(f"{len(cases)} conversions, {failures} differ between batched and unbatched "
+          f"(batched in {batched['batches']} batches, largest {batched['largest_batch']})")
+    return failures
+
+
+def workload(target, total: int, mode: str):
+    rng = random.Random(5)
+    return [
+        target.request(round(rng.uniform(1, 10000), 2), rng.choice(WARM_BASES), rng.choice(TARGETS), mode)
+        for _ in range(total)
+    ]
+
+
+async def throughput(target, requests, concurrency: int, window_us):
+    """Closed loop: requests per second with `concurrency` clients always waiting on a response"""
+    target.reset()
+    batcher = target.set_batching(window_us)
+    statuses = set()
+    position = [0]
+
+    async def worker():
+        while position[0] < len(requests):
+            request = requests[position[0]]
+            position[0] += 1
+            status, _ = await issue(target.app, *request)
+            statuses.add(status)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    assert statuses == {200}, statuses
+    return len(requests) / elapsed, batcher.stats() if batcher else None
+
+
+async def latency(target, requests, rate: float, window_us):
+    """Open loop: latency from each request's scheduled arrival, Poisson arrivals at `rate`/s"""
+    target.reset()
+    batcher = target.set_batching(window_us)
+    loop = asyncio.get_running_loop()
+    rng = random.Random(9)
+    latencies = []
+
+    async def one(request, due: float):
+        status, _ = await issue(target.app, *request)
+        assert status == 200, status
+        latencies.append(loop.time() - due)
+
+    tasks = []
+    due = loop.time()
+    for request in requests:
+        due += rng.expovariate(rate)
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(request, due)))
+    await asyncio.gather(*tasks)
+    latencies.sort()
+    return (latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99)] * 1000,
+            batcher.stats() if batcher else None)
+
+
+def batch_label(stats) -> str:
+    return f"{stats['avg_batch_size']:10.1f}" if stats else f"{'-':>10}"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Micro-batching conformance and throughput")
+    parser.add_argument("--app", choices=("kconvert", "mobile"), default="kconvert")
+    parser.add_argument("--mode", choices=("float", "fixed"), default="float")
+    parser.add_argument("--requests", type=int, default=4000)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    target = MobileTarget() if args.app == "mobile" else KconvertTarget()
+    failures = await conformance(target)
+    requests = workload(target, args.requests, args.mode)
+    configs = (None,) + WINDOWS_US
+
+    print(f"\n{args.app}, {args.mode} mode, {args.requests} cache-hit conversions per run")
+    print(f"\nthroughput, closed loop\n  {'clients':>7} {'window':>8} {'req/s':>9} {'vs off':>7} {'avg batch':>10}")
+    capacity = 0.0
+    for concurrency in CONCURRENCY:
+        baseline = None
+        for window_us in configs:
+            rps, stats = await throughput(target, requests, concurrency, window_us)
+            baseline = baseline or rps
+            capacity = max(capacity, baseline)
+            label = f"{window_us}us" if window_us else "off"
+            print(f"  {concurrency:7d} {label:>8} {rps:9.0f} {rps / baseline:6.2f}x {batch_label(stats)}")
+
+    print(f"\nlatency, open loop at a share of the unbatched capacity ({capacity:.0f} req/s)")
+    print(f"  {'load':>7} {'window':>8} {'p50 ms':>8} {'p99 ms':>8} {'avg batch':>10}")
+    for share in LOAD_SHARES:
+        for window_us in configs:
+            p50, p99, stats = await latency(target, requests, capacity * share, window_us)
+            label = f"{window_us}us" if window_us else "off"
+            print(f"  {share:7.0%} {label:>8} {p50:8.2f} {p99:8.2f} {batch_label(stats)}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
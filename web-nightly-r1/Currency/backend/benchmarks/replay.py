@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Traffic Replay
+
+Replays a log written by the traffic recorder (currency_shared.recorder) against the
+Kconvert app or the mobile backend, for capacity planning.
+
+    python benchmarks/replay.py LOG [--app kconvert|mobile] [--speed N]
+        [--upstream-latency-ms 80] [--limit N] [--keep-rate-limits]
+
+Requests are issued open-loop at their recorded offsets divided by --speed,
+so a slow server falls behind the schedule rather than slowing the
+arrivals. Schedule lag is reported next to the latencies, and a growing lag
+means this process itself is saturated. A log appended to across restarts
+holds several runs; they are played one after the other, without the
+downtime between them. The app runs in this process with
+its own lifespan, and requests go straight to the ASGI app, so latency covers
+the app and its middleware without any network. The exchange rate API is an
+in-process stub that answers after --upstream-latency-ms, with +/-25% jitter.
+
+Each recorded token pseudonym is replaced by a fresh token, one per
+pseudonym, so token reuse is preserved. Each client pseudonym gets its own
+synthetic address. Rate limits are lifted unless --keep-rate-limits is given,
+because a sampled log concentrates far more requests per client than the
+limits were set for. Redis is used when the app's usual settings point at
+one.
+
+The report gives p50/p90/p99/max latency overall and per route, status
+counts, the cache hit ratio and the number of upstream calls.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from urllib.parse import parse_qsl, urlencode
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+MOBILE_BACKEND = os.path.join(BACKEND, "..", "..", "currency-mobile-app", "backend")
+
+sys.path.insert(0, BACKEND)
+
+import httpx  # noqa: E402
+
+from currency_shared import currency_registry  # noqa: E402
+
+
+def load_log(path: str):
+    """First header and the entries of every run, runs played back to back"""
+    opener = gzip.open if path.endswith(".gz") else open
+    runs = []
+    with opener(path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            # A log appended to across restarts carries one header per run, and
+            # each run's t counts from its own start
+            if "log" in record or not runs:
+                runs.append((record if "log" in record else {}, []))
+            if "log" not in record:
+                runs[-1][1].append(record)
+
+    header, entries, offset = (runs[0][0] if runs else {}), [], 0.0
+    for _, run in runs:
+        run.sort(key=lambda entry: entry["t"])
+        for entry in run:
+            entry["t"] += offset
+        entries.extend(run)
+        if run:
+            offset = run[-1]["t"]
+    header = dict(header, runs=len(runs))
+    return header, entries
+
+
+class UpstreamStub:
+    """Exchange rate API answering after a jittered delay, counting its calls"""
+
+    def __init__(self, latency: float, seed: int = 11):
+        self.latency = latency
+        self.calls = 0
+        rng = random.Random(seed)
+        self.rates = {code: rng.uniform(0.01, 15000) for code in currency_registry.names()}
+        self.rates["USD"] = 1.0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency * random.uniform(0.75, 1.25))
+        base = request.url.path.rsplit("/", 1)[1].upper()
+        if base not in self.rates:
+            return httpx.Response(404, json={"result": "error", "error-type": "unsupported-code"})
+        pivot = self.rates[base]
+        return httpx.Response(200, json={
+            "result": "success", "base_code": base, "time_last_update_unix": int(time.time()),
+            "conversion_rates": {code: rate / pivot for code, rate in self.rates.items()},
+        })
+
+
+class KconvertTarget:
+    name = "kconvert"
+
+    def __init__(self, stub: UpstreamStub, keep_rate_limits: bool):
+        os.environ.setdefault("JWT_SECRET_KEY", "replay-secret-key-0123456789abcdef")
+        os.environ.setdefault("EXCHANGE_API_KEY", "replay")
+        os.environ.pop("TRAFFIC_RECORD_PATH", None)
+        import main_optimized
+        self.module = main_optimized
+        self.app = main_optimized.app
+        main_optimized.http_client = httpx.AsyncClient(transport=httpx.MockTransport(stub))
+        main_optimized.limiter.enabled = keep_rate_limits
+        self.tokens = {}
+
+    def token(self, pseudonym: str) -> str:
+        if pseudonym not in self.tokens:
+            self.tokens[pseudonym] = self.module.create_jwt()
+        return self.tokens[pseudonym]
+
+    def cache_counts(self):
+        return self.module.cache_lookups["hits"], self.module.cache_lookups["misses"]
+
+
+class MobileTarget:
+    name = "mobile"
+
+    def __init__(self, stub: UpstreamStub, keep_rate_limits: bool):
+        os.environ.pop("TRAFFIC_RECORD_PATH", None)
+        # Settings read .env from the working directory
+        os.chdir(MOBILE_BACKEND)
+        sys.path.insert(0, os.path.abspath(MOBILE_BACKEND))
+        from app.main import app
+        from app.services.currency_service import CurrencyService
+        from app.services.upstream_client import UpstreamClient
+        self.app = app
+        self.service = CurrencyService
+        # start() keeps a client that is already set
+        UpstreamClient._client = httpx.AsyncClient(transport=httpx.MockTransport(stub))
+
+    def token(self, pseudonym: str) -> str:
+        return pseudonym
+
+    def cache_counts(self):
+        l1 = self.service.rates_cache.l1
+        return l1.hits, l1.misses
+
+
+def client_address(pseudonym: str):
+    digest = hashlib.sha256(pseudonym.encode()).digest()
+    return f"10.{digest[0]}.{digest[1]}.{digest[2]}", 40000 + digest[3]
+
+
+def build_request(target, entry):
+    query = entry.get("q", "")
+    if "~" in query:
+        query = urlencode([
+            (name, target.token(value[1:]) if value.startswith("~") else value)
+            for name, value in parse_qsl(query, keep_blank_values=True)
+        ])
+    headers = [(b"host", b"replay")]
+    headers += [(name.encode(), value.encode("latin-1")) for name, value in entry.get("h", {}).items()]
+    body = entry.get("b", "").encode()
+    if body:
+        headers.append((b"content-length", str(len(body)).encode()))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": entry.get("m", "GET"), "scheme": "http", "path": entry["p"],
+        "raw_path": entry["p"].encode(), "root_path": "", "query_string": query.encode(),
+        "headers": headers, "client": client_address(entry.get("c", "")),
+        "server": ("replay", 80), "state": {},
+    }
+    return scope, body
+
+
+async def issue(app, scope, body: bytes):
+    """(status, latency seconds) of one request through the ASGI app"""
+    status = [0]
+    done = asyncio.Event()
+    sent = [False]
+
+    async def receive():
+        if not sent[0]:
+            sent[0] = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status[0] = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            done.set()
+
+    start = time.perf_counter()
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        status[0] = status[0] or 599
+    done.set()
+    return status[0], time.perf_counter() - start
+
+
+def percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def latency_row(label: str, values) -> str:
+    ms = [value * 1000 for value in values]
+    return (f"  {label:34} {len(ms):7d} {percentile(ms, 0.5):8.2f} {percentile(ms, 0.9):8.2f} "
+            f"{percentile(ms, 0.99):8.2f} {max(ms, default=0):8.2f}")
+
+
+async def replay(target, entries, speed: float):
+    results = []
+    lags = []
+    origin = entries[0]["t"]
+
+    async def run(entry, scope, body):
+        status, latency = await issue(target.app, scope, body)
+        results.append((entry.get("r", entry["p"]), status, latency, entry.get("d")))
+
+    async with target.app.router.lifespan_context(target.app):
+        hits, misses = target.cache_counts()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        tasks = []
+        for entry in entries:
+            due = started + (entry["t"] - origin) / speed
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            lags.append(max(0.0, loop.time() - due))
+            scope, body = build_request(target, entry)
+            tasks.append(asyncio.create_task(run(entry, scope, body)))
+        await asyncio.gather(*tasks)
+        elapsed = loop.time() - started
+        hits, misses = target.cache_counts()[0] - hits, target.cache_counts()[1] - misses
+    return results, lags, elapsed, hits, misses
+
+
+def report(target, header, results, lags, elapsed, hits, misses, stub, speed, skipped):
+    recorded_span = max(elapsed * speed, 1e-9)
+    print(f"replayed {len(results)} requests from a {header.get('app', '?')} log "
+          f"(sample rate {header.get('sample_rate', '?')}, {header.get('runs', 1)} run(s)) "
+          f"against {target.name} at {speed:g}x")
+    if skipped:
+        print(f"skipped {skipped} requests whose bodies were not recorded")
+    print(f"wall time {elapsed:.2f}s for {recorded_span:.2f}s of recorded traffic, "
+          f"{len(results) / max(elapsed, 1e-9):.1f} req/s achieved")
+    lag_ms = [lag * 1000 for lag in lags]
+    print(f"schedule lag ms: p50 {percentile(lag_ms, 0.5):.2f}  p99 {percentile(lag_ms, 0.99):.2f}  "
+          f"max {max(lag_ms, default=0):.2f}")
+
+    print(f"\n  {'route':34} {'count':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    print(latency_row("all", [latency for _, _, latency, _ in results]))
+    recorded = [d / 1000 for _, _, _, d in results if d is not None]
+    if recorded:
+        print(latency_row("all, as recorded", recorded))
+    by_route = defaultdict(list)
+    for route, _, latency, _ in results:
+        by_route[route].append(latency)
+    for route, latencies in sorted(by_route.items(), key=lambda item: -len(item[1])):
+        print(latency_row(route, latencies))
+
+    statuses = Counter(status for _, status, _, _ in results)
+    print("\nstatus: " + "  ".join(f"{status}: {count}" for status, count in sorted(statuses.items())))
+    lookups = hits + misses
+    ratio = f"{hits / lookups:.3f}" if lookups else "n/a"
+    print(f"cache: {hits} hits, {misses} misses, hit ratio {ratio}")
+    print(f"upstream calls: {stub.calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded traffic against Kconvert or the mobile backend")
+    parser.add_argument("log", help="traffic log written by the recorder (.gz is read as gzip)")
+    parser.add_argument("--app", choices=("kconvert", "mobile"), help="defaults to the app named in the log")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay at N times the recorded rate")
+    parser.add_argument("--upstream-latency-ms", type=float, default=80.0)
+    parser.add_argument("--limit", type=int, help="replay only the first N requests")
+    parser.add_argument("--keep-rate-limits", action="store_true")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    header, entries = load_log(args.log)
+    if args.limit:
+        entries = entries[:args.limit]
+    replayable = [entry for entry in entries if not entry.get("bt") and not entry.get("bx")]
+    if not replayable:
+        sys.exit("no replayable requests in the log")
+
+    logging.disable(logging.WARNING)
+    stub = UpstreamStub(args.upstream_latency_ms / 1000)
+    target_class = MobileTarget if (args.app or header.get("app")) == "mobile" else KconvertTarget
+    target = target_class(stub, args.keep_rate_limits)
+    results, lags, elapsed, hits, misses = asyncio.run(replay(target, replayable, args.speed))
+    report(target, header, results, lags, elapsed, hits, misses, stub, args.speed, len(entries) - len(replayable))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Cluster Snapshot Distribution
+
+Single-fetcher cluster mode over Redis.
+
+One node holds a lease (SET NX PX, renewed with a WATCH/MULTI compare-and-
+expire) and is the only one that calls the upstream API. Each snapshot it
+fetches gets a per-base version from a Redis counter. The snapshot is stored
+in a hash for late joiners and published on a channel. Followers install a
+snapshot only if its version is newer than the one they hold; installing is
+a single reference swap on the event loop, so readers see the old snapshot
+or the new one, never a mix. A follower that misses a base asks the leader
+over a request channel and waits for the publication.
+
+If the leader dies, its lease lapses after lease_ttl and the next campaign
+tick (every lease_ttl / 3) on any follower takes it over. A graceful shutdown
+releases the lease right away.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    from redis.exceptions import WatchError
+except ImportError:  # Cluster mode needs Redis; single-node mode never touches it
+    WatchError = Exception
+
+logger = logging.getLogger(__name__)
+
+SnapshotHandler = Callable[[str, Dict, float], None]
+RequestHandler = Callable[[str], Awaitable[None]]
+
+
+class ClusterCoordinator:
+    """Leader lease, versioned snapshot fan-out and follower fetch requests"""
+
+    def __init__(self, lease_ttl: float = 15.0, request_timeout: float = 5.0, prefix: str = "kconvert:"):
+        self.node_id = uuid.uuid4().hex[:12]
+        self.lease_ttl = lease_ttl
+        self.request_timeout = request_timeout
+        self.prefix = prefix
+        self.client = None
+        self.is_leader = False
+        self.leader_since: Optional[float] = None
+        # base -> version of the snapshot this node serves
+        self.versions: Dict[str, int] = {}
+        # base -> (version, expires_at) of the last snapshot published or installed here
+        self.expiries: Dict[str, Tuple[int, float]] = {}
+        self.stats_counters = {
+            "published": 0, "installed": 0, "stale_dropped": 0, "requests_sent": 0,
+            "requests_served": 0, "request_timeouts": 0, "leadership_gained": 0,
+            "leadership_lost": 0, "errors": 0,
+        }
+        self._on_snapshot: Optional[SnapshotHandler] = None
+        self._on_request: Optional[RequestHandler] = None
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._serving: set = set()
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.client is not None
+
+    @property
+    def lease_key(self) -> str:
+        return f"{self.prefix}cluster:leader"
+
+    @property
+    def snapshot_key(self) -> str:
+        return f"{self.prefix}cluster:snapshots"
+
+    @property
+    def snapshot_channel(self) -> str:
+        return f"{self.prefix}cluster:snapshot"
+
+    @property
+    def request_channel(self) -> str:
+        return f"{self.prefix}cluster:request"
+
+    def attach(self, client, on_snapshot: SnapshotHandler, on_request: RequestHandler) -> None:
+        self.client = client
+        self._on_snapshot = on_snapshot
+        self._on_request = on_request
+
+    def should_fetch(self) -> bool:
+        """Whether this node may call the upstream API"""
+        return not self.enabled or self.is_leader
+
+    async def next_version(self, base: str) -> int:
+        """Cluster-wide monotonic version for a new snapshot of `base`"""
+        if self.enabled:
+            try:
+                version = int(await self.client.incr(f"{self.prefix}cluster:version:{base}"))
+                self.versions[base] = version
+                return version
+            except Exception as e:
+                self.stats_counters["errors"] += 1
+                logger.warning(f"Snapshot version counter unavailable: {e}")
+        version = self.versions.get(base, 0) + 1
+        self.versions[base] = version
+        return version
+
+    def _set_leader(self, leader: bool) -> None:
+        if leader and not self.is_leader:
+            self.leader_since = time.time()
+            self.stats_counters["leadership_gained"] += 1
+            logger.info(f"Node {self.node_id} took the cluster lease")
+        elif not leader and self.is_leader:
+            self.leader_since = None
+            self.stats_counters["leadership_lost"] += 1
+            logger.warning(f"Node {self.node_id} lost the cluster lease")
+        self.is_leader = leader
+
+    async def campaign(self) -> bool:
+        """Renew the lease if we hold it, otherwise try to take it"""
+        ttl_ms = int(self.lease_ttl * 1000)
+        try:
+            if self.is_leader:
+                async with self.client.pipeline(transaction=True) as pipe:
+                    await pipe.watch(self.lease_key)
+                    holder = await pipe.get(self.lease_key)
+                    if holder == self.node_id:
+                        pipe.multi()
+                        pipe.pexpire(self.lease_key, ttl_ms)
+                        await pipe.execute()
+                        return True
+                    await pipe.unwatch()
+                self._set_leader(False)
+            acquired = await self.client.set(self.lease_key, self.node_id, nx=True, px=ttl_ms)
+            self._set_leader(bool(acquired))
+        except WatchError:
+            # The key changed between WATCH and EXEC: someone else holds it now
+            self._set_leader(False)
+        except Exception as e:
+            self.stats_counters["errors"] += 1
+            logger.warning(f"Cluster lease check failed: {e}")
+            # Without Redis we cannot prove we still hold the lease
+            self._set_leader(False)
+        return self.is_leader
+
+    async def release(self) -> None:
+        if not self.enabled or not self.is_leader:
+            return
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                await pipe.watch(self.lease_key)
+                if await pipe.get(self.lease_key) == self.node_id:
+                    pipe.multi()
+                    pipe.delete(self.lease_key)
+                    await pipe.execute()
+                else:
+                    await pipe.unwatch()
+        except Exception as e:
+            logger.warning(f"Cluster lease release failed: {e}")
+        self.is_leader = False
+        self.leader_since = None
+        logger.info(f"Node {self.node_id} released the cluster lease")
+
+    def snapshot_expiry(self, base: str, version) -> Optional[float]:
+        """When the given version of `base` expires, None if this node never saw it"""
+        known = self.expiries.get(base)
+        return known[1] if known and known[0] == version else None
+
+    async def publish(self, base: str, data: Dict, expires_at: float) -> None:
+        """Store and broadcast a versioned snapshot (leader only)"""
+        if not self.enabled or not self.is_leader:
+            return
+        self.expiries[base] = (data.get("snapshot_version"), expires_at)
+        payload = json.dumps({
+            "node": self.node_id,
+            "base": base,
+            "version": data.get("snapshot_version"),
+            "expires_at": expires_at,
+            "data": data,
+        })
+        try:
+            await self.client.hset(self.snapshot_key, base, payload)
+            await self.client.publish(self.snapshot_channel, payload)
+            self.stats_counters["published"] += 1
+        except Exception as e:
+            self.stats_counters["errors"] += 1
+            logger.warning(f"Snapshot publish failed for {base}: {e}")
+
+    def _install(self, raw) -> None:
+        try:
+            message = json.loads(raw)
+            base, version = message["base"], int(message["version"])
+        except (TypeError, ValueError, KeyError):
+            return
+        if message.get("node") == self.node_id:
+            return
+        ttl = float(message.get("expires_at", 0)) - time.time()
+        # An equal version is a re-publish for a follower whose copy expired
+        if version < self.versions.get(base, 0) or ttl <= 0:
+            self.stats_counters["stale_dropped"] += 1
+            return
+        self.versions[base] = version
+        self.expiries[base] = (version, float(message["expires_at"]))
+        self._on_snapshot(base, message["data"], ttl)
+        self.stats_counters["installed"] += 1
+        for waiter in self._waiters.pop(base, []):
+            if not waiter.done():
+                waiter.set_result(message["data"])
+
+    async def load_snapshots(self) -> int:
+        """Catch up on every stored snapshot, e.g. after joining or reconnecting"""
+        try:
+            stored = await self.client.hgetall(self.snapshot_key)
+        except Exception as e:
+            self.stats_counters["errors"] += 1
+            logger.warning(f"Snapshot catch-up failed: {e}")
+            return 0
+        before = self.stats_counters["installed"]
+        for raw in stored.values():
+            self._install(raw)
+        return self.stats_counters["installed"] - before
+
+    async def request(self, base: str) -> Optional[Dict]:
+        """Ask the leader for a base this follower lacks; None after request_timeout"""
+        waiter = asyncio.get_running_loop().create_future()
+        waiters = self._waiters.setdefault(base, [])
+        waiters.append(waiter)
+        # Concurrent misses for the same base share one request
+        if len(waiters) == 1:
+            try:
+                await self.client.publish(self.request_channel, json.dumps({"node": self.node_id, "base": base}))
+                self.stats_counters["requests_sent"] += 1
+            except Exception as e:
+                self.stats_counters["errors"] += 1
+                logger.warning(f"Snapshot request failed for {base}: {e}")
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter), self.request_timeout)
+        except asyncio.TimeoutError:
+            self.stats_counters["request_timeouts"] += 1
+            return None
+        finally:
+            pending = self._waiters.get(base)
+            if pending and waiter in pending:
+                pending.remove(waiter)
+                if not pending:
+                    del self._waiters[base]
+
+    async def _serve(self, base: str) -> None:
+        try:
+            await self._on_request(base)
+            self.stats_counters["requests_served"] += 1
+        except Exception as e:
+            logger.warning(f"Could not serve snapshot request for {base}: {e}")
+        finally:
+            self._serving.discard(base)
+
+    def _handle_request(self, raw) -> None:
+        if not self.is_leader:
+            return
+        try:
+            base = json.loads(raw)["base"]
+        except (TypeError, ValueError, KeyError):
+            return
+        if base not in self._serving:
+            self._serving.add(base)
+            self._tasks.append(asyncio.create_task(self._serve(base)))
+            self._tasks = [task for task in self._tasks if not task.done()]
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(self.snapshot_channel, self.request_channel)
+                # Anything published while we were not subscribed is in the hash
+                await self.load_snapshots()
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    if message.get("channel") == self.snapshot_channel:
+                        self._install(message.get("data"))
+                    else:
+                        self._handle_request(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats_counters["errors"] += 1
+                logger.warning(f"Cluster listener error: {e}")
+                await asyncio.sleep(1.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def _campaign_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            await self.campaign()
+
+    async def start(self) -> None:
+        if not self.enabled or self._tasks:
+            return
+        await self.campaign()
+        self._tasks = [asyncio.create_task(self._listen()), asyncio.create_task(self._campaign_loop())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            except Exception:
+                pass
+        self._tasks = []
+        await self.release()
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "node_id": self.node_id,
+            "role": "single" if not self.enabled else ("leader" if self.is_leader else "follower"),
+            "leader_since": self.leader_since,
+            "lease_ttl_seconds": self.lease_ttl,
+            "snapshot_versions": dict(sorted(self.versions.items())),
+            "pending_requests": {base: len(waiters) for base, waiters in self._waiters.items()},
+            **self.stats_counters,
+        }
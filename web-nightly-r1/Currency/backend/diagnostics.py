@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Runtime Diagnostics
+
+Event-loop lag and memory diagnostics.
+
+LoopLagMonitor schedules a cheap timer on the loop and records how late it
+fires in a fixed-bucket histogram. A watchdog thread notices when that timer
+stops advancing and captures the loop thread's stack while it is still
+blocked, which names the slow callback. At the default 0.5 s tick the idle
+cost is two wakeups per second.
+
+MemoryDiagnostics wraps tracemalloc (off until an admin starts it) and GC
+statistics for on-demand snapshots, diffs and top allocators.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import asyncio
+import gc
+import sys
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List, Optional
+
+from profiling import format_stack
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+LAG_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LoopLagMonitor:
+    """Scheduling-delay histogram plus stack capture of stalls"""
+
+    def __init__(self, interval: float = 0.5, stall_threshold: float = 0.1, max_stalls: int = 20):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.counts = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls: deque = deque(maxlen=max_stalls)
+        self._heartbeat = 0.0
+        self._captured_for = 0.0
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def record(self, lag: float) -> None:
+        lag_ms = lag * 1000
+        self.counts[bisect_left(LAG_BUCKETS_MS, lag_ms)] += 1
+        self.samples += 1
+        self.total_lag += lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+
+    async def _tick(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            self._heartbeat = now
+            self.record(max(0.0, now - expected))
+
+    def _watch(self) -> None:
+        # A stall shows up as a heartbeat older than one tick plus the threshold
+        limit = self.interval + self.stall_threshold
+        while not self._stop.wait(self.stall_threshold):
+            heartbeat = self._heartbeat
+            blocked_for = time.perf_counter() - heartbeat
+            if blocked_for < limit or heartbeat == self._captured_for:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._captured_for = heartbeat
+            self.stalls.append({
+                "detected_at": time.time(),
+                "blocked_ms_at_capture": round((blocked_for - self.interval) * 1000, 1),
+                "stack": format_stack(frame),
+            })
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._tick())
+        self._watchdog = threading.Thread(target=self._watch, name="kconvert-loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound (ms) of the bucket holding the given fraction of samples"""
+        if not self.samples:
+            return None
+        target = fraction * self.samples
+        seen = 0
+        for bound, count in zip(LAG_BUCKETS_MS + (None,), self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return None
+
+    def stats(self) -> Dict:
+        buckets = [f"<={bound}ms" for bound in LAG_BUCKETS_MS] + [f">{LAG_BUCKETS_MS[-1]}ms"]
+        return {
+            "running": self._task is not None,
+            "interval_seconds": self.interval,
+            "stall_threshold_ms": self.stall_threshold * 1000,
+            "samples": self.samples,
+            "mean_lag_ms": round(self.total_lag / self.samples * 1000, 3) if self.samples else None,
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+            "p50_ms": self.percentile(0.5),
+            "p99_ms": self.percentile(0.99),
+            "histogram": dict(zip(buckets, self.counts)),
+            "stalls": list(self.stalls),
+        }
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size (Linux), None elsewhere"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        import resource
+        return pages * resource.getpagesize()
+    except (OSError, ValueError, IndexError, ImportError):
+        return None
+
+
+def _format_stats(stats, limit: int) -> List[Dict]:
+    result = []
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        entry = {
+            "location": f"{frame.filename}:{frame.lineno}",
+            "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count,
+        }
+        if hasattr(stat, "size_diff"):
+            entry["size_diff_kb"] = round(stat.size_diff / 1024, 1)
+            entry["count_diff"] = stat.count_diff
+        result.append(entry)
+    return result
+
+
+class MemoryDiagnostics:
+    """On-demand tracemalloc snapshots and GC statistics"""
+
+    def __init__(self):
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.baseline_at: Optional[float] = None
+
+    @staticmethod
+    def _filtered(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+        return snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+    def start(self, frames: int = 1) -> bool:
+        if tracemalloc.is_tracing():
+            return False
+        tracemalloc.start(frames)
+        return True
+
+    def stop(self) -> bool:
+        if not tracemalloc.is_tracing():
+            return False
+        tracemalloc.stop()
+        self.baseline = None
+        self.baseline_at = None
+        return True
+
+    def snapshot(self, limit: int = 10, group_by: str = "lineno") -> Dict:
+        """Take a new baseline and return its top allocators"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        self.baseline = self._filtered(tracemalloc.take_snapshot())
+        self.baseline_at = time.time()
+        return {"taken_at": self.baseline_at, "top": _format_stats(self.baseline.statistics(group_by), limit)}
+
+    def diff(self, limit: int = 10, group_by: str = "lineno") -> Dict:
+        """Growth since the baseline, biggest first"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        if self.baseline is None:
+            raise RuntimeError("No baseline snapshot taken")
+        current = self._filtered(tracemalloc.take_snapshot())
+        return {
+            "baseline_at": self.baseline_at,
+            "compared_at": time.time(),
+            "top": _format_stats(current.compare_to(self.baseline, group_by), limit),
+        }
+
+    def stats(self, limit: int = 10) -> Dict:
+        tracing = tracemalloc.is_tracing()
+        result = {
+            "rss_bytes": _rss_bytes(),
+            "gc": {
+                "enabled": gc.isenabled(),
+                "counts": gc.get_count(),
+                "thresholds": gc.get_threshold(),
+                "generations": gc.get_stats(),
+                "uncollectable": len(gc.garbage),
+            },
+            "tracemalloc": {"tracing": tracing, "baseline_at": self.baseline_at},
+        }
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = self._filtered(tracemalloc.take_snapshot())
+            result["tracemalloc"].update(
+                traced_bytes=current,
+                peak_bytes=peak,
+                frames=tracemalloc.get_traceback_limit(),
+                top=_format_stats(snapshot.statistics("lineno"), limit),
+            )
+        return result
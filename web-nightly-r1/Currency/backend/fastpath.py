@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Raw ASGI Fast Path
+
+Serves the hottest GET endpoints straight from ASGI, skipping FastAPI routing,
+dependency resolution, Query parsing and response model encoding.
+
+A fast handler gets the scope and the parsed query string. It returns the
+encoded JSON body, a ready Starlette response (for example a 429), or None to
+decline. A declined request goes to the regular FastAPI route unchanged.
+Handlers only commit side effects (rate-limit hits, counters) once they know
+they can answer. That keeps a declined request from being counted twice, and
+means the fast path never changes what a client sees.
+
+Install the middleware innermost (before CORS and Server-Timing are added)
+so those layers still wrap fast responses.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+_JSON_HEADERS = [(b"content-type", b"application/json")]
+
+FastHandler = Callable[[dict, Dict[str, str], Optional[str]], object]
+
+
+def parse_query(query_string: bytes) -> Dict[str, str]:
+    """Query parameters the way Starlette reads them for scalar Query(...) (last value wins)"""
+    if not query_string:
+        return {}
+    return dict(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True))
+
+
+class VerifiedTokens:
+    """Tokens that already passed verification, remembered until their own expiry"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max(1, max_entries)
+        self._tokens: "OrderedDict[str, float]" = OrderedDict()
+
+    def valid(self, token: str, now: Optional[float] = None) -> bool:
+        expires_at = self._tokens.get(token)
+        if expires_at is None:
+            return False
+        if (now or time.time()) > expires_at:
+            del self._tokens[token]
+            return False
+        return True
+
+    def add(self, token: str, expires_at: float) -> None:
+        self._tokens[token] = expires_at
+        self._tokens.move_to_end(token)
+        while len(self._tokens) > self.max_entries:
+            self._tokens.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+
+class FastRouter:
+    """GET handlers by exact path or by prefix with one trailing path segment"""
+
+    def __init__(self):
+        self.exact: Dict[str, FastHandler] = {}
+        self.prefixes: List[Tuple[str, FastHandler]] = []
+        self.served: Dict[str, int] = {}
+        self.declined: Dict[str, int] = {}
+
+    def get(self, path: str):
+        """Register a handler; a path ending in "/{param}" passes that segment to it"""
+        def decorator(handler: FastHandler) -> FastHandler:
+            if path.endswith("}"):
+                self.prefixes.append((path[:path.rindex("{")], handler))
+            else:
+                self.exact[path] = handler
+            self.served[path] = 0
+            self.declined[path] = 0
+            handler.fast_path = path
+            return handler
+        return decorator
+
+    def resolve(self, path: str) -> Tuple[Optional[FastHandler], Optional[str]]:
+        handler = self.exact.get(path)
+        if handler is not None:
+            return handler, None
+        for prefix, handler in self.prefixes:
+            if path.startswith(prefix):
+                segment = path[len(prefix):]
+                if segment and "/" not in segment:
+                    return handler, segment
+        return None, None
+
+    def stats(self) -> Dict:
+        served = sum(self.served.values())
+        declined = sum(self.declined.values())
+        return {
+            "routes": {
+                path: {"served": self.served[path], "declined": self.declined[path]}
+                for path in self.served
+            },
+            "served": served,
+            "declined": declined,
+            "served_ratio": round(served / max(served + declined, 1), 3),
+        }
+
+
+class FastPathMiddleware:
+    """ASGI middleware answering FastRouter routes without entering the FastAPI app"""
+
+    def __init__(self, app, router: FastRouter):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "GET":
+            handler, segment = self.router.resolve(scope["path"])
+            if handler is not None:
+                result = handler(scope, parse_query(scope["query_string"]), segment)
+                if result is None:
+                    self.router.declined[handler.fast_path] += 1
+                else:
+                    self.router.served[handler.fast_path] += 1
+                    # Route template for outer middleware, as FastAPI sets scope["route"]
+                    scope["fast_path"] = handler.fast_path
+                    if isinstance(result, bytes):
+                        await send({
+                            "type": "http.response.start",
+                            "status": 200,
+                            "headers": [(b"content-length", str(len(result)).encode())] + _JSON_HEADERS,
+                        })
+                        await send({"type": "http.response.body", "body": result})
+                    else:
+                        await result(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Streaming File Conversion
+
+Converts CSV / NDJSON uploads of any size with flat memory use.
+The request body is consumed chunk by chunk, split into row batches,
+converted against one pinned rate snapshot and streamed straight back.
+Row batches can optionally be parsed in a process pool so large uploads
+do not starve the event loop.
+
+Lines are split from each decoded chunk alone, so the work stays linear in
+the upload, and a line or CSV record longer than max_length characters
+aborts the conversion instead of growing the buffer without bound. CSV
+records are reassembled from lines by tracking quoted fields, so a quoted
+field may contain newlines.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import asyncio
+import codecs
+import csv
+import io
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from starlette.responses import StreamingResponse
+
+CSV = "csv"
+NDJSON = "ndjson"
+MAX_RECORD_CHARS = 1 << 20
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """Lazily created worker pool; None means convert inline on the loop"""
+    global _pool
+    if workers <= 0:
+        return None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+
+class RecordTooLong(ValueError):
+    """A line or CSV record exceeds the configured maximum length"""
+
+    def __init__(self, max_length: int):
+        super().__init__(f"Line or record longer than {max_length} characters")
+        self.max_length = max_length
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    Streaming response whose body is produced while the request body is still
+    being read. The stock response listens for disconnects by consuming
+    `receive`, which would swallow upload chunks; here a disconnect surfaces
+    through the request stream itself instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _convert_amount(raw, rate: float) -> Optional[float]:
+    try:
+        amount = float(raw)
+    except (TypeError, ValueError):
+        return None
+    return round(amount * rate, 6)
+
+
+def convert_csv_rows(lines: List[str], column_index: int, targets: List[Tuple[str, float]]) -> Tuple[str, int, int]:
+    """Convert a batch of CSV data lines; returns (csv text, rows, invalid rows)"""
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    invalid = 0
+    rows = 0
+    for row in csv.reader(lines):
+        if not row:
+            continue
+        rows += 1
+        raw = row[column_index] if column_index < len(row) else None
+        converted = [_convert_amount(raw, rate) for _, rate in targets]
+        if converted and converted[0] is None:
+            invalid += 1
+        writer.writerow(row + ["" if value is None else value for value in converted])
+    return out.getvalue(), rows, invalid
+
+
+def convert_ndjson_rows(lines: List[str], field: str, targets: List[Tuple[str, float]]) -> Tuple[str, int, int]:
+    """Convert a batch of NDJSON lines; returns (ndjson text, rows, invalid rows)"""
+    out = []
+    invalid = 0
+    rows = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        rows += 1
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("row is not an object")
+        except ValueError:
+            invalid += 1
+            out.append(json.dumps({"error": "invalid_json", "raw": line[:200]}))
+            continue
+        converted = {code: _convert_amount(record.get(field), rate) for code, rate in targets}
+        if targets and converted[targets[0][0]] is None:
+            invalid += 1
+        record["converted"] = converted
+        out.append(json.dumps(record, separators=(",", ":")))
+    return "\n".join(out) + "\n" if out else "", rows, invalid
+
+
+def convert_rows(fmt: str, lines: List[str], key, targets: List[Tuple[str, float]]) -> Tuple[str, int, int]:
+    """Picklable entry point for worker processes"""
+    if fmt == CSV:
+        return convert_csv_rows(lines, key, targets)
+    return convert_ndjson_rows(lines, key, targets)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_length: int = MAX_RECORD_CHARS) -> AsyncIterator[str]:
+    """Decode a byte stream into lines, buffering at most one partial line of max_length"""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    # Pieces of the unterminated line; only new text is ever scanned for newlines
+    pending: List[str] = []
+    pending_length = 0
+    async for chunk in chunks:
+        *complete, tail = decoder.decode(chunk).split("\n")
+        if complete:
+            complete[0] = "".join(pending) + complete[0]
+            pending, pending_length = [], 0
+            for line in complete:
+                if len(line) > max_length:
+                    raise RecordTooLong(max_length)
+                yield line.rstrip("\r")
+        pending.append(tail)
+        pending_length += len(tail)
+        if pending_length > max_length:
+            raise RecordTooLong(max_length)
+    last = "".join(pending) + decoder.decode(b"", final=True)
+    if last:
+        yield last.rstrip("\r")
+
+
+def _ends_in_quotes(line: str, in_quotes: bool) -> bool:
+    """Whether a CSV line (default dialect) ends inside a quoted field"""
+    i = line.find('"')
+    while i != -1:
+        if in_quotes:
+            if line.startswith('"', i + 1):  # Escaped quote
+                i = line.find('"', i + 2)
+                continue
+            in_quotes = False
+        elif i == 0 or line[i - 1] == ",":
+            # A quote opens a field only at its start; elsewhere it is literal
+            in_quotes = True
+        i = line.find('"', i + 1)
+    return in_quotes
+
+
+async def iter_csv_records(lines: AsyncIterator[str], max_length: int = MAX_RECORD_CHARS) -> AsyncIterator[str]:
+    """Join lines into CSV records, so quoted fields may span lines"""
+    parts: List[str] = []
+    length = 0
+    in_quotes = False
+    async for line in lines:
+        parts.append(line)
+        length += len(line) + 1
+        if length > max_length:
+            raise RecordTooLong(max_length)
+        in_quotes = _ends_in_quotes(line, in_quotes)
+        if not in_quotes:
+            yield "\n".join(parts)
+            parts, length = [], 0
+    if parts:
+        # Unterminated quote at end of input: csv parses what is there
+        yield "\n".join(parts)
+
+
+async def read_csv_header(records: AsyncIterator[str]) -> Optional[List[str]]:
+    """Consume and parse the first non-empty record of a CSV stream"""
+    async for record in records:
+        if record.strip():
+            return next(csv.reader([record]))
+    return None
+
+
+async def stream_conversion(
+    lines: AsyncIterator[str],
+    fmt: str,
+    key,
+    targets: List[Tuple[str, float]],
+    batch_rows: int,
+    workers: int,
+    stats: Dict,
+    header: Optional[List[str]] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Yield converted output in row batches. `key` is the amount column index
+    (CSV) or field name (NDJSON). With a worker pool, up to `workers` batches
+    are in flight at once and are emitted in input order.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_pool(workers)
+    max_in_flight = workers if pool else 1
+    in_flight: deque = deque()
+    batch: List[str] = []
+
+    def submit(rows: List[str]):
+        if pool is None:
+            future = loop.create_future()
+            future.set_result(convert_rows(fmt, rows, key, targets))
+            return future
+        return loop.run_in_executor(pool, convert_rows, fmt, rows, key, targets)
+
+    async def collect() -> bytes:
+        text, rows, invalid = await in_flight.popleft()
+        stats["rows"] += rows
+        stats["invalid_rows"] += invalid
+        return text.encode()
+
+    if header is not None:
+        out = io.StringIO()
+        csv.writer(out, lineterminator="\n").writerow(header + [f"converted_{code}" for code, _ in targets])
+        yield out.getvalue().encode()
+
+    try:
+        async for line in lines:
+            batch.append(line)
+            if len(batch) >= batch_rows:
+                in_flight.append(submit(batch))
+                batch = []
+                while len(in_flight) >= max_in_flight:
+                    data = await collect()
+                    if data:
+                        yield data
+    except RecordTooLong:
+        # The response is already under way, so the stream is cut short
+        stats["too_long"] += 1
+        raise
+
+    if batch:
+        in_flight.append(submit(batch))
+    while in_flight:
+        data = await collect()
+        if data:
+            yield data
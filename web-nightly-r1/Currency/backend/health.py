@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Liveness and Readiness State
+
+Readiness inputs kept up to date where the events happen: upstream fetches
+report success or failure, snapshot writes stamp their time, and the Redis
+L2 records its own last good and last failed call. A probe then reads a
+handful of fields. It never walks the cache, and it never waits on Redis or
+the upstream API, however large the cache grows or however slow either
+dependency is.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import time
+from typing import Dict, Optional, Tuple
+
+
+class HealthState:
+    """Upstream and snapshot freshness, updated incrementally"""
+
+    def __init__(self, max_snapshot_age: float, upstream_failure_threshold: int = 3):
+        self.started_at = time.time()
+        self.max_snapshot_age = max_snapshot_age
+        self.upstream_failure_threshold = max(1, upstream_failure_threshold)
+        self.newest_snapshot_at: Optional[float] = None
+        self.upstream_ok_at: Optional[float] = None
+        self.upstream_failed_at: Optional[float] = None
+        self.upstream_failures = 0  # Consecutive
+        self.upstream_error: Optional[str] = None
+
+    def snapshot_refreshed(self, at: Optional[float] = None) -> None:
+        self.newest_snapshot_at = at or time.time()
+
+    def upstream_succeeded(self) -> None:
+        self.upstream_ok_at = time.time()
+        self.upstream_failures = 0
+        self.upstream_error = None
+
+    def upstream_failed(self, reason: str) -> None:
+        self.upstream_failed_at = time.time()
+        self.upstream_failures += 1
+        self.upstream_error = reason
+
+    def uptime(self) -> float:
+        return time.time() - self.started_at
+
+    def readiness(self, redis=None, redis_configured: bool = False, redis_required: bool = False,
+                  fetches_upstream: bool = True, refresh_expected: bool = True) -> Tuple[bool, Dict]:
+        """(ready, per-check detail); `redis` is the RedisCache tier, None when not attached"""
+        now = time.time()
+
+        upstream_ok = not fetches_upstream or self.upstream_failures < self.upstream_failure_threshold
+        upstream = {
+            "ok": upstream_ok,
+            "role": "fetcher" if fetches_upstream else "follower",
+            "consecutive_failures": self.upstream_failures,
+            "last_success_age_seconds": _age(now, self.upstream_ok_at),
+            "last_failure_age_seconds": _age(now, self.upstream_failed_at),
+            "last_error": self.upstream_error,
+        }
+
+        # Before the first snapshot there is nothing stale to serve
+        snapshot_age = _age(now, self.newest_snapshot_at)
+        snapshot = {
+            "ok": not refresh_expected or snapshot_age is None or snapshot_age <= self.max_snapshot_age,
+            "newest_age_seconds": snapshot_age,
+            "max_age_seconds": self.max_snapshot_age,
+        }
+
+        if not redis_configured:
+            redis_check = {"ok": True, "status": "disabled"}
+        elif redis is None:
+            redis_check = {"ok": not redis_required, "status": "unavailable"}
+        else:
+            redis_check = {
+                "ok": redis.connected or not redis_required,
+                "status": "connected" if redis.connected else "disconnected",
+                "last_ok_age_seconds": _age(now, redis.last_ok),
+                "last_error_age_seconds": _age(now, redis.last_error),
+            }
+        redis_check["required"] = redis_required
+
+        checks = {"upstream": upstream, "snapshot": snapshot, "redis": redis_check}
+        return all(check["ok"] for check in checks.values()), checks
+
+
+def _age(now: float, at: Optional[float]) -> Optional[float]:
+    return round(now - at, 3) if at is not None else None
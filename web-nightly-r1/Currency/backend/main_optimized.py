@@ -7,23 +7,52 @@ Copyright (c) 2025 Team 6
 All rights reserved.
 """
 
-from fastapi import FastAPI, HTTPException, Query, Request, Header
+from fastapi import FastAPI, HTTPException, Query, Request, Header, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, Response
 from jose import JWTError, jwt
 from dotenv import load_dotenv
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 import os
 import time
 import httpx
 import asyncio
 import re
-from typing import Optional, Dict, List
-from datetime import datetime, timedelta
+import hmac
+import inspect
+import json
+import threading
+from contextlib import asynccontextmanager, suppress
+from itertools import islice
+from typing import Optional, Dict, List, Literal, Tuple
+from datetime import datetime, timedelta, timezone
 import logging
+import numpy as np
+from admission import AdmissionController, AdmissionRejected
+from timing import ServerTimingMiddleware, phase
+from profiling import RequestProfilerMiddleware, SamplingProfiler
+from popularity import PopularityTracker
+from currency_shared.tiered_cache import LocalCache, RedisCache, TieredCache
+import file_convert
+from snapshot_history import SnapshotHistory, parse_window
+from currency_shared.quota import QuotaBudget, RefreshPlanner
+from currency_shared import currency_registry
+from diagnostics import LoopLagMonitor, MemoryDiagnostics
+from fastpath import FastPathMiddleware, FastRouter, VerifiedTokens
+from cluster import ClusterCoordinator
+from compression import CompressionMiddleware, CompressionStats, build_codecs
+from health import HealthState
+from currency_shared.microbatch import MicroBatcher
+from currency_shared.recorder import TrafficRecorder, TrafficRecorderMiddleware
+from currency_shared import fixed_point
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis L2 is optional
+    aioredis = None
 
 # Load environment variables
 load_dotenv()
@@ -42,6 +71,7 @@ TOKEN_EXP_MINUTES = int(os.getenv("TOKEN_EXP_MINUTES", "10"))
 RATE_LIMIT = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
 AUTH_RATE_LIMIT = int(os.getenv("AUTH_RATE_LIMIT_PER_MINUTE", "30"))
 CORS_ORIGINS = os.getenv("OTHER_ORIGINS", "").split(",") if os.getenv("OTHER_ORIGINS") else ["http://localhost:3000", "http://127.0.0.1:3000"]
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")  # Admin endpoints are disabled when unset
 
 # Rate limiter
 limiter = Limiter(key_func=get_remote_address)
@@ -52,17 +82,203 @@ http_client = httpx.AsyncClient(
     limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
 )
 
-# Real-time cache with TTL (5 minutes)
-cache = {}
+# Admission control for upstream-bound work (cache hits bypass it)
+admission = AdmissionController(
+    max_concurrency=int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "20")),
+    queue_timeout=float(os.getenv("UPSTREAM_QUEUE_TIMEOUT_SECONDS", "2.0")),
+    max_queue=int(os.getenv("UPSTREAM_MAX_QUEUE", "200"))
+)
+
+# Streaming file conversion: rows per batch and optional parser worker processes
+FILE_CONVERT_BATCH_ROWS = int(os.getenv("FILE_CONVERT_BATCH_ROWS", "2000"))
+FILE_CONVERT_WORKERS = int(os.getenv("FILE_CONVERT_WORKERS", "0"))
+# Longest accepted line (NDJSON) or record (CSV), in characters
+FILE_CONVERT_MAX_RECORD = int(os.getenv("FILE_CONVERT_MAX_RECORD_CHARS", str(file_convert.MAX_RECORD_CHARS)))
+file_convert_stats = {"uploads": 0, "rows": 0, "invalid_rows": 0, "too_long": 0}
+
+# Real-time cache with TTL (5 minutes): in-process L1, optional Redis L2
 CACHE_TTL = 300  # 5 minutes
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Upstream quota: calls are counted per billing cycle and UTC day (0 = no limit), and
+# per-base TTLs are planned between CACHE_TTL and QUOTA_MAX_TTL to fit the remaining budget
+QUOTA_MAX_TTL = float(os.getenv("QUOTA_MAX_TTL_SECONDS", "86400"))
+QUOTA_PLAN_BASES = int(os.getenv("QUOTA_PLAN_BASES", "20"))
+QUOTA_REPLAN_SECONDS = 60
+quota = QuotaBudget(
+    monthly_limit=int(os.getenv("QUOTA_MONTHLY_LIMIT", "0")),
+    daily_limit=int(os.getenv("QUOTA_DAILY_LIMIT", "0")),
+    reset_day=int(os.getenv("QUOTA_RESET_DAY", "1")),
+    reserve_ratio=float(os.getenv("QUOTA_RESERVE_RATIO", "0.05"))
+)
+refresh_planner = RefreshPlanner(quota, min_ttl=CACHE_TTL, max_ttl=QUOTA_MAX_TTL)
+quota_stats = {"stale_served": 0, "rejected": 0}
+# Last good snapshot per base, served once the quota is spent
+last_snapshots: Dict[str, Dict] = {}
+
+cache = TieredCache(
+    LocalCache(
+        max_entries=int(os.getenv("MAX_CACHE_SIZE_EXCHANGE", "1000")),
+        # Without an L2 the L1 must be able to hold entries for their full planned TTL
+        ttl=float(os.getenv("CACHE_L1_TTL_SECONDS", "60" if REDIS_URL else str(QUOTA_MAX_TTL)))
+    ),
+    default_ttl=CACHE_TTL,
+    channel="kconvert:cache:invalidate"
+)
+
+# Request-level cache effectiveness (a request is a hit if it needed no upstream call)
+cache_lookups = {"hits": 0, "misses": 0}
+
+# Popularity-driven prewarming of hot bases
+popularity = PopularityTracker(half_life=float(os.getenv("POPULARITY_HALF_LIFE_SECONDS", "3600")))
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "true").lower() == "true"
+PREWARM_BASES = [b.strip().upper() for b in os.getenv("PREWARM_BASES", "USD,EUR,IDR").split(",") if b.strip()]
+PREWARM_TOP_K = int(os.getenv("PREWARM_TOP_K", "5"))
+PREWARM_CONCURRENCY = int(os.getenv("PREWARM_CONCURRENCY", "4"))
+PREWARM_INTERVAL = float(os.getenv("PREWARM_INTERVAL_SECONDS", str(CACHE_TTL * 0.8)))
+prewarm_stats = {"runs": 0, "bases_refreshed": 0, "failures": 0, "last_run": None, "last_bases": []}
+
+# Cluster mode (needs REDIS_URL): only the lease holder calls upstream and publishes
+# versioned snapshots; a dead leader is replaced within one lease TTL
+CLUSTER_MODE = os.getenv("CLUSTER_MODE", "false").lower() == "true"
+cluster = ClusterCoordinator(
+    lease_ttl=float(os.getenv("CLUSTER_LEASE_TTL_SECONDS", "15")),
+    request_timeout=float(os.getenv("CLUSTER_REQUEST_TIMEOUT_SECONDS", "5")),
+    prefix="kconvert:"
+)
+
+# Cross-rate matrix: every cell derives from one snapshot of the pivot base. Only the
+# full-set encodings are cached, in their own small LRU (two formats for the current and
+# the previous snapshot, ~1 MB), so caller-chosen sets cannot evict rate snapshots
+MATRIX_PIVOT = os.getenv("MATRIX_PIVOT", "USD").upper()
+matrix_cache = LocalCache(max_entries=4, ttl=CACHE_TTL)
+
+# Runtime diagnostics: event-loop lag sampler (always on, cheap) and on-demand memory tracing
+LOOP_LAG_ENABLED = os.getenv("LOOP_LAG_ENABLED", "true").lower() == "true"
+loop_lag = LoopLagMonitor(
+    interval=float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", "0.5")),
+    stall_threshold=float(os.getenv("LOOP_STALL_THRESHOLD_MS", "100")) / 1000
+)
+memory_diagnostics = MemoryDiagnostics()
+
+# Raw ASGI fast path for cache hits on /api/convert and /api/rates/{base}; JWTs that
+# passed verification are remembered until they expire
+FASTPATH_ENABLED = os.getenv("FASTPATH_ENABLED", "false").lower() == "true"
+# slowapi has no public call that counts a request against a route's limit, so the fast
+# path uses the check its @limiter.limit wrapper runs (slowapi is pinned for this). If an
+# upgrade drops it, the fast path stays off rather than let requests skip their limits.
+FAST_RATE_LIMIT_SUPPORTED = "in_middleware" in inspect.signature(
+    getattr(limiter, "_check_request_limit", lambda: None)
+).parameters
+if FASTPATH_ENABLED and not FAST_RATE_LIMIT_SUPPORTED:
+    logger.warning("This slowapi version cannot rate limit the fast path; FASTPATH_ENABLED ignored")
+    FASTPATH_ENABLED = False
+fast_routes = FastRouter()
+verified_tokens = VerifiedTokens(max_entries=int(os.getenv("VERIFIED_TOKEN_CACHE_SIZE", "10000")))
+
+# Probes: /livez answers while the loop runs; /readyz reads incrementally kept upstream,
+# snapshot and Redis state (a snapshot older than the longest planned TTL means refresh is stuck)
+health = HealthState(
+    max_snapshot_age=float(os.getenv("READY_MAX_SNAPSHOT_AGE_SECONDS", str(QUOTA_MAX_TTL + CACHE_TTL))),
+    upstream_failure_threshold=int(os.getenv("READY_UPSTREAM_FAILURES", "3"))
+)
+REDIS_PING_INTERVAL = float(os.getenv("READY_REDIS_PING_SECONDS", "5"))
+
+# Opt-in traffic recording for capacity planning (replay with benchmarks/replay.py);
+# tokens and client IPs are logged only as keyed HMAC pseudonyms
+TRAFFIC_RECORD_PATH = os.getenv("TRAFFIC_RECORD_PATH")
+traffic_recorder = TrafficRecorder(
+    TRAFFIC_RECORD_PATH,
+    sample_rate=float(os.getenv("TRAFFIC_RECORD_SAMPLE", "0.01")),
+    key=os.getenv("TRAFFIC_RECORD_KEY"),
+    max_bytes=int(os.getenv("TRAFFIC_RECORD_MAX_MB", "256")) * 1024 * 1024
+) if TRAFFIC_RECORD_PATH else None
+
+# Multiplexed /api/batch: operations per request (each one costs a rate-limit hit)
+BATCH_MAX_OPERATIONS = int(os.getenv("BATCH_MAX_OPERATIONS", "50"))
+
+# Response compression (zstd > br > gzip by Accept-Encoding) for bodies of at least
+# COMPRESSION_MIN_SIZE bytes; smaller ones cost more CPU than they save
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+compression_codecs = build_codecs(
+    zstd_level=int(os.getenv("COMPRESSION_ZSTD_LEVEL", "1")),
+    brotli_quality=int(os.getenv("COMPRESSION_BROTLI_QUALITY", "1")),
+    gzip_level=int(os.getenv("COMPRESSION_GZIP_LEVEL", "1"))
+)
+compression_stats = CompressionStats(compression_codecs)
+
+# Conversion arithmetic: "float" (default) or "fixed" for exact scaled-integer money
+# with banker's rounding to each currency's minor units; ?mode= overrides per request
+CONVERSION_MODE = os.getenv("CONVERSION_MODE", "float").lower()
+if CONVERSION_MODE not in ("float", "fixed"):
+    raise ValueError("CONVERSION_MODE must be 'float' or 'fixed'")
+
+# Micro-batching of /api/convert: cache hits arriving in the same loop ticks share one
+# cache read per pair and one arithmetic pass; a batch stays open at most the window.
+# Off by default, since routing and middleware dominate the cost of a cache-hit request
+# and it has not paid off in-process (benchmarks/microbatch_bench.py)
+CONVERT_BATCH_ENABLED = os.getenv("CONVERT_BATCH_ENABLED", "false").lower() == "true"
+CONVERT_BATCH_WINDOW = float(os.getenv("CONVERT_BATCH_WINDOW_US", "500")) / 1e6
+CONVERT_BATCH_MAX = int(os.getenv("CONVERT_BATCH_MAX", "256"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Attach the Redis L2, prewarm hot bases and keep them fresh; release pools on shutdown"""
+    redis_client = None
+    if REDIS_URL and aioredis is None:
+        logger.warning("REDIS_URL is set but the redis package is not installed; using L1 cache only")
+    elif REDIS_URL:
+        try:
+            redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
+            await redis_client.ping()
+            cache.l2 = RedisCache(redis_client, prefix="kconvert:")
+            cache.start()
+            quota.attach(redis_client, prefix="kconvert:")
+            logger.info("Connected to Redis L2 cache")
+        except Exception as e:
+            logger.warning(f"Redis L2 unavailable, using L1 cache only: {str(e)}")
+            redis_client = None
+    
+    if CLUSTER_MODE and redis_client:
+        cluster.attach(redis_client, on_snapshot=install_snapshot, on_request=serve_snapshot_request)
+        await cluster.start()
+        logger.info(f"Cluster node {cluster.node_id} started as {'leader' if cluster.is_leader else 'follower'}")
+    elif CLUSTER_MODE:
+        logger.warning("CLUSTER_MODE needs a reachable Redis; running as a single node")
+    
+    refresh_task = asyncio.create_task(prewarm_loop()) if PREWARM_ENABLED else None
+    ping_task = asyncio.create_task(redis_ping_loop()) if cache.l2 is not None else None
+    if LOOP_LAG_ENABLED:
+        loop_lag.start()
+    yield
+    await loop_lag.stop()
+    for task in (refresh_task, ping_task):
+        if task:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    # Hand the lease over now instead of after it lapses
+    await cluster.stop()
+    await cache.stop()
+    if redis_client:
+        await redis_client.aclose()
+    await http_client.aclose()
+    file_convert.shutdown_pool()
+    if traffic_recorder:
+        traffic_recorder.close()
 
 # FastAPI app
 app = FastAPI(
     title="Kconvert API",
     description="Ultra-optimized currency converter",
-    version="3.0.0"
+    version="3.0.0",
+    lifespan=lifespan
 )
 
+# Fast path goes in first so it sits innermost, inside CORS and Server-Timing
+if FASTPATH_ENABLED:
+    app.add_middleware(FastPathMiddleware, router=fast_routes)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -73,72 +289,44 @@ app.add_middleware(
     max_age=600,  # Cache preflight for 10 minutes
 )
 
+def is_admin_token(token: Optional[str]) -> bool:
+    """Constant-time check of the admin token"""
+    return bool(ADMIN_TOKEN and token and hmac.compare_digest(token, ADMIN_TOKEN))
+
+# Compression sits inside Server-Timing so its cost is reported as the compress phase
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        codecs=compression_codecs,
+        stats=compression_stats,
+        min_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    )
+
+# Per-request profiling (admin only) and Server-Timing phase breakdown
+app.add_middleware(RequestProfilerMiddleware, is_authorized=is_admin_token)
+app.add_middleware(ServerTimingMiddleware)
+
+# Outermost, so recorded durations cover every other layer
+if traffic_recorder:
+    app.add_middleware(TrafficRecorderMiddleware, recorder=traffic_recorder)
+
 # Rate limiting
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
-# Comprehensive 100+ currencies list
-CURRENCIES = {
-    # Major world currencies
-    "USD": "US Dollar", "EUR": "Euro", "GBP": "British Pound", "JPY": "Japanese Yen",
-    "AUD": "Australian Dollar", "CAD": "Canadian Dollar", "CHF": "Swiss Franc", 
-    "CNY": "Chinese Yuan", "SEK": "Swedish Krona", "NZD": "New Zealand Dollar",
-    "MXN": "Mexican Peso", "SGD": "Singapore Dollar", "HKD": "Hong Kong Dollar",
-    "NOK": "Norwegian Krone", "TRY": "Turkish Lira", "RUB": "Russian Ruble",
-    "INR": "Indian Rupee", "BRL": "Brazilian Real", "ZAR": "South African Rand",
-    "KRW": "South Korean Won", "PLN": "Polish Zloty", "THB": "Thai Baht",
-    "MYR": "Malaysian Ringgit", "AED": "UAE Dirham", "SAR": "Saudi Riyal",
-    "ILS": "Israeli Shekel", "CLP": "Chilean Peso", "COP": "Colombian Peso",
-    "ARS": "Argentine Peso", "TWD": "Taiwan Dollar",
-    
-    # European currencies
-    "DKK": "Danish Krone", "CZK": "Czech Koruna", "HUF": "Hungarian Forint",
-    "RON": "Romanian Leu", "BGN": "Bulgarian Lev", "HRK": "Croatian Kuna",
-    "ISK": "Icelandic Krona", "ALL": "Albanian Lek", "BAM": "Bosnia-Herzegovina Convertible Mark",
-    "MKD": "Macedonian Denar", "RSD": "Serbian Dinar", "MDL": "Moldovan Leu",
-    
-    # Asian currencies
-    "PHP": "Philippine Peso", "IDR": "Indonesian Rupiah", "VND": "Vietnamese Dong",
-    "KHR": "Cambodian Riel", "LAK": "Laotian Kip", "MMK": "Myanmar Kyat",
-    "BDT": "Bangladeshi Taka", "PKR": "Pakistani Rupee", "NPR": "Nepalese Rupee",
-    "LKR": "Sri Lankan Rupee", "MVR": "Maldivian Rufiyaa", "BTN": "Bhutanese Ngultrum",
-    "AFN": "Afghan Afghani", "UZS": "Uzbekistani Som", "KZT": "Kazakhstani Tenge",
-    "KGS": "Kyrgystani Som", "TJS": "Tajikistani Somoni", "TMT": "Turkmenistani Manat",
-    "MNT": "Mongolian Tugrik", "KPW": "North Korean Won",
-    
-    # Middle Eastern currencies
-    "QAR": "Qatari Riyal", "KWD": "Kuwaiti Dinar", "BHD": "Bahraini Dinar",
-    "OMR": "Omani Rial", "JOD": "Jordanian Dinar", "LBP": "Lebanese Pound",
-    "SYP": "Syrian Pound", "IQD": "Iraqi Dinar", "IRR": "Iranian Rial",
-    "GEL": "Georgian Lari", "AMD": "Armenian Dram", "AZN": "Azerbaijani Manat",
-    
-    # African currencies
-    "EGP": "Egyptian Pound", "NGN": "Nigerian Naira", "KES": "Kenyan Shilling",
-    "GHS": "Ghanaian Cedi", "MAD": "Moroccan Dirham", "TND": "Tunisian Dinar",
-    "DZD": "Algerian Dinar", "LYD": "Libyan Dinar", "ETB": "Ethiopian Birr",
-    "UGX": "Ugandan Shilling", "TZS": "Tanzanian Shilling", "RWF": "Rwandan Franc",
-    "XOF": "West African CFA Franc", "XAF": "Central African CFA Franc",
-    "MGA": "Malagasy Ariary", "MUR": "Mauritian Rupee", "SCR": "Seychellois Rupee",
-    "SZL": "Swazi Lilangeni", "LSL": "Lesotho Loti", "BWP": "Botswanan Pula",
-    "NAD": "Namibian Dollar", "ZMW": "Zambian Kwacha", "ZWL": "Zimbabwean Dollar",
-    "MWK": "Malawian Kwacha", "MZN": "Mozambican Metical", "AOA": "Angolan Kwanza",
-    "CVE": "Cape Verdean Escudo", "GMD": "Gambian Dalasi", "GNF": "Guinean Franc",
-    "LRD": "Liberian Dollar", "SLL": "Sierra Leonean Leone", "STD": "São Tomé and Príncipe Dobra",
-    "CDF": "Congolese Franc", "DJF": "Djiboutian Franc", "ERN": "Eritrean Nakfa",
-    "SOS": "Somali Shilling", "SDP": "Sudanese Pound", "SSP": "South Sudanese Pound",
-    
-    # Eastern European & CIS
-    "BYN": "Belarusian Ruble", "UAH": "Ukrainian Hryvnia",
-    
-    # Caribbean & Pacific
-    "JMD": "Jamaican Dollar", "TTD": "Trinidad and Tobago Dollar", "BBD": "Barbadian Dollar",
-    "BSD": "Bahamian Dollar", "BZD": "Belize Dollar", "XCD": "East Caribbean Dollar",
-    "HTG": "Haitian Gourde", "DOP": "Dominican Peso", "CUP": "Cuban Peso",
-    "KYD": "Cayman Islands Dollar", "AWG": "Aruban Florin", "ANG": "Netherlands Antillean Guilder",
-    "SRD": "Surinamese Dollar", "GYD": "Guyanese Dollar", "FJD": "Fijian Dollar",
-    "TOP": "Tongan Pa'anga", "WST": "Samoan Tala", "VUV": "Vanuatu Vatu",
-    "SBD": "Solomon Islands Dollar", "PGK": "Papua New Guinean Kina", "XPF": "CFP Franc",
-}
+# Comprehensive 100+ currencies list (active codes from the shared registry)
+CURRENCIES = currency_registry.names()
+
+# Ring buffer of refreshed snapshots per base (capacity x currencies float64 each). One
+# point per upstream update, so analytics windows shorter than the update period are refused
+# and the default window spans a fixed number of updates rather than a fixed duration
+UPSTREAM_UPDATE_SECONDS = float(os.getenv("UPSTREAM_UPDATE_SECONDS", "86400"))
+ANALYTICS_DEFAULT_WINDOW_UPDATES = int(os.getenv("ANALYTICS_DEFAULT_WINDOW_UPDATES", "30"))
+history = SnapshotHistory(
+    codes=list(CURRENCIES),
+    capacity=int(os.getenv("SNAPSHOT_HISTORY_CAPACITY", "288")),
+    max_bases=int(os.getenv("SNAPSHOT_HISTORY_MAX_BASES", "32"))
+)
 
 # Pydantic models for request validation
 class ConvertRequest(BaseModel):
@@ -180,6 +368,21 @@ class RatesRequest(BaseModel):
                 raise ValueError(f'Invalid target currency: {target}')
         return ','.join(targets)
 
+class BatchOperation(BaseModel):
+    """One /api/batch operation, with the parameters of the matching GET endpoint"""
+    model_config = ConfigDict(populate_by_name=True)
+    
+    op: Literal["convert", "rates", "batch-convert"]
+    amount: Optional[float] = None
+    from_currency: Optional[str] = Field(default=None, alias="from")
+    to: Optional[str] = None  # Target for convert, comma-separated targets for batch-convert
+    base: Optional[str] = None
+    targets: Optional[str] = None
+    mode: Optional[Literal["float", "fixed"]] = None
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+
 def create_jwt(owner: str = "oxchin") -> str:
     """Create JWT token"""
     now = time.time()
@@ -190,6 +393,8 @@ def verify_jwt(token: str) -> None:
     """Verify JWT token with enhanced security"""
     if not token or len(token) < 10:
         raise HTTPException(status_code=401, detail="Invalid token format")
+    if verified_tokens.valid(token):
+        return
     
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
@@ -200,70 +405,174 @@ def verify_jwt(token: str) -> None:
     except JWTError as e:
         logger.warning(f"JWT verification failed: {str(e)}")
         raise HTTPException(status_code=403, detail="Invalid token")
+    verified_tokens.add(token, payload["exp"])
+
+def verify_admin(admin_token: Optional[str]) -> None:
+    """Gate operational endpoints behind ADMIN_TOKEN"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not is_admin_token(admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
 
 def get_cache_key(base: str, targets: str = None) -> str:
     """Generate cache key for rates"""
     return f"rates:{base}:{targets or 'all'}"
 
-def is_cache_valid(timestamp: float) -> bool:
-    """Check if cache entry is still valid"""
-    return time.time() - timestamp < CACHE_TTL
+def replan_refreshes() -> None:
+    """Re-plan per-base TTLs from current popularity, at most once a minute"""
+    if refresh_planner.plan_age() > QUOTA_REPLAN_SECONDS:
+        refresh_planner.plan(dict(popularity.bases.top(QUOTA_PLAN_BASES)))
 
-def get_cached_rates(cache_key: str) -> Optional[Dict]:
-    """Get rates from cache if valid"""
-    if cache_key in cache:
-        data, timestamp = cache[cache_key]
-        if is_cache_valid(timestamp):
-            return data
-        else:
-            del cache[cache_key]
-    return None
+def planned_ttl(base: str) -> float:
+    """Quota-aware cache TTL for a base"""
+    replan_refreshes()
+    return refresh_planner.ttl_for(base)
 
-def set_cached_rates(cache_key: str, data: Dict) -> None:
-    """Set rates in cache with timestamp"""
-    cache[cache_key] = (data, time.time())
-
-async def fetch_rates(base: str, use_cache: bool = True) -> Dict:
+async def fetch_rates(base: str, use_cache: bool = True, force_refresh: bool = False) -> Dict:
     """Fetch exchange rates with caching and parallel processing"""
     cache_key = get_cache_key(base)
     
-    # Check cache first
-    if use_cache:
-        cached_data = get_cached_rates(cache_key)
+    # Check cache first (a forced refresh skips the read but still writes)
+    if use_cache and not force_refresh:
+        with phase("cache"):
+            cached_data = await cache.get(cache_key)
         if cached_data:
             logger.info(f"Cache hit for {base}")
+            cache_lookups["hits"] += 1
             return cached_data
+        cache_lookups["misses"] += 1
+    
+    if not cluster.should_fetch():
+        return await fetch_from_leader(base)
     
     try:
-        url = f"https://v6.exchangerate-api.com/v6/{EXCHANGE_API_KEY}/latest/{base}"
-        start_time = time.time()
-        
-        response = await http_client.get(url)
-        response.raise_for_status()
-        
-        response_time = time.time() - start_time
-        logger.info(f"API response time for {base}: {response_time:.3f}s")
+        with phase("upstream"):
+            async with admission.admit() as slot:
+                # Another request may have filled the cache while we queued
+                if use_cache and not force_refresh:
+                    cached_data = await cache.get(cache_key)
+                    if cached_data:
+                        return cached_data
+                
+                if not await quota.acquire():
+                    stale = last_snapshots.get(base)
+                    if stale:
+                        quota_stats["stale_served"] += 1
+                        logger.warning(f"Upstream quota spent, serving last snapshot for {base}")
+                        return stale
+                    quota_stats["rejected"] += 1
+                    raise HTTPException(
+                        status_code=503,
+                        detail="Upstream quota exhausted, retry later",
+                        headers={"Retry-After": str(quota.retry_after())}
+                    )
+                
+                url = f"https://v6.exchangerate-api.com/v6/{EXCHANGE_API_KEY}/latest/{base}"
+                start_time = time.perf_counter()
+                slot.start()
+                
+                response = await http_client.get(url)
+                response.raise_for_status()
+                
+                response_time = time.perf_counter() - start_time
+                logger.info(f"API response time for {base}: {response_time:.3f}s")
         
         data = response.json()
         if data.get("result") != "success":
+            health.upstream_failed("Exchange API error")
             raise HTTPException(status_code=500, detail="Exchange API error")
+        health.upstream_succeeded()
         
-        # Cache the result
+        data["snapshot_version"] = await cluster.next_version(base)
+        last_snapshots[base] = data
+        refresh_planner.mark_refreshed(base)
+        
+        # Cache the result for as long as the quota plan allows
+        ttl = planned_ttl(base)
         if use_cache:
-            set_cached_rates(cache_key, data)
-            logger.info(f"Cached rates for {base}")
+            await cache.set(cache_key, data, ttl=ttl)
+            logger.info(f"Cached rates for {base} ({ttl:.0f}s)")
+        await cluster.publish(base, data, expires_at=time.time() + ttl)
+        
+        history.record(base, float(data.get("time_last_update_unix") or time.time()), data.get("conversion_rates", {}))
+        health.snapshot_refreshed()
         
         return data
+    except AdmissionRejected as e:
+        logger.warning(f"Shed upstream request for {base}: {e.reason}")
+        raise HTTPException(
+            status_code=503,
+            detail="Upstream capacity exhausted, retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except httpx.TimeoutException:
         logger.error(f"Timeout fetching rates for {base}")
+        health.upstream_failed("timeout")
         raise HTTPException(status_code=504, detail="Request timeout")
     except httpx.RequestError as e:
         logger.error(f"Request error for {base}: {str(e)}")
+        health.upstream_failed(type(e).__name__)
         raise HTTPException(status_code=503, detail="Service unavailable")
+    except httpx.HTTPStatusError as e:
+        health.upstream_failed(f"HTTP {e.response.status_code}")
+        raise
+
+def install_snapshot(base: str, data: Dict, ttl: float) -> None:
+    """Swap in a snapshot published by the cluster leader"""
+    cache.set_local(get_cache_key(base), data, ttl=ttl)
+    last_snapshots[base] = data
+    health.snapshot_refreshed()
+    # Keeps the refresh plan warm in case this node takes over the lease
+    refresh_planner.mark_refreshed(base)
+    history.record(base, float(data.get("time_last_update_unix") or time.time()), data.get("conversion_rates", {}))
+
+async def serve_snapshot_request(base: str) -> None:
+    """Leader side of a follower miss: publish the base, fetching it if needed"""
+    popularity.record(base)
+    data = await fetch_rates(base)
+    version = data.get("snapshot_version")
+    if version is None:
+        return
+    # A cached snapshot keeps the expiry it was first published with, so followers never
+    # hold it longer than this node does
+    expires_at = cluster.snapshot_expiry(base, version)
+    if expires_at is not None and expires_at > time.time():
+        await cluster.publish(base, data, expires_at=expires_at)
+    else:
+        # Expiry unknown: fetch a fresh snapshot, which publishes itself
+        await fetch_rates(base, force_refresh=True)
+
+async def fetch_from_leader(base: str) -> Dict:
+    """Follower side of a cache miss: wait for the leader's snapshot instead of calling upstream"""
+    with phase("upstream"):
+        data = await cluster.request(base)
+    if data:
+        return data
+    stale = last_snapshots.get(base)
+    if stale:
+        quota_stats["stale_served"] += 1
+        return stale
+    raise HTTPException(
+        status_code=503,
+        detail="Rates not yet available from the cluster leader, retry later",
+        headers={"Retry-After": "1"}
+    )
 
-async def fetch_multiple_rates(bases: List[str]) -> Dict[str, Dict]:
-    """Fetch multiple currency rates in parallel"""
-    tasks = [fetch_rates(base) for base in bases]
+async def fetch_multiple_rates(
+    bases: List[str],
+    force_refresh: bool = False,
+    concurrency: Optional[int] = None
+) -> Dict[str, Dict]:
+    """Fetch multiple currency rates in parallel, optionally bounded"""
+    semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+    
+    async def fetch_one(base: str) -> Dict:
+        if semaphore is None:
+            return await fetch_rates(base, force_refresh=force_refresh)
+        async with semaphore:
+            return await fetch_rates(base, force_refresh=force_refresh)
+    
+    tasks = [fetch_one(base) for base in bases]
     results = await asyncio.gather(*tasks, return_exceptions=True)
     
     rates_data = {}
@@ -275,6 +584,42 @@ async def fetch_multiple_rates(bases: List[str]) -> Dict[str, Dict]:
     
     return rates_data
 
+def prewarm_targets() -> List[str]:
+    """Hottest bases by decayed popularity, seeded with PREWARM_BASES until traffic arrives"""
+    bases = popularity.top_bases(PREWARM_TOP_K)
+    for base in PREWARM_BASES:
+        if len(bases) >= PREWARM_TOP_K:
+            break
+        if base not in bases and base in CURRENCIES:
+            bases.append(base)
+    return bases
+
+async def redis_ping_loop() -> None:
+    """Keep the L2 connectivity seen by /readyz current while traffic is idle"""
+    while True:
+        await cache.l2.ping()
+        await asyncio.sleep(REDIS_PING_INTERVAL)
+
+async def prewarm_loop() -> None:
+    """Refresh the top-K bases ahead of expiry so hot traffic keeps hitting the cache"""
+    while True:
+        try:
+            # Only refresh bases whose planned TTL lapses before the next run
+            replan_refreshes()
+            bases = [base for base in prewarm_targets() if refresh_planner.due(base, lead=PREWARM_INTERVAL)]
+            if quota.exhausted() or not cluster.should_fetch():
+                bases = []
+            refreshed = await fetch_multiple_rates(bases, force_refresh=True, concurrency=PREWARM_CONCURRENCY)
+            prewarm_stats["runs"] += 1
+            prewarm_stats["bases_refreshed"] += len(refreshed)
+            prewarm_stats["failures"] += len(bases) - len(refreshed)
+            prewarm_stats["last_run"] = time.time()
+            prewarm_stats["last_bases"] = bases
+            logger.info(f"Prewarmed {len(refreshed)}/{len(bases)} bases: {','.join(bases)}")
+        except Exception as e:
+            logger.error(f"Prewarm run failed: {str(e)}")
+        await asyncio.sleep(PREWARM_INTERVAL)
+
 @app.get("/favicon.ico")
 async def favicon():
     """Favicon endpoint to prevent 404 logs"""
@@ -282,12 +627,13 @@ async def favicon():
 
 @app.get("/")
 async def root():
-    """Enhanced health check endpoint"""
-    cache_size = len(cache)
-    cache_entries = []
-    for key, (_, timestamp) in cache.items():
-        age = time.time() - timestamp
-        cache_entries.append({"key": key, "age_seconds": round(age, 2)})
+    """Service summary; probes should use /livez and /readyz"""
+    now = time.time()
+    # The five least recently used entries; islice stops the walk there
+    cache_entries = [
+        {"key": key, "age_seconds": round(now - stored_at, 2)}
+        for key, stored_at, _ in islice(cache.l1.entries(), 5)
+    ]
     
     return {
         "service": "Kconvert Ultra",
@@ -295,16 +641,37 @@ async def root():
         "version": "3.1.0",
         "features": ["parallel_processing", "real_time_cache", "enhanced_security"],
         "currencies": len(CURRENCIES),
-        "cache_size": cache_size,
+        "cache_size": len(cache.l1),
         "cache_ttl_seconds": CACHE_TTL,
-        "cache_entries": cache_entries[:5],  # Show first 5 entries
-        "timestamp": time.time(),
+        "cache_entries": cache_entries,
+        "timestamp": now,
         "uptime_info": {
-            "started_at": datetime.now().isoformat(),
+            "started_at": datetime.fromtimestamp(health.started_at, timezone.utc).isoformat(),
+            "uptime_seconds": round(health.uptime(), 1),
             "timezone": "UTC"
         }
     }
 
+@app.get("/livez")
+async def livez():
+    """Liveness: the process is up and its event loop is serving requests"""
+    return {"status": "alive", "uptime_seconds": round(health.uptime(), 1)}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness from incrementally kept upstream, snapshot and Redis state; 503 when not ready"""
+    ready, checks = health.readiness(
+        redis=cache.l2,
+        redis_configured=bool(REDIS_URL),
+        redis_required=CLUSTER_MODE,
+        fetches_upstream=cluster.should_fetch(),
+        refresh_expected=PREWARM_ENABLED
+    )
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "checks": checks, "timestamp": time.time()}
+    )
+
 @app.options("/api/auth")
 async def auth_options():
     """Handle preflight requests for auth endpoint"""
@@ -327,8 +694,34 @@ async def get_token(request: Request, origin: Optional[str] = Header(default=Non
 async def get_currencies():
     """Get supported currencies"""
     return {
-        "currencies": [{"code": code, "name": name} for code, name in CURRENCIES.items()],
-        "count": len(CURRENCIES)
+        "currencies": [
+            {"code": c.code, "name": c.name, "country": c.country.lower()}
+            for c in currency_registry.all_currencies()
+        ],
+        "count": len(CURRENCIES),
+        "registry_version": currency_registry.REGISTRY_VERSION
+    }
+
+@app.get("/api/currencies/search")
+async def search_currencies(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=64),
+    limit: int = Query(10, ge=1, le=50),
+    include_obsolete: bool = Query(False)
+):
+    """Type-ahead search over currency code, name and country"""
+    start_time = time.perf_counter()
+    matches = currency_registry.search(q, limit=limit, include_obsolete=include_obsolete)
+    elapsed = time.perf_counter() - start_time
+    
+    # Results only change with the registry version
+    response.headers["Cache-Control"] = "public, max-age=86400"
+    return {
+        "query": q,
+        "results": [currency_registry.to_dict(c) for c in matches],
+        "count": len(matches),
+        "registry_version": currency_registry.REGISTRY_VERSION,
+        "search_time_us": round(elapsed * 1e6, 1)
     }
 
 @app.get("/api/regions")
@@ -356,38 +749,34 @@ async def get_rates(
     targets: str = Query(...)
 ):
     """Get exchange rates with enhanced validation and caching"""
-    start_time = time.time()
-    verify_jwt(token)
-    
-    # Validate and sanitize input
-    base = base.upper().strip()
-    if not re.match(r'^[A-Z]{3}$', base) or base not in CURRENCIES:
-        raise HTTPException(status_code=400, detail=f"Unsupported currency: {base}")
+    start_time = time.perf_counter()
+    with phase("auth"):
+        verify_jwt(token)
     
-    # Validate targets
-    target_list = [t.strip().upper() for t in targets.split(",") if t.strip()]
-    if not target_list:
-        raise HTTPException(status_code=400, detail="No target currencies specified")
-    
-    invalid = [t for t in target_list if not re.match(r'^[A-Z]{3}$', t) or t not in CURRENCIES]
-    if invalid:
-        raise HTTPException(status_code=400, detail=f"Unsupported currencies: {invalid}")
+    with phase("validate"):
+        # Validate and sanitize input
+        base = base.upper().strip()
+        if not re.match(r'^[A-Z]{3}$', base) or base not in CURRENCIES:
+            raise HTTPException(status_code=400, detail=f"Unsupported currency: {base}")
+        
+        # Validate targets
+        target_list = [t.strip().upper() for t in targets.split(",") if t.strip()]
+        if not target_list:
+            raise HTTPException(status_code=400, detail="No target currencies specified")
+        
+        invalid = [t for t in target_list if not re.match(r'^[A-Z]{3}$', t) or t not in CURRENCIES]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Unsupported currencies: {invalid}")
     
-    # Check cache first
-    cache_key = get_cache_key(base, ','.join(sorted(target_list)))
-    cached_result = get_cached_rates(cache_key)
-    if cached_result:
-        processing_time = time.time() - start_time
-        cached_result["processing_time_ms"] = round(processing_time * 1000, 2)
-        cached_result["cache_hit"] = True
-        return cached_result
+    popularity.record(base, target_list[0] if len(target_list) == 1 else None)
     
-    # Fetch fresh data
+    # Filtered from the base snapshot on every request; caching each target set
+    # would crowd snapshots out of the shared L1
     data = await fetch_rates(base)
     rates = data.get("conversion_rates", {})
     filtered_rates = {t: rates.get(t) for t in target_list if t in rates}
     
-    processing_time = time.time() - start_time
+    processing_time = time.perf_counter() - start_time
     result = {
         "base_currency": base,
         "conversion_rates": filtered_rates,
@@ -395,13 +784,137 @@ async def get_rates(
         "timestamp": time.time(),
         "processing_time_ms": round(processing_time * 1000, 2),
         "cache_hit": False,
-        "data_freshness": "live"
+        "data_freshness": "live",
+        "snapshot_version": data.get("snapshot_version")
     }
-    
-    # Cache the result
-    set_cached_rates(cache_key, result)
     return result
 
+def build_rate_matrix(rates: Dict[str, float], codes: List[str]) -> np.ndarray:
+    """N x N cross rates from one pivot snapshot: cell [i, j] converts codes[i] to codes[j]"""
+    pivot = np.fromiter((rates[code] for code in codes), dtype=np.float64, count=len(codes))
+    return np.divide.outer(1.0 / pivot, 1.0 / pivot)
+
+def encode_rate_matrix(matrix: np.ndarray, codes: List[str], fmt: str, version) -> bytes:
+    """Row-major JSON (10 significant digits) or raw little-endian float64"""
+    if fmt == "f64":
+        return matrix.astype("<f8", copy=False).tobytes()
+    cells = ",".join(map("{:.10g}".format, matrix.ravel().tolist()))
+    header = json.dumps({"pivot": MATRIX_PIVOT, "snapshot_version": version, "n": len(codes), "codes": codes})
+    return f'{header[:-1]},"rates":[{cells}]}}'.encode()
+
+@app.get("/api/matrix")
+@limiter.limit(f"{RATE_LIMIT}/minute")
+async def rate_matrix(
+    request: Request,
+    token: str = Query(...),
+    codes: Optional[str] = Query(default=None),
+    matrix_format: str = Query("json", alias="format", pattern="^(json|f64)$")
+):
+    """Consistent N x N cross-rate matrix (row-major) for a currency set, default all"""
+    with phase("auth"):
+        verify_jwt(token)
+    
+    with phase("validate"):
+        if codes:
+            code_list = list(dict.fromkeys(c.strip().upper() for c in codes.split(",") if c.strip()))
+            invalid = [c for c in code_list if not re.match(r'^[A-Z]{3}$', c) or c not in CURRENCIES]
+            if invalid:
+                raise HTTPException(status_code=400, detail=f"Unsupported currencies: {invalid}")
+        else:
+            code_list = None
+    
+    data = await fetch_rates(MATRIX_PIVOT)
+    rates = data.get("conversion_rates", {})
+    version = data.get("snapshot_version", data.get("time_last_update_unix"))
+    full_set = code_list is None
+    if full_set:
+        code_list = [c for c in CURRENCIES if rates.get(c)]
+    missing = [c for c in code_list if not rates.get(c)]
+    if missing:
+        raise HTTPException(status_code=500, detail=f"Rates not available: {missing}")
+    
+    # One cached encoding per (snapshot, format) of the full set; other sets are built per request
+    cache_key = f"matrix:{version}:{matrix_format}"
+    body = None
+    if full_set:
+        with phase("cache"):
+            body = matrix_cache.get(cache_key)
+    if body is None:
+        with phase("compute"):
+            matrix = build_rate_matrix(rates, code_list)
+        with phase("encode"):
+            body = encode_rate_matrix(matrix, code_list, matrix_format, version)
+        if full_set:
+            matrix_cache.set(cache_key, body)
+    
+    headers = {"X-Snapshot-Version": str(version), "X-Matrix-Size": str(len(code_list))}
+    if matrix_format == "f64":
+        headers["X-Matrix-Codes"] = ",".join(code_list)
+        return Response(body, media_type="application/octet-stream", headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+def convert_amount(amount: float, from_curr: str, to_curr: str, rate: float,
+                   rates: Optional[Dict[str, float]], mode: str):
+    """Converted amount plus the exact fields fixed mode adds to the response"""
+    if mode != "fixed":
+        return round(amount * rate, 6), {}  # Higher precision
+    from_minor = fixed_point.minor_units(from_curr)
+    to_minor = fixed_point.minor_units(to_curr)
+    value = fixed_point.to_minor(amount, from_minor)
+    if rates is not None:
+        value = fixed_point.convert_minor(value, fixed_point.rate_table(rates)[to_curr], from_minor, to_minor)
+    return fixed_point.minor_to_float(value, to_minor), {
+        "converted_minor_units": value,
+        "minor_units": to_minor,
+        "precision": "fixed"
+    }
+
+def resolve_conversions(batch: List[Tuple[float, str, str, str]]) -> List[Optional[Tuple]]:
+    """Cache-hit conversions for a micro-batch; None where the route must fetch"""
+    snapshots: Dict[Tuple[str, str], Optional[Dict]] = {}
+    found = []
+    for _, from_curr, to_curr, _ in batch:
+        pair = (from_curr, to_curr)
+        if pair not in snapshots:
+            data = cache.get_local(get_cache_key(from_curr))
+            snapshots[pair] = data if data and to_curr in data.get("conversion_rates", ()) else None
+        found.append(snapshots[pair])
+    
+    results: List[Optional[Tuple]] = [None] * len(batch)
+    fixed_rows = []
+    for index, ((amount, from_curr, to_curr, mode), data) in enumerate(zip(batch, found)):
+        if data is None:
+            continue
+        cache_lookups["hits"] += 1
+        rate = data["conversion_rates"][to_curr]
+        if mode == "fixed":
+            fixed_rows.append(index)
+        else:
+            results[index] = (rate, round(amount * rate, 6), {}, data)
+    
+    if fixed_rows:
+        # One int64 pass for every fixed-mode row, whatever its pair
+        amounts, units, shifts, minors = [], [], [], []
+        for index in fixed_rows:
+            amount, from_curr, to_curr, _ = batch[index]
+            from_minor, to_minor = fixed_point.minor_units(from_curr), fixed_point.minor_units(to_curr)
+            scaled = fixed_point.rate_table(found[index]["conversion_rates"])[to_curr]
+            amounts.append(fixed_point.to_minor(amount, from_minor))
+            units.append(scaled.units)
+            shifts.append(scaled.exponent + from_minor - to_minor)
+            minors.append(to_minor)
+        values = fixed_point.convert_minor_array(amounts, units, shifts).tolist()
+        for index, value, to_minor in zip(fixed_rows, values, minors):
+            data = found[index]
+            rate = data["conversion_rates"][batch[index][2]]
+            exact = {"converted_minor_units": value, "minor_units": to_minor, "precision": "fixed"}
+            results[index] = (rate, fixed_point.minor_to_float(value, to_minor), exact, data)
+    return results
+
+convert_batcher = MicroBatcher(
+    resolve_conversions, window=CONVERT_BATCH_WINDOW, max_batch=CONVERT_BATCH_MAX
+) if CONVERT_BATCH_ENABLED else None
+
 @app.get("/api/convert")
 @limiter.limit(f"{RATE_LIMIT}/minute")
 async def convert(
@@ -409,53 +922,55 @@ async def convert(
     token: str = Query(...),
     amount: float = Query(...),
     from_currency: str = Query(..., alias="from"),
-    to_currency: str = Query(..., alias="to")
+    to_currency: str = Query(..., alias="to"),
+    mode: Optional[str] = Query(None, pattern="^(float|fixed)$")
 ):
     """Convert currency with enhanced validation and performance"""
-    start_time = time.time()
-    verify_jwt(token)
-    
-    # Enhanced input validation
-    if amount <= 0 or amount > 1000000000:
-        raise HTTPException(status_code=400, detail="Amount must be positive and less than 1 billion")
-    
-    from_curr = from_currency.upper().strip()
-    to_curr = to_currency.upper().strip()
+    start_time = time.perf_counter()
+    with phase("auth"):
+        verify_jwt(token)
     
-    # Validate currency format
-    for curr in [from_curr, to_curr]:
-        if not re.match(r'^[A-Z]{3}$', curr):
-            raise HTTPException(status_code=400, detail=f"Invalid currency format: {curr}")
-    
-    if from_curr not in CURRENCIES or to_curr not in CURRENCIES:
-        raise HTTPException(status_code=400, detail="Unsupported currency")
+    with phase("validate"):
+        # Enhanced input validation
+        if amount <= 0 or amount > 1000000000:
+            raise HTTPException(status_code=400, detail="Amount must be positive and less than 1 billion")
+        
+        from_curr = from_currency.upper().strip()
+        to_curr = to_currency.upper().strip()
+        
+        # Validate currency format
+        for curr in [from_curr, to_curr]:
+            if not re.match(r'^[A-Z]{3}$', curr):
+                raise HTTPException(status_code=400, detail=f"Invalid currency format: {curr}")
+        
+        if from_curr not in CURRENCIES or to_curr not in CURRENCIES:
+            raise HTTPException(status_code=400, detail="Unsupported currency")
     
     # Same currency conversion
+    mode = mode or CONVERSION_MODE
     if from_curr == to_curr:
-        processing_time = time.time() - start_time
+        converted, exact = convert_amount(amount, from_curr, to_curr, 1.0, None, mode)
+        processing_time = time.perf_counter() - start_time
         return {
             "amount": amount,
             "from_currency": from_curr,
             "to_currency": to_curr,
-            "converted_amount": amount,
+            "converted_amount": converted,
             "exchange_rate": 1.0,
             "timestamp": time.time(),
             "processing_time_ms": round(processing_time * 1000, 2),
             "cache_hit": False,
-            "conversion_type": "same_currency"
+            "conversion_type": "same_currency",
+            **exact
         }
     
-    # Check cache for conversion rate
-    cache_key = get_cache_key(from_curr, to_curr)
-    cached_data = get_cached_rates(cache_key)
+    popularity.record(from_curr, to_curr)
     
-    if cached_data and "conversion_rates" in cached_data:
-        rates = cached_data["conversion_rates"]
-        if to_curr in rates:
-            rate = rates[to_curr]
-            converted = round(amount * rate, 6)  # Higher precision
-            processing_time = time.time() - start_time
-            
+    if convert_batcher is not None:
+        with phase("batch"):
+            resolved = await convert_batcher.submit((amount, from_curr, to_curr, mode))
+        if resolved is not None:
+            rate, converted, exact, data = resolved
             return {
                 "amount": amount,
                 "from_currency": from_curr,
@@ -463,20 +978,23 @@ async def convert(
                 "converted_amount": converted,
                 "exchange_rate": rate,
                 "timestamp": time.time(),
-                "processing_time_ms": round(processing_time * 1000, 2),
-                "cache_hit": True,
-                "conversion_type": "cached"
+                "processing_time_ms": round((time.perf_counter() - start_time) * 1000, 2),
+                "cache_hit": False,
+                "conversion_type": "live",
+                "rate_source": "exchangerate-api",
+                "snapshot_version": data.get("snapshot_version"),
+                **exact
             }
     
-    # Fetch fresh rates
+    # Rates come from the base snapshot, cached or fetched
     data = await fetch_rates(from_curr)
     rates = data.get("conversion_rates", {})
     if to_curr not in rates:
         raise HTTPException(status_code=500, detail="Rate not available")
     
     rate = rates[to_curr]
-    converted = round(amount * rate, 6)  # Higher precision
-    processing_time = time.time() - start_time
+    converted, exact = convert_amount(amount, from_curr, to_curr, rate, rates, mode)
+    processing_time = time.perf_counter() - start_time
     
     result = {
         "amount": amount,
@@ -488,11 +1006,171 @@ async def convert(
         "processing_time_ms": round(processing_time * 1000, 2),
         "cache_hit": False,
         "conversion_type": "live",
-        "rate_source": "exchangerate-api"
+        "rate_source": "exchangerate-api",
+        "snapshot_version": data.get("snapshot_version"),
+        **exact
     }
     
     return result
 
+# Raw ASGI fast path: same checks, limits and cache bookkeeping as the routes above,
+# answered only when the result is already in L1 and the token was verified before
+FAST_AMOUNT = re.compile(r"\d{1,10}(?:\.\d{1,12})?")
+FAST_CODES = frozenset(CURRENCIES)
+
+def fast_json(payload: Dict) -> bytes:
+    """Encode exactly like JSONResponse"""
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def fast_conversion(amount: float, from_curr: str, to_curr: str, converted: float, rate: float,
+                    start_time: float, cache_hit: bool, conversion_type: str, snapshot_version=None) -> bytes:
+    """Field-for-field /api/convert body without building a dict"""
+    processing_time = round((time.perf_counter() - start_time) * 1000, 2)
+    body = (
+        f'{{"amount":{amount!r},"from_currency":"{from_curr}","to_currency":"{to_curr}",'
+        f'"converted_amount":{converted!r},"exchange_rate":{rate!r},"timestamp":{time.time()!r},'
+        f'"processing_time_ms":{processing_time!r},"cache_hit":{"true" if cache_hit else "false"},'
+        f'"conversion_type":"{conversion_type}"'
+    )
+    if conversion_type == "live":
+        body += ',"rate_source":"exchangerate-api"'
+    if conversion_type != "same_currency":
+        body += f',"snapshot_version":{json.dumps(snapshot_version)}'
+    return (body + "}").encode()
+
+def fast_rate_limit(scope: dict, endpoint) -> Optional[Response]:
+    """Count the request against the route's slowapi limit; the 429 response once exceeded"""
+    if not limiter.enabled:
+        return None
+    request = Request(scope)
+    try:
+        limiter._check_request_limit(request, endpoint, False)
+    except RateLimitExceeded as e:
+        return _rate_limit_exceeded_handler(request, e)
+    return None
+
+@fast_routes.get("/api/convert")
+def fast_convert(scope: dict, params: Dict[str, str], _segment: Optional[str]):
+    """Cache-hit /api/convert; declines anything the FastAPI route has to answer"""
+    start_time = time.perf_counter()
+    token, raw_amount = params.get("token"), params.get("amount")
+    from_param, to_param = params.get("from"), params.get("to")
+    if token is None or from_param is None or to_param is None:
+        return None
+    if raw_amount is None or not FAST_AMOUNT.fullmatch(raw_amount):
+        return None
+    # Fixed-point responses (and invalid modes) stay on the FastAPI route
+    if params.get("mode", CONVERSION_MODE) != "float":
+        return None
+    amount = float(raw_amount)
+    from_curr = from_param.upper().strip()
+    to_curr = to_param.upper().strip()
+    if amount <= 0 or amount > 1000000000 or from_curr not in FAST_CODES or to_curr not in FAST_CODES:
+        return None
+    with phase("auth"):
+        if not verified_tokens.valid(token):
+            return None
+    
+    if from_curr == to_curr:
+        return fast_rate_limit(scope, convert) or fast_conversion(
+            amount, from_curr, to_curr, amount, 1.0, start_time, False, "same_currency"
+        )
+    
+    # Decide before committing any side effect, so a declined request is counted once
+    snapshot = cache.l1.peek(get_cache_key(from_curr))
+    if not snapshot or to_curr not in snapshot.get("conversion_rates", ()):
+        return None
+    
+    limited = fast_rate_limit(scope, convert)
+    if limited is not None:
+        return limited
+    popularity.record(from_curr, to_curr)
+    
+    with phase("cache"):
+        cached_data = cache.get_local(get_cache_key(from_curr))
+    cache_lookups["hits"] += 1
+    rate = cached_data["conversion_rates"][to_curr]
+    return fast_conversion(
+        amount, from_curr, to_curr, round(amount * rate, 6), rate,
+        start_time, False, "live", cached_data.get("snapshot_version")
+    )
+
+@fast_routes.get("/api/rates/{base}")
+def fast_rates(scope: dict, params: Dict[str, str], base_segment: Optional[str]):
+    """Cache-hit /api/rates/{base}; declines anything the FastAPI route has to answer"""
+    start_time = time.perf_counter()
+    token, targets = params.get("token"), params.get("targets")
+    if token is None or targets is None:
+        return None
+    base = base_segment.upper().strip()
+    target_list = [t.strip().upper() for t in targets.split(",") if t.strip()]
+    if base not in FAST_CODES or not target_list or not FAST_CODES.issuperset(target_list):
+        return None
+    with phase("auth"):
+        if not verified_tokens.valid(token):
+            return None
+    
+    if not cache.l1.peek(get_cache_key(base)):
+        return None
+    
+    limited = fast_rate_limit(scope, get_rates)
+    if limited is not None:
+        return limited
+    popularity.record(base, target_list[0] if len(target_list) == 1 else None)
+    
+    with phase("cache"):
+        data = cache.get_local(get_cache_key(base))
+    cache_lookups["hits"] += 1
+    
+    rates = data.get("conversion_rates", {})
+    filtered_rates = {t: rates.get(t) for t in target_list if t in rates}
+    result = {
+        "base_currency": base,
+        "conversion_rates": filtered_rates,
+        "rates_count": len(filtered_rates),
+        "timestamp": time.time(),
+        "processing_time_ms": round((time.perf_counter() - start_time) * 1000, 2),
+        "cache_hit": False,
+        "data_freshness": "live",
+        "snapshot_version": data.get("snapshot_version")
+    }
+    return fast_json(result)
+
+def convert_targets(amount: float, from_curr: str, to_curr_list: List[str],
+                    rates: Dict[str, float], mode: str) -> List[Dict]:
+    """Conversions of one amount into every available target"""
+    conversions = []
+    available = [to_curr for to_curr in to_curr_list if to_curr in rates]
+    if mode == "fixed" and available:
+        # One int64 pass over every target, all from the same snapshot
+        from_minor = fixed_point.minor_units(from_curr)
+        table = fixed_point.rate_table(rates)
+        scaled = [table[to_curr] for to_curr in available]
+        to_minors = [fixed_point.minor_units(to_curr) for to_curr in available]
+        values = fixed_point.convert_minor_array(
+            fixed_point.to_minor(amount, from_minor),
+            [rate.units for rate in scaled],
+            [rate.exponent + from_minor - to_minor for rate, to_minor in zip(scaled, to_minors)]
+        ).tolist()
+        for to_curr, value, to_minor in zip(available, values, to_minors):
+            conversions.append({
+                "to_currency": to_curr,
+                "exchange_rate": rates[to_curr],
+                "converted_amount": fixed_point.minor_to_float(value, to_minor),
+                "converted_minor_units": value,
+                "minor_units": to_minor
+            })
+    else:
+        for to_curr in available:
+            rate = rates[to_curr]
+            converted = round(amount * rate, 6)
+            conversions.append({
+                "to_currency": to_curr,
+                "exchange_rate": rate,
+                "converted_amount": converted
+            })
+    return conversions
+
 @app.get("/api/batch-convert")
 @limiter.limit(f"{RATE_LIMIT}/minute")
 async def batch_convert(
@@ -500,44 +1178,39 @@ async def batch_convert(
     token: str = Query(...),
     amount: float = Query(...),
     from_currency: str = Query(..., alias="from"),
-    to_currencies: str = Query(..., alias="to")
+    to_currencies: str = Query(..., alias="to"),
+    mode: Optional[str] = Query(None, pattern="^(float|fixed)$")
 ):
     """Convert to multiple currencies in parallel"""
-    start_time = time.time()
-    verify_jwt(token)
-    
-    # Validate amount
-    if amount <= 0 or amount > 1000000000:
-        raise HTTPException(status_code=400, detail="Amount must be positive and less than 1 billion")
+    start_time = time.perf_counter()
+    with phase("auth"):
+        verify_jwt(token)
     
-    from_curr = from_currency.upper().strip()
-    to_curr_list = [t.strip().upper() for t in to_currencies.split(",") if t.strip()]
-    
-    # Validate currencies
-    if not re.match(r'^[A-Z]{3}$', from_curr) or from_curr not in CURRENCIES:
-        raise HTTPException(status_code=400, detail=f"Invalid from currency: {from_curr}")
-    
-    invalid_to = [t for t in to_curr_list if not re.match(r'^[A-Z]{3}$', t) or t not in CURRENCIES]
-    if invalid_to:
-        raise HTTPException(status_code=400, detail=f"Invalid to currencies: {invalid_to}")
+    with phase("validate"):
+        # Validate amount
+        if amount <= 0 or amount > 1000000000:
+            raise HTTPException(status_code=400, detail="Amount must be positive and less than 1 billion")
+        
+        from_curr = from_currency.upper().strip()
+        to_curr_list = [t.strip().upper() for t in to_currencies.split(",") if t.strip()]
+        
+        # Validate currencies
+        if not re.match(r'^[A-Z]{3}$', from_curr) or from_curr not in CURRENCIES:
+            raise HTTPException(status_code=400, detail=f"Invalid from currency: {from_curr}")
+        
+        invalid_to = [t for t in to_curr_list if not re.match(r'^[A-Z]{3}$', t) or t not in CURRENCIES]
+        if invalid_to:
+            raise HTTPException(status_code=400, detail=f"Invalid to currencies: {invalid_to}")
     
     # Fetch rates
     data = await fetch_rates(from_curr)
     rates = data.get("conversion_rates", {})
     
-    conversions = []
-    for to_curr in to_curr_list:
-        if to_curr in rates:
-            rate = rates[to_curr]
-            converted = round(amount * rate, 6)
-            conversions.append({
-                "to_currency": to_curr,
-                "exchange_rate": rate,
-                "converted_amount": converted
-            })
+    mode = mode or CONVERSION_MODE
+    conversions = convert_targets(amount, from_curr, to_curr_list, rates, mode)
     
-    processing_time = time.time() - start_time
-    return {
+    processing_time = time.perf_counter() - start_time
+    result = {
         "amount": amount,
         "from_currency": from_curr,
         "conversions": conversions,
@@ -545,33 +1218,448 @@ async def batch_convert(
         "timestamp": time.time(),
         "processing_time_ms": round(processing_time * 1000, 2)
     }
+    if mode == "fixed":
+        result["precision"] = "fixed"
+    return result
 
-@app.get("/api/cache/stats")
-async def cache_stats():
-    """Get cache statistics"""
-    total_entries = len(cache)
-    valid_entries = 0
-    expired_entries = 0
-    
-    for key, (_, timestamp) in cache.items():
-        if is_cache_valid(timestamp):
-            valid_entries += 1
+def batch_weight(request: Request) -> int:
+    """Rate-limit cost of a /api/batch call: one hit per operation"""
+    return getattr(request.state, "batch_operations", 1)
+
+async def batch_operations(request: Request, batch: BatchRequest) -> BatchRequest:
+    """Bound the batch size and record its weight before the rate limit is checked"""
+    if not batch.operations:
+        raise HTTPException(status_code=400, detail="No operations specified")
+    if len(batch.operations) > BATCH_MAX_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_OPERATIONS} operations per batch")
+    request.state.batch_operations = len(batch.operations)
+    return batch
+
+def batch_currency(code: Optional[str], label: str) -> str:
+    curr = (code or "").upper().strip()
+    if not re.match(r'^[A-Z]{3}$', curr) or curr not in CURRENCIES:
+        raise HTTPException(status_code=400, detail=f"Invalid {label} currency: {code}")
+    return curr
+
+def batch_currency_list(codes: Optional[str], label: str) -> List[str]:
+    code_list = [t.strip().upper() for t in (codes or "").split(",") if t.strip()]
+    if not code_list:
+        raise HTTPException(status_code=400, detail=f"No {label} currencies specified")
+    invalid = [t for t in code_list if not re.match(r'^[A-Z]{3}$', t) or t not in CURRENCIES]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Unsupported currencies: {invalid}")
+    return code_list
+
+def plan_batch_operation(operation: BatchOperation) -> Dict:
+    """Validated operation and the base whose snapshot it reads (400 on bad input)"""
+    if operation.op == "rates":
+        base = batch_currency(operation.base, "base")
+        return {"op": "rates", "base": base, "targets": batch_currency_list(operation.targets, "target")}
+    
+    if operation.amount is None or operation.amount <= 0 or operation.amount > 1000000000:
+        raise HTTPException(status_code=400, detail="Amount must be positive and less than 1 billion")
+    from_curr = batch_currency(operation.from_currency, "from")
+    plan = {"op": operation.op, "amount": operation.amount, "from": from_curr, "mode": operation.mode or CONVERSION_MODE}
+    if operation.op == "convert":
+        plan["to"] = batch_currency(operation.to, "to")
+        # Same-currency conversions need no snapshot
+        plan["base"] = from_curr if plan["to"] != from_curr else None
+    else:
+        plan["to"] = batch_currency_list(operation.to, "to")
+        plan["base"] = from_curr
+    return plan
+
+def run_batch_operation(plan: Dict, snapshots: Dict[str, Dict]) -> Dict:
+    """Result of one planned operation against the batch's pinned snapshots"""
+    data = snapshots.get(plan["base"]) if plan["base"] else {}
+    rates = data.get("conversion_rates", {})
+    
+    if plan["op"] == "rates":
+        popularity.record(plan["base"], plan["targets"][0] if len(plan["targets"]) == 1 else None)
+        filtered_rates = {t: rates[t] for t in plan["targets"] if t in rates}
+        return {
+            "base_currency": plan["base"],
+            "conversion_rates": filtered_rates,
+            "rates_count": len(filtered_rates),
+            "snapshot_version": data.get("snapshot_version")
+        }
+    
+    amount, from_curr, mode = plan["amount"], plan["from"], plan["mode"]
+    if plan["op"] == "batch-convert":
+        conversions = convert_targets(amount, from_curr, plan["to"], rates, mode)
+        return {
+            "amount": amount,
+            "from_currency": from_curr,
+            "conversions": conversions,
+            "total_conversions": len(conversions),
+            "snapshot_version": data.get("snapshot_version")
+        }
+    
+    to_curr = plan["to"]
+    if plan["base"] is None:
+        converted, exact = convert_amount(amount, from_curr, to_curr, 1.0, None, mode)
+        rate = 1.0
+    else:
+        popularity.record(from_curr, to_curr)
+        if to_curr not in rates:
+            raise HTTPException(status_code=500, detail="Rate not available")
+        rate = rates[to_curr]
+        converted, exact = convert_amount(amount, from_curr, to_curr, rate, rates, mode)
+    return {
+        "amount": amount,
+        "from_currency": from_curr,
+        "to_currency": to_curr,
+        "converted_amount": converted,
+        "exchange_rate": rate,
+        "snapshot_version": data.get("snapshot_version"),
+        **exact
+    }
+
+@app.post("/api/batch")
+@limiter.limit(f"{RATE_LIMIT}/minute", cost=batch_weight)
+async def batch(
+    request: Request,
+    token: str = Query(...),
+    batch_request: BatchRequest = Depends(batch_operations)
+):
+    """Run several convert / rates / batch-convert operations with one auth check and one snapshot per base"""
+    start_time = time.perf_counter()
+    with phase("auth"):
+        verify_jwt(token)
+    
+    with phase("validate"):
+        plans = []
+        for operation in batch_request.operations:
+            try:
+                plans.append(plan_batch_operation(operation))
+            except HTTPException as e:
+                plans.append(e)
+    
+    # Each base is resolved once for the whole batch; cold bases are fetched concurrently
+    bases = list(dict.fromkeys(plan["base"] for plan in plans if isinstance(plan, dict) and plan["base"]))
+    fetched = await asyncio.gather(*(fetch_rates(base) for base in bases), return_exceptions=True)
+    snapshots, failed_bases = {}, {}
+    for base, data in zip(bases, fetched):
+        if isinstance(data, HTTPException):
+            failed_bases[base] = data
+        elif isinstance(data, Exception):
+            logger.error(f"Batch fetch failed for {base}: {data}")
+            failed_bases[base] = HTTPException(status_code=500, detail="Rate fetch failed")
         else:
-            expired_entries += 1
+            snapshots[base] = data
+    
+    results = []
+    for operation, plan in zip(batch_request.operations, plans):
+        if isinstance(plan, dict) and plan["base"] in failed_bases:
+            plan = failed_bases[plan["base"]]
+        if isinstance(plan, dict):
+            try:
+                results.append({"op": operation.op, "status": 200, "result": run_batch_operation(plan, snapshots)})
+                continue
+            except HTTPException as e:
+                plan = e
+        results.append({"op": operation.op, "status": plan.status_code, "error": plan.detail})
     
+    processing_time = time.perf_counter() - start_time
     return {
-        "total_entries": total_entries,
-        "valid_entries": valid_entries,
-        "expired_entries": expired_entries,
+        "results": results,
+        "total_operations": len(results),
+        "failed_operations": sum(1 for result in results if result["status"] != 200),
+        "snapshot_versions": {base: data.get("snapshot_version") for base, data in snapshots.items()},
+        "timestamp": time.time(),
+        "processing_time_ms": round(processing_time * 1000, 2)
+    }
+
+@app.post("/api/convert/file")
+@limiter.limit(f"{RATE_LIMIT}/minute")
+async def convert_file(
+    request: Request,
+    token: str = Query(...),
+    from_currency: str = Query(..., alias="from"),
+    to_currencies: str = Query(..., alias="to"),
+    column: str = Query("amount"),
+    file_format: Optional[str] = Query(default=None, alias="format")
+):
+    """Stream-convert a CSV or NDJSON upload against one pinned rate snapshot"""
+    with phase("auth"):
+        verify_jwt(token)
+    
+    with phase("validate"):
+        fmt = (file_format or "").lower()
+        if not fmt:
+            content_type = request.headers.get("content-type", "")
+            fmt = file_convert.NDJSON if "ndjson" in content_type or "jsonl" in content_type else file_convert.CSV
+        if fmt not in (file_convert.CSV, file_convert.NDJSON):
+            raise HTTPException(status_code=400, detail="Format must be csv or ndjson")
+        
+        from_curr = from_currency.upper().strip()
+        to_curr_list = [t.strip().upper() for t in to_currencies.split(",") if t.strip()]
+        if not re.match(r'^[A-Z]{3}$', from_curr) or from_curr not in CURRENCIES:
+            raise HTTPException(status_code=400, detail=f"Invalid from currency: {from_curr}")
+        invalid_to = [t for t in to_curr_list if not re.match(r'^[A-Z]{3}$', t) or t not in CURRENCIES]
+        if not to_curr_list or invalid_to:
+            raise HTTPException(status_code=400, detail=f"Invalid to currencies: {invalid_to}")
+    
+    # Pin one snapshot for the whole file
+    data = await fetch_rates(from_curr)
+    rates = data.get("conversion_rates", {})
+    missing = [t for t in to_curr_list if t not in rates]
+    if missing:
+        raise HTTPException(status_code=500, detail=f"Rates not available: {missing}")
+    targets = [(t, rates[t]) for t in to_curr_list]
+    
+    lines = file_convert.iter_lines(request.stream(), max_length=FILE_CONVERT_MAX_RECORD)
+    key, header = column, None
+    if fmt == file_convert.CSV:
+        lines = file_convert.iter_csv_records(lines, max_length=FILE_CONVERT_MAX_RECORD)
+        try:
+            header = await file_convert.read_csv_header(lines)
+        except file_convert.RecordTooLong as e:
+            file_convert_stats["too_long"] += 1
+            raise HTTPException(status_code=413, detail=str(e))
+        if header is None or column not in header:
+            raise HTTPException(status_code=400, detail=f"Column '{column}' not found in CSV header")
+        key = header.index(column)
+    
+    file_convert_stats["uploads"] += 1
+    body = file_convert.stream_conversion(
+        lines, fmt, key, targets,
+        batch_rows=FILE_CONVERT_BATCH_ROWS,
+        workers=FILE_CONVERT_WORKERS,
+        stats=file_convert_stats,
+        header=header
+    )
+    return file_convert.UploadStreamingResponse(
+        body,
+        media_type="text/csv" if fmt == file_convert.CSV else "application/x-ndjson",
+        headers={
+            "X-Rate-Base": from_curr,
+            "X-Rate-Snapshot": str(data.get("time_last_update_unix", ""))
+        }
+    )
+
+@app.get("/api/analytics/{base}/{target}")
+@limiter.limit(f"{RATE_LIMIT}/minute")
+async def pair_analytics(
+    request: Request,
+    base: str,
+    target: str,
+    token: str = Query(...),
+    window: Optional[str] = Query(None),
+    rolling: int = Query(7, ge=2, le=288)
+):
+    """
+    Change, OHLC and rolling volatility of a pair over recent snapshots.
+
+    There is one point per upstream update, so resolution_seconds in the
+    response is the update period. Daily on the free plan. The default window
+    covers ANALYTICS_DEFAULT_WINDOW_UPDATES updates, and `rolling` counts
+    returns at that resolution.
+    """
+    start_time = time.perf_counter()
+    with phase("auth"):
+        verify_jwt(token)
+    
+    with phase("validate"):
+        base_curr = base.upper().strip()
+        target_curr = target.upper().strip()
+        for code in (base_curr, target_curr):
+            if not re.match(r'^[A-Z]{3}$', code) or code not in CURRENCIES:
+                raise HTTPException(status_code=400, detail=f"Invalid currency: {code}")
+        try:
+            window_seconds = (
+                parse_window(window) if window is not None
+                else ANALYTICS_DEFAULT_WINDOW_UPDATES * UPSTREAM_UPDATE_SECONDS
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Window must be a positive duration like 90m, 24h, 7d or seconds")
+        if window_seconds < UPSTREAM_UPDATE_SECONDS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Window must cover at least one upstream update ({UPSTREAM_UPDATE_SECONDS:g}s)"
+            )
+    
+    with phase("analytics"):
+        result = history.analytics(base_curr, target_curr, window_seconds, rolling)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"No snapshots recorded for {base_curr}/{target_curr} in window")
+    
+    processing_time = time.perf_counter() - start_time
+    return {
+        "base": base_curr,
+        "target": target_curr,
+        "window_seconds": window_seconds,
+        "resolution_seconds": UPSTREAM_UPDATE_SECONDS,
+        **result,
+        "timestamp": time.time(),
+        "processing_time_ms": round(processing_time * 1000, 2)
+    }
+
+@app.get("/api/convert/file/stats")
+async def get_file_convert_stats():
+    """Get streamed upload, row and invalid-row counts of /api/convert/file"""
+    return {
+        "batch_rows": FILE_CONVERT_BATCH_ROWS,
+        "workers": FILE_CONVERT_WORKERS,
+        "max_record_chars": FILE_CONVERT_MAX_RECORD,
+        **file_convert_stats
+    }
+
+@app.get("/api/analytics/stats")
+async def analytics_stats():
+    """Get snapshot ring buffer occupancy and memory use"""
+    return history.stats()
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Get cache statistics (counters only, no walk over the entries)"""
+    lookups = cache.l1.hits + cache.l1.misses
+    return {
+        "total_entries": len(cache.l1),
+        "expirations": cache.l1.expirations,
+        "evictions": cache.l1.evictions,
         "cache_ttl_seconds": CACHE_TTL,
-        "hit_ratio": round(valid_entries / max(total_entries, 1), 3)
+        "hit_ratio": round(cache.l1.hits / max(lookups, 1), 3),
+        "requests": {
+            "hits": cache_lookups["hits"],
+            "misses": cache_lookups["misses"],
+            "hit_ratio": round(cache_lookups["hits"] / max(cache_lookups["hits"] + cache_lookups["misses"], 1), 3)
+        },
+        "prewarm": {
+            "enabled": PREWARM_ENABLED,
+            "interval_seconds": PREWARM_INTERVAL,
+            "top_k": PREWARM_TOP_K,
+            **prewarm_stats
+        },
+        "popularity": popularity.stats(),
+        "tiers": cache.stats()
+    }
+
+@app.get("/api/quota/stats")
+async def get_quota_stats():
+    """Get upstream quota usage, projected exhaustion and the per-base TTL plan"""
+    return {
+        **quota.stats(),
+        **quota_stats,
+        "plan": refresh_planner.stats()
+    }
+
+@app.get("/api/fastpath/stats")
+async def fastpath_stats():
+    """Get requests answered by the raw ASGI fast path versus handed to FastAPI"""
+    return {
+        "enabled": FASTPATH_ENABLED,
+        "rate_limit_supported": FAST_RATE_LIMIT_SUPPORTED,
+        **fast_routes.stats(),
+        "verified_tokens": len(verified_tokens)
     }
 
+@app.get("/api/compression/stats")
+async def get_compression_stats():
+    """Bytes saved versus CPU spent per compression algorithm"""
+    return {
+        "enabled": COMPRESSION_ENABLED,
+        "algorithms_available": list(compression_codecs),
+        **compression_stats.snapshot()
+    }
+
+@app.get("/api/microbatch/stats")
+async def microbatch_stats():
+    """Get /api/convert micro-batch sizes, flush reasons and batching wait"""
+    return {"enabled": convert_batcher is not None, **(convert_batcher.stats() if convert_batcher else {})}
+
+@app.get("/api/recorder/stats")
+async def recorder_stats():
+    """Get traffic recorder counters (disabled unless TRAFFIC_RECORD_PATH is set)"""
+    return {"enabled": traffic_recorder is not None, **(traffic_recorder.stats() if traffic_recorder else {})}
+
+@app.get("/api/cluster/stats")
+async def cluster_stats():
+    """Get this node's cluster role, lease state and snapshot versions"""
+    return cluster.stats()
+
+@app.get("/api/admission/stats")
+async def admission_stats():
+    """Get upstream admission queue depth and shed counts"""
+    return admission.stats()
+
+@app.post("/api/admin/profile")
+async def profile_window(
+    seconds: float = Query(5.0, gt=0, le=60),
+    interval_ms: float = Query(1.0, ge=0.1, le=100),
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    """Sample the event loop for a time window and return folded flame stacks"""
+    verify_admin(x_admin_token)
+    
+    profiler = SamplingProfiler(thread_id=threading.get_ident(), interval=interval_ms / 1000)
+    try:
+        profiler.start()
+    except RuntimeError:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.stop()
+    return profiler.result()
+
+@app.get("/api/admin/diagnostics/loop")
+async def loop_diagnostics(x_admin_token: Optional[str] = Header(default=None)):
+    """Event-loop scheduling lag histogram and stacks captured during stalls"""
+    verify_admin(x_admin_token)
+    return loop_lag.stats()
+
+@app.get("/api/admin/diagnostics/memory")
+async def memory_stats(
+    top: int = Query(10, ge=1, le=100),
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    """RSS, GC statistics, cache sizes and, while tracing, the top allocators"""
+    verify_admin(x_admin_token)
+    return {
+        **memory_diagnostics.stats(limit=top),
+        "caches": {
+            "l1_entries": len(cache.l1),
+            "l1_max_entries": cache.l1.max_entries,
+            "last_snapshots": len(last_snapshots),
+            "history_bytes": history.stats()["memory_bytes"]
+        }
+    }
+
+@app.post("/api/admin/diagnostics/tracemalloc")
+async def tracemalloc_control(
+    action: str = Query(..., pattern="^(start|snapshot|stop)$"),
+    frames: int = Query(1, ge=1, le=25),
+    top: int = Query(10, ge=1, le=100),
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    """Start tracing, take a baseline snapshot, or stop tracing"""
+    verify_admin(x_admin_token)
+    if action == "start":
+        return {"started": memory_diagnostics.start(frames), "frames": frames}
+    if action == "stop":
+        return {"stopped": memory_diagnostics.stop()}
+    try:
+        return memory_diagnostics.snapshot(limit=top)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.get("/api/admin/diagnostics/tracemalloc/diff")
+async def tracemalloc_diff(
+    top: int = Query(10, ge=1, le=100),
+    x_admin_token: Optional[str] = Header(default=None)
+):
+    """Allocation growth since the baseline snapshot"""
+    verify_admin(x_admin_token)
+    try:
+        return memory_diagnostics.diff(limit=top)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
 @app.delete("/api/cache/clear")
 async def clear_cache():
     """Clear all cache entries"""
-    cleared_count = len(cache)
-    cache.clear()
+    cleared_count = await cache.clear() + matrix_cache.clear()
     return {
         "message": "Cache cleared",
         "cleared_entries": cleared_count,
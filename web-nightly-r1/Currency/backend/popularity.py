@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Currency Popularity Tracker
+
+Exponentially decayed request counters for base currencies and pairs.
+Recording is O(1): instead of decaying every key on each tick, new hits are
+weighted by 2^(age/half_life) against a shared reference time, which keeps
+all scores on the same scale so ranking needs no per-key bookkeeping.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import heapq
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Rescale stored weights before they approach float overflow
+_RESCALE_EXPONENT = 512.0
+
+
+class DecayedCounter:
+    """Bounded set of keys with exponentially decaying scores"""
+
+    def __init__(self, half_life: float, max_keys: int = 1024):
+        self.half_life = half_life
+        self.max_keys = max_keys
+        self._scores: Dict[str, float] = {}
+        self._reference = time.monotonic()
+
+    def _decay(self, now: float) -> float:
+        """Factor turning stored weights into current scores; underflows to 0.0, never overflows"""
+        return 2.0 ** -((now - self._reference) / self.half_life)
+
+    def _weight(self, now: float) -> float:
+        exponent = (now - self._reference) / self.half_life
+        if exponent > _RESCALE_EXPONENT:
+            # Scaling down by the decay keeps long idle periods finite (scores simply reach 0)
+            decay = self._decay(now)
+            self._scores = {key: score * decay for key, score in self._scores.items()}
+            self._reference = now
+            exponent = 0.0
+        return 2.0 ** exponent
+
+    def record(self, key: str, weight: float = 1.0) -> None:
+        # _weight may rescale, replacing the score dict, so it runs first
+        weight *= self._weight(time.monotonic())
+        scores = self._scores
+        scores[key] = scores.get(key, 0.0) + weight
+        if len(scores) > self.max_keys:
+            # Drop the colder half in one pass instead of evicting per insert
+            keep = heapq.nlargest(self.max_keys // 2, scores.items(), key=lambda item: item[1])
+            self._scores = dict(keep)
+
+    def score(self, key: str) -> float:
+        """Current decayed score of a key (equivalent hits at full weight)"""
+        return self._scores.get(key, 0.0) * self._decay(time.monotonic())
+
+    def top(self, k: int) -> List[Tuple[str, float]]:
+        """The k hottest keys with their decayed scores"""
+        decay = self._decay(time.monotonic())
+        best = heapq.nlargest(k, self._scores.items(), key=lambda item: item[1])
+        return [(key, score * decay) for key, score in best]
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+class PopularityTracker:
+    """Tracks which bases and pairs are requested most, recency-weighted"""
+
+    def __init__(self, half_life: float = 3600.0, max_keys: int = 1024):
+        self.bases = DecayedCounter(half_life, max_keys)
+        self.pairs = DecayedCounter(half_life, max_keys)
+
+    def record(self, base: str, target: Optional[str] = None) -> None:
+        self.bases.record(base)
+        if target:
+            self.pairs.record(f"{base}:{target}")
+
+    def top_bases(self, k: int, min_score: float = 0.0) -> List[str]:
+        return [base for base, score in self.bases.top(k) if score > min_score]
+
+    def stats(self, k: int = 10) -> Dict:
+        return {
+            "half_life_seconds": self.bases.half_life,
+            "tracked_bases": len(self.bases),
+            "tracked_pairs": len(self.pairs),
+            "top_bases": [{"base": key, "score": round(score, 2)} for key, score in self.bases.top(k)],
+            "top_pairs": [{"pair": key, "score": round(score, 2)} for key, score in self.pairs.top(k)],
+        }
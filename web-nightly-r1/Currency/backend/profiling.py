@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Kconvert - On-Demand Sampling Profiler
+
+Dependency-free wall-clock sampler for the event-loop thread.
+A daemon thread periodically reads the loop thread's stack and aggregates
+it into collapsed ("folded") stacks, the input format for flamegraph.pl
+and speedscope. Nothing runs until a profile is requested.
+
+The loop thread runs every in-flight request, so a profile is loop-wide:
+it covers one request's time window, including anything else the loop
+did meanwhile.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+MAX_STACK_DEPTH = 64
+
+# Only one profile may run at a time; overlapping samplers would skew each other
+_profile_lock = threading.Lock()
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def format_stack(frame, limit: int = MAX_STACK_DEPTH) -> List[str]:
+    """Stack of a frame as labels, outermost first"""
+    labels = []
+    while frame is not None and len(labels) < limit:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class SamplingProfiler:
+    """Samples one thread's stack at a fixed interval from a helper thread"""
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.001):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = max(interval, 0.0001)
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at = 0.0
+        self._duration = 0.0
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples[";".join(format_stack(frame))] += 1
+            self.sample_count += 1
+
+    def start(self) -> None:
+        if not _profile_lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="kconvert-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._duration = time.perf_counter() - self._started_at
+        _profile_lock.release()
+
+    def folded(self) -> List[str]:
+        """Collapsed stacks, heaviest first"""
+        return [f"{stack} {count}" for stack, count in self.samples.most_common()]
+
+    def result(self) -> Dict:
+        return {
+            "samples": self.sample_count,
+            "interval_ms": round(self.interval * 1000, 3),
+            "duration_ms": round(self._duration * 1000, 2),
+            "format": "folded",
+            "folded": self.folded(),
+        }
+
+
+class RequestProfilerMiddleware:
+    """
+    Profiles the time window of a single request when it carries `X-Profile: 1`
+    and an authorized admin token; the response body is replaced by the flame
+    data.
+
+    The sampler reads the event-loop thread, which every request shares, so the
+    profile covers whatever the loop ran during that window, not just this
+    request. The result says so ("scope": "event_loop") and reports how many
+    other requests overlapped the window; only a profile with none of them is
+    the request's own.
+    """
+
+    def __init__(self, app, is_authorized: Callable[[Optional[str]], bool], interval: float = 0.001):
+        self.app = app
+        self.is_authorized = is_authorized
+        self.interval = interval
+        self.in_flight = 0
+        self.started = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        self.started += 1
+        try:
+            await self._handle(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    async def _handle(self, scope, receive, send):
+        headers = dict(scope["headers"])
+        if headers.get(b"x-profile") != b"1":
+            await self.app(scope, receive, send)
+            return
+
+        admin_token = headers.get(b"x-admin-token")
+        if not self.is_authorized(admin_token.decode("latin-1") if admin_token else None):
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+
+        profiler = SamplingProfiler(interval=self.interval)
+        try:
+            profiler.start()
+        except RuntimeError:
+            await self.app(scope, receive, send)
+            return
+        # Requests already running, plus those started before this one finishes
+        running, started = self.in_flight - 1, self.started
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            profiler.stop()
+
+        body = json.dumps({
+            "path": scope["path"],
+            "status_code": status["code"],
+            "scope": "event_loop",
+            "overlapping_requests": running + self.started - started,
+            **profiler.result(),
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Snapshot History & Rolling Analytics
+
+Fixed-size per-base ring buffers (time x currency, float64) of refreshed
+rate snapshots. Memory is preallocated: capacity * currencies * 8 bytes per
+base, with at most `max_bases` rings kept (least recently written evicted).
+Pair analytics are computed vectorized over the buffered window.
+
+A point is recorded per upstream update (time_last_update_unix), not per
+fetch: refetching an unchanged snapshot would only add flat duplicates. So a
+window holds about window / update period points, and one shorter than the
+upstream update period holds at most one.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class SnapshotRing:
+    """Ring buffer of snapshots for one base currency"""
+
+    def __init__(self, capacity: int, codes: List[str]):
+        self.capacity = capacity
+        self.index = {code: i for i, code in enumerate(codes)}
+        self.timestamps = np.full(capacity, np.nan)
+        self.values = np.full((capacity, len(codes)), np.nan)
+        self.head = 0
+        self.size = 0
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        if not self.size:
+            return None
+        return float(self.timestamps[(self.head - 1) % self.capacity])
+
+    def append(self, timestamp: float, rates: Dict[str, float]) -> None:
+        row = self.values[self.head]
+        row.fill(np.nan)
+        index = self.index
+        for code, rate in rates.items():
+            column = index.get(code)
+            if column is not None:
+                row[column] = rate
+        self.timestamps[self.head] = timestamp
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def window(self, since: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Chronologically ordered (timestamps, values) with timestamp >= since"""
+        order = (self.head - self.size + np.arange(self.size)) % self.capacity
+        timestamps = self.timestamps[order]
+        mask = timestamps >= since
+        return timestamps[mask], self.values[order][mask]
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + self.values.nbytes
+
+
+class SnapshotHistory:
+    """Bounded set of per-base snapshot rings"""
+
+    def __init__(self, codes: List[str], capacity: int = 288, max_bases: int = 32):
+        self.codes = list(codes)
+        self.capacity = max(2, capacity)
+        self.max_bases = max(1, max_bases)
+        self._rings: "OrderedDict[str, SnapshotRing]" = OrderedDict()
+
+    def record(self, base: str, timestamp: float, rates: Dict[str, float]) -> bool:
+        """Append a snapshot; repeated upstream timestamps are ignored"""
+        ring = self._rings.get(base)
+        if ring is None:
+            ring = self._rings[base] = SnapshotRing(self.capacity, self.codes)
+            if len(self._rings) > self.max_bases:
+                self._rings.popitem(last=False)
+        elif ring.last_timestamp is not None and timestamp <= ring.last_timestamp:
+            return False
+        self._rings.move_to_end(base)
+        ring.append(timestamp, rates)
+        return True
+
+    def pair_series(self, base: str, target: str, since: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rate series of base->target. Uses the base's own ring when present,
+        otherwise derives the cross rate from the fullest ring holding both.
+        """
+        ring = self._rings.get(base)
+        if ring is not None and target in ring.index:
+            timestamps, values = ring.window(since)
+            return timestamps, values[:, ring.index[target]]
+
+        candidates = [r for r in self._rings.values() if base in r.index and target in r.index]
+        if not candidates:
+            return np.empty(0), np.empty(0)
+        ring = max(candidates, key=lambda r: r.size)
+        timestamps, values = ring.window(since)
+        return timestamps, values[:, ring.index[target]] / values[:, ring.index[base]]
+
+    def analytics(self, base: str, target: str, window_seconds: float, rolling: int) -> Optional[Dict]:
+        timestamps, series = self.pair_series(base, target, time.time() - window_seconds)
+        valid = ~np.isnan(series)
+        timestamps, series = timestamps[valid], series[valid]
+        if series.size == 0:
+            return None
+
+        first, last = float(series[0]), float(series[-1])
+        log_returns = np.diff(np.log(series))
+        result = {
+            "points": int(series.size),
+            "from_timestamp": float(timestamps[0]),
+            "to_timestamp": float(timestamps[-1]),
+            "ohlc": {
+                "open": first,
+                "high": float(series.max()),
+                "low": float(series.min()),
+                "close": last,
+            },
+            "change": last - first,
+            "change_pct": (last - first) / first * 100 if first else None,
+            "mean": float(series.mean()),
+            "volatility": float(log_returns.std(ddof=1)) if log_returns.size > 1 else None,
+            "rolling_window": rolling,
+            "rolling_volatility": [],
+        }
+        if log_returns.size >= rolling > 1:
+            windows = np.lib.stride_tricks.sliding_window_view(log_returns, rolling)
+            result["rolling_volatility"] = windows.std(axis=1, ddof=1).tolist()
+        return result
+
+    def stats(self) -> Dict:
+        return {
+            "capacity": self.capacity,
+            "max_bases": self.max_bases,
+            "currencies": len(self.codes),
+            "bases": {base: ring.size for base, ring in self._rings.items()},
+            "memory_bytes": sum(ring.nbytes for ring in self._rings.values()),
+            "max_memory_bytes": self.max_bases * self.capacity * (len(self.codes) + 1) * 8,
+        }
+
+
+def parse_window(window: str) -> float:
+    """'90m', '24h', '7d' or plain seconds -> seconds; ValueError unless finite and positive"""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    window = window.strip().lower()
+    if window and window[-1] in units:
+        seconds = float(window[:-1]) * units[window[-1]]
+    else:
+        seconds = float(window)
+    if not math.isfinite(seconds) or seconds <= 0:
+        raise ValueError(f"Window must be finite and positive: {window!r}")
+    return seconds
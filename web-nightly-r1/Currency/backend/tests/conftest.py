@@ -0,0 +1,95 @@
+"""
+Kconvert - Test Fixtures
+
+The app is imported once with the fast path on, no Redis, no prewarm and
+rate limits high enough not to interfere. Exchange rate API calls go to an
+in-process stub, so no network or API key is needed.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import os
+import sys
+
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key-0123456789abcdef")
+os.environ.setdefault("EXCHANGE_API_KEY", "test")
+os.environ["FASTPATH_ENABLED"] = "true"
+os.environ["PREWARM_ENABLED"] = "false"
+os.environ["LOOP_LAG_ENABLED"] = "false"
+os.environ["CONVERT_BATCH_ENABLED"] = "false"
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "1000000000")
+os.environ.pop("REDIS_URL", None)
+os.environ.pop("TRAFFIC_RECORD_PATH", None)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+import main_optimized  # noqa: E402
+
+CLIENT = ("127.0.0.1", 123)
+RATES = {code: 1.0 + index / 7 for index, code in enumerate(main_optimized.CURRENCIES)}
+RATES["USD"] = 1.0
+
+
+class UpstreamStub:
+    """Exchange rate API answering every base from RATES, counting its calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def snapshot(self, base: str) -> dict:
+        rates = {code: value / RATES[base] for code, value in RATES.items()}
+        return {"result": "success", "base_code": base, "conversion_rates": rates, "time_last_update_unix": 1}
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        return httpx.Response(200, json=self.snapshot(request.url.path.rsplit("/", 1)[1]))
+
+
+@pytest.fixture
+def app_module():
+    return main_optimized
+
+
+@pytest.fixture
+def upstream(app_module):
+    stub = UpstreamStub()
+    saved = app_module.http_client
+    app_module.http_client = httpx.AsyncClient(transport=httpx.MockTransport(stub))
+    yield stub
+    app_module.http_client = saved
+
+
+@pytest.fixture
+def reset(app_module, upstream):
+    """Empty caches and counters, then seed L1 with snapshots of `bases`"""
+
+    def reset(bases=("USD", "EUR")):
+        app_module.cache.l1.clear()
+        app_module.cache.l1.hits = app_module.cache.l1.misses = 0
+        app_module.cache_lookups.update(hits=0, misses=0)
+        app_module.popularity.__init__(half_life=app_module.popularity.bases.half_life)
+        app_module.limiter.reset()
+        app_module.cluster.versions.clear()
+        app_module.verified_tokens.__init__(max_entries=app_module.verified_tokens.max_entries)
+        for base in bases:
+            app_module.cache.set_local(app_module.get_cache_key(base), upstream.snapshot(base), ttl=300)
+        upstream.calls = 0
+
+    reset()
+    return reset
+
+
+@pytest.fixture
+def token(app_module):
+    return app_module.create_jwt()
+
+
+@pytest.fixture
+async def client(app_module, upstream):
+    transport = httpx.ASGITransport(app=app_module.app, client=CLIENT)
+    async with httpx.AsyncClient(transport=transport, base_url="http://kconvert") as client:
+        yield client
@@ -0,0 +1,92 @@
+"""
+Kconvert - Admission Control Tests
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected
+
+
+@pytest.fixture
+def admission(app_module, monkeypatch):
+    """One-slot controller installed in the app; tests adjust its deadline"""
+    controller = AdmissionController(max_concurrency=1, queue_timeout=0.05, max_queue=4)
+    monkeypatch.setattr(app_module, "admission", controller)
+    return controller
+
+
+async def hold(controller, started: asyncio.Event, release: asyncio.Event):
+    async with controller.admit():
+        started.set()
+        await release.wait()
+
+
+async def test_only_upstream_work_feeds_the_service_time():
+    controller = AdmissionController(max_concurrency=2, queue_timeout=1.0, max_queue=0)
+    async with controller.admit():
+        # A cache re-check hit returns without calling upstream
+        await asyncio.sleep(0.01)
+    assert controller.stats()["avg_upstream_seconds"] == 0.5
+
+    async with controller.admit() as slot:
+        slot.start()
+    assert controller.stats()["avg_upstream_seconds"] == pytest.approx(0.4, abs=0.01)
+
+
+async def test_slot_is_released_when_the_block_raises():
+    controller = AdmissionController(max_concurrency=1, queue_timeout=0.05, max_queue=0)
+    with pytest.raises(RuntimeError):
+        async with controller.admit() as slot:
+            slot.start()
+            raise RuntimeError("upstream blew up")
+    assert (controller.in_flight, controller.queue_depth) == (0, 0)
+
+    async with controller.admit():
+        pass
+    assert controller.stats()["admitted"] == 2
+    assert controller.stats()["shed"]["total"] == 0
+
+
+async def test_queue_wait_past_the_deadline_is_shed():
+    controller = AdmissionController(max_concurrency=1, queue_timeout=0.05, max_queue=4)
+    controller._avg_service_time = 0.01
+    started, release = asyncio.Event(), asyncio.Event()
+    holder = asyncio.ensure_future(hold(controller, started, release))
+    await started.wait()
+
+    with pytest.raises(AdmissionRejected) as shed:
+        async with controller.admit():
+            pass
+    assert shed.value.reason == "timeout"
+    assert shed.value.retry_after >= 1
+    assert controller.queue_depth == 0
+
+    release.set()
+    await holder
+    assert controller.in_flight == 0
+
+
+async def test_shed_fetch_answers_503_with_retry_after(admission, client, reset, token, upstream):
+    reset(bases=())
+    started, release = asyncio.Event(), asyncio.Event()
+    holder = asyncio.ensure_future(hold(admission, started, release))
+    await started.wait()
+
+    # One request holds the only slot and the average says it takes 0.5s
+    response = await client.get(f"/api/convert?token={token}&amount=1&from=JPY&to=EUR")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(admission.retry_after())
+    assert admission.stats()["shed"]["deadline"] == 1
+    assert upstream.calls == 0
+
+    release.set()
+    await holder
+    response = await client.get(f"/api/convert?token={token}&amount=1&from=JPY&to=EUR")
+    assert response.status_code == 200
+    assert upstream.calls == 1
+    assert admission.stats()["avg_upstream_seconds"] < 0.5
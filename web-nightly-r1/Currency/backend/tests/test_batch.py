@@ -0,0 +1,84 @@
+"""
+Kconvert - Batch Endpoint Tests
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import pytest
+
+
+def batch_url(token):
+    return f"/api/batch?token={token}"
+
+
+async def test_operations_match_their_get_endpoints(client, reset, token):
+    operations = [
+        {"op": "convert", "amount": 125.5, "from": "USD", "to": "EUR"},
+        {"op": "rates", "base": "EUR", "targets": "USD,GBP"},
+        {"op": "batch-convert", "amount": 10, "from": "EUR", "to": "USD,JPY", "mode": "fixed"},
+    ]
+    response = await client.post(batch_url(token), json={"operations": operations})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_operations"] == 3 and body["failed_operations"] == 0
+    convert, rates, batch_convert = (result["result"] for result in body["results"])
+
+    single = (await client.get(f"/api/convert?token={token}&amount=125.5&from=USD&to=EUR")).json()
+    assert convert["converted_amount"] == single["converted_amount"]
+    single = (await client.get(f"/api/rates/EUR?token={token}&targets=USD,GBP")).json()
+    assert rates["conversion_rates"] == single["conversion_rates"]
+    single = (await client.get(f"/api/batch-convert?token={token}&amount=10&from=EUR&to=USD,JPY&mode=fixed")).json()
+    assert batch_convert["conversions"] == single["conversions"]
+
+
+async def test_each_base_is_fetched_once(client, reset, upstream, token):
+    reset(bases=())
+    operations = [
+        {"op": "convert", "amount": 1, "from": "GBP", "to": "EUR"},
+        {"op": "rates", "base": "GBP", "targets": "USD"},
+        {"op": "batch-convert", "amount": 2, "from": "GBP", "to": "USD,JPY"},
+        {"op": "convert", "amount": 3, "from": "JPY", "to": "JPY"},
+    ]
+    response = await client.post(batch_url(token), json={"operations": operations})
+    assert response.json()["failed_operations"] == 0
+    assert upstream.calls == 1
+    assert set(response.json()["snapshot_versions"]) == {"GBP"}
+
+
+async def test_invalid_operations_fail_alone(client, reset, token):
+    operations = [
+        {"op": "convert", "amount": 1, "from": "USD", "to": "XXX"},
+        {"op": "convert", "amount": -1, "from": "USD", "to": "EUR"},
+        {"op": "rates", "base": "USD", "targets": ""},
+        {"op": "convert", "amount": 1, "from": "USD", "to": "EUR"},
+    ]
+    response = await client.post(batch_url(token), json={"operations": operations})
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["results"]] == [400, 400, 400, 200]
+    assert response.json()["failed_operations"] == 3
+
+
+@pytest.mark.parametrize("count", [0, 51])
+async def test_batch_size_is_bounded(client, reset, token, count):
+    operations = [{"op": "convert", "amount": 1, "from": "USD", "to": "EUR"}] * count
+    response = await client.post(batch_url(token), json={"operations": operations})
+    assert response.status_code == 400
+
+
+async def test_bad_token_is_rejected(client, reset):
+    operations = [{"op": "convert", "amount": 1, "from": "USD", "to": "EUR"}]
+    response = await client.post(batch_url("not-a-valid-token"), json={"operations": operations})
+    assert response.status_code == 403
+
+
+async def test_each_operation_costs_one_rate_limit_hit(app_module, client, reset, token):
+    limit = app_module.limiter._route_limits["main_optimized.batch"][0].limit
+    app_module.limiter.limiter.hit(limit, "127.0.0.1", "/api/batch", cost=limit.amount - 2)
+    operation = {"op": "convert", "amount": 1, "from": "USD", "to": "EUR"}
+
+    response = await client.post(batch_url(token), json={"operations": [operation] * 2})
+    assert response.status_code == 200
+    # Had the batch cost a single hit, one more operation would still fit
+    response = await client.post(batch_url(token), json={"operations": [operation]})
+    assert response.status_code == 429
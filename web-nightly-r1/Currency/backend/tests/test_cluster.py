@@ -0,0 +1,142 @@
+"""
+Kconvert - Cluster Coordination Tests
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+from fastapi import HTTPException
+
+from cluster import ClusterCoordinator
+
+
+@pytest.fixture
+def redis():
+    return FakeAsyncRedis(server=FakeServer(), decode_responses=True)
+
+
+def coordinator(redis, installed=None, on_request=None, **kwargs):
+    node = ClusterCoordinator(lease_ttl=kwargs.pop("lease_ttl", 15.0), **kwargs)
+
+    def on_snapshot(base, data, ttl):
+        if installed is not None:
+            installed.append((base, data, ttl))
+
+    async def no_request(base):
+        pass
+
+    node.attach(redis, on_snapshot=on_snapshot, on_request=on_request or no_request)
+    return node
+
+
+async def test_one_node_holds_the_lease_and_renews_it(redis):
+    a, b = coordinator(redis), coordinator(redis)
+    assert await a.campaign()
+    assert not await b.campaign()
+    await redis.pexpire(a.lease_key, 100)
+    assert await a.campaign()
+    assert await redis.pttl(a.lease_key) > 1000
+    assert a.stats()["role"] == "leader" and b.stats()["role"] == "follower"
+
+
+async def test_lease_is_lost_to_another_holder_and_released(redis):
+    a, b = coordinator(redis), coordinator(redis)
+    await a.campaign()
+    await redis.set(a.lease_key, "someone-else")
+    assert not await a.campaign()
+    assert a.stats_counters["leadership_lost"] == 1
+
+    await redis.delete(a.lease_key)
+    assert await b.campaign()
+    await b.release()
+    assert await redis.get(b.lease_key) is None
+    assert await a.campaign()
+
+
+async def test_redis_failure_gives_up_leadership():
+    server = FakeServer()
+    node = coordinator(FakeAsyncRedis(server=server, decode_responses=True))
+    assert await node.campaign()
+    server.connected = False
+    assert not await node.campaign()
+    assert not node.should_fetch()
+
+
+async def test_follower_installs_newer_versions_with_their_remaining_ttl(redis):
+    installed = []
+    leader, follower = coordinator(redis), coordinator(redis, installed)
+    await leader.campaign()
+    expires_at = time.time() + 30
+    await leader.publish("USD", {"snapshot_version": 2, "rates": 1}, expires_at=expires_at)
+    assert await follower.load_snapshots() == 1
+    assert installed[0][2] == pytest.approx(30, abs=1)
+    assert follower.snapshot_expiry("USD", 2) == expires_at
+    assert follower.snapshot_expiry("USD", 1) is None
+
+    stale = {"node": "x", "base": "USD", "version": 1, "expires_at": expires_at, "data": {}}
+    follower._install(json.dumps(stale))
+    expired = dict(stale, version=3, expires_at=time.time() - 1)
+    follower._install(json.dumps(expired))
+    assert follower.stats_counters["stale_dropped"] == 2
+    assert follower.versions["USD"] == 2
+
+
+async def test_follower_request_is_answered_by_the_leader(redis):
+    async def serve(base):
+        await leader.publish(base, {"snapshot_version": 1, "base_code": base}, expires_at=time.time() + 60)
+
+    leader = coordinator(redis, on_request=serve)
+    follower = coordinator(redis, [], request_timeout=2.0)
+    await leader.start()
+    await follower.start()
+    try:
+        assert leader.is_leader and not follower.is_leader
+        # Both listeners need to be subscribed before the request goes out
+        await asyncio.sleep(0.05)
+        results = await asyncio.gather(follower.request("EUR"), follower.request("EUR"))
+        assert results == [{"snapshot_version": 1, "base_code": "EUR"}] * 2
+        assert follower.stats_counters["requests_sent"] == 1
+        assert leader.stats_counters["requests_served"] == 1
+    finally:
+        await follower.stop()
+        await leader.stop()
+
+
+async def test_follower_request_times_out_without_a_leader(redis):
+    follower = coordinator(redis, [], request_timeout=0.05)
+    assert await follower.request("EUR") is None
+    assert follower.stats_counters["request_timeouts"] == 1
+    assert follower.stats()["pending_requests"] == {}
+
+
+async def test_fetch_from_leader_falls_back_to_stale_then_503(app_module, monkeypatch):
+    async def no_answer(base):
+        return None
+
+    monkeypatch.setattr(app_module.cluster, "request", no_answer)
+    monkeypatch.setitem(app_module.last_snapshots, "CHF", {"base_code": "CHF"})
+    assert await app_module.fetch_from_leader("CHF") == {"base_code": "CHF"}
+    with pytest.raises(HTTPException) as error:
+        await app_module.fetch_from_leader("SEK")
+    assert error.value.status_code == 503
+
+
+async def test_leader_republishes_cached_snapshot_with_its_original_expiry(app_module, reset, redis, monkeypatch):
+    reset(bases=())
+    leader = coordinator(redis)
+    await leader.campaign()
+    monkeypatch.setattr(app_module, "cluster", leader)
+    data = await app_module.fetch_rates("GBP")
+    first = json.loads(await redis.hget(leader.snapshot_key, "GBP"))
+
+    await asyncio.sleep(0.01)
+    await app_module.serve_snapshot_request("GBP")
+    again = json.loads(await redis.hget(leader.snapshot_key, "GBP"))
+    assert again["version"] == data["snapshot_version"] == first["version"]
+    assert again["expires_at"] == first["expires_at"]
@@ -0,0 +1,56 @@
+"""
+Kconvert - Response Compression Tests
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from compression import CompressionMiddleware, CompressionStats, build_codecs
+
+
+async def small(request):
+    return JSONResponse({"rate": 1.0})
+
+
+async def large(request):
+    return JSONResponse({"rates": "x" * 4096})
+
+
+async def image(request):
+    return Response(b"\x89PNG" * 1024, media_type="image/png")
+
+
+@pytest.fixture
+async def client():
+    codecs = build_codecs()
+    app = Starlette(routes=[Route("/small", small), Route("/large", large), Route("/image", image)])
+    app.add_middleware(CompressionMiddleware, codecs=codecs, stats=CompressionStats(codecs), min_size=1024)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def test_compresses_large_json(client):
+    response = await client.get("/large", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < 4096
+    assert response.json() == {"rates": "x" * 4096}
+
+
+@pytest.mark.parametrize("path, accept", [("/small", "gzip"), ("/large", "identity"), ("/large", "")])
+async def test_negotiated_types_vary_even_uncompressed(client, path, accept):
+    response = await client.get(path, headers={"accept-encoding": accept})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+async def test_other_types_left_alone(client):
+    response = await client.get("/image", headers={"accept-encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
@@ -0,0 +1,135 @@
+"""
+Kconvert - Fast Path Conformance Tests
+
+Each case runs twice from the same seeded state, once with the fast routes
+registered and once with them removed. Status, headers, body and the
+cache/popularity bookkeeping must match; only timestamp and
+processing_time_ms may differ.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import pytest
+
+VOLATILE = ("timestamp", "processing_time_ms")
+# Lengths follow the volatile fields; each one is checked against its own body instead
+IGNORED_HEADERS = ("server-timing", "content-length")
+
+CASES = {
+    "convert live from base snapshot": ["/api/convert?token={token}&amount=100&from=USD&to=EUR"],
+    "convert after a rates request": [
+        "/api/rates/USD?token={token}&targets=EUR",
+        "/api/convert?token={token}&amount=12.5&from=USD&to=EUR",
+    ],
+    "convert same currency": ["/api/convert?token={token}&amount=3&from=EUR&to=EUR"],
+    "convert lowercase and padded": ["/api/convert?token={token}&amount=7.25&from=%20usd&to=eur%20"],
+    "convert duplicate params": ["/api/convert?token={token}&amount=1&amount=5&from=USD&to=EUR"],
+    "convert exponent amount": ["/api/convert?token={token}&amount=1e3&from=USD&to=EUR"],
+    "convert zero amount": ["/api/convert?token={token}&amount=0&from=USD&to=EUR"],
+    "convert huge amount": ["/api/convert?token={token}&amount=1000000001&from=USD&to=EUR"],
+    "convert missing amount": ["/api/convert?token={token}&from=USD&to=EUR"],
+    "convert unsupported": ["/api/convert?token={token}&amount=1&from=USD&to=XXX"],
+    "convert bad format": ["/api/convert?token={token}&amount=1&from=US&to=EUR"],
+    "convert bad token": ["/api/convert?token=not-a-valid-token&amount=1&from=USD&to=EUR"],
+    "convert unseen token": ["/api/convert?token={fresh}&amount=1&from=USD&to=EUR"],
+    "convert cold base": ["/api/convert?token={token}&amount=1&from=JPY&to=EUR"],
+    "convert fixed mode": ["/api/convert?token={token}&amount=1&from=USD&to=EUR&mode=fixed"],
+    "rates single target": ["/api/rates/USD?token={token}&targets=EUR"],
+    "rates repeated": ["/api/rates/usd?token={token}&targets=JPY,eur, GBP"] * 3,
+    "rates empty targets": ["/api/rates/USD?token={token}&targets=,"],
+    "rates unsupported": ["/api/rates/USD?token={token}&targets=EUR,XXX"],
+    "rates cold base": ["/api/rates/GBP?token={token}&targets=EUR"],
+    "rates trailing slash": ["/api/rates/USD/?token={token}&targets=EUR"],
+}
+
+
+@pytest.fixture
+def fast_path(app_module):
+    """Switch the fast routes on or off; restored afterwards"""
+    router = app_module.fast_routes
+    saved = (dict(router.exact), list(router.prefixes))
+
+    def switch(enabled: bool):
+        router.exact, router.prefixes = (dict(saved[0]), list(saved[1])) if enabled else ({}, [])
+
+    yield switch
+    router.exact, router.prefixes = saved
+
+
+@pytest.fixture
+def run(app_module, client, reset, upstream, fast_path, token):
+    """Responses and bookkeeping for `requests` issued from a freshly seeded state"""
+
+    async def run(fast: bool, requests, setup=None):
+        fast_path(fast)
+        reset()
+        # The regular token starts out verified; any other is new to each run
+        app_module.verify_jwt(token)
+        if setup:
+            setup()
+        results = [normalized(await client.get(url)) for url in requests]
+        return results, {
+            "lookups": dict(app_module.cache_lookups),
+            "l1": (app_module.cache.l1.hits, app_module.cache.l1.misses, len(app_module.cache.l1)),
+            "popularity": [
+                sorted((key, round(score, 3)) for key, score in counter.top(20))
+                for counter in (app_module.popularity.bases, app_module.popularity.pairs)
+            ],
+            "upstream_calls": upstream.calls,
+        }
+
+    return run
+
+
+def normalized(response) -> dict:
+    try:
+        body = response.json()
+    except ValueError:
+        body = response.text
+    if isinstance(body, dict):
+        body = {key: ("<volatile>" if key in VOLATILE else value) for key, value in body.items()}
+    headers = sorted((k, v) for k, v in response.headers.items() if k not in IGNORED_HEADERS)
+    assert int(response.headers.get("content-length", -1)) == len(response.content)
+    return {"status": response.status_code, "headers": headers, "body": body}
+
+
+@pytest.mark.parametrize("case", list(CASES))
+async def test_fast_path_matches_fastapi(app_module, run, token, case):
+    fresh = app_module.create_jwt()
+    requests = [url.format(token=token, fresh=fresh) for url in CASES[case]]
+    expected = await run(False, requests)
+    assert await run(True, requests) == expected
+
+
+async def test_fast_path_answers_cache_hits(app_module, run, token):
+    served = app_module.fast_routes.stats()["served"]
+    results, _ = await run(True, [f"/api/convert?token={token}&amount=100&from=USD&to=EUR"])
+    assert results[0]["status"] == 200
+    assert app_module.fast_routes.stats()["served"] == served + 1
+
+
+@pytest.mark.parametrize("fast", [False, True])
+async def test_rate_views_leave_only_snapshots_in_l1(run, token, fast):
+    _, seeded = await run(fast, [])
+    targets = ["EUR", "JPY", "EUR,JPY", "GBP,EUR", "AUD"]
+    results, state = await run(fast, [f"/api/rates/USD?token={token}&targets={t}" for t in targets])
+    assert [result["status"] for result in results] == [200] * len(targets)
+    assert results[2]["body"]["conversion_rates"].keys() == {"EUR", "JPY"}
+    assert state["l1"][2] == seeded["l1"][2]
+
+
+async def test_fast_path_applies_route_rate_limit(app_module, run, token):
+    def exhaust_convert_limit():
+        limit = app_module.limiter._route_limits["main_optimized.convert"][0].limit
+        # slowapi's default key style scopes counters by request path
+        app_module.limiter.limiter.hit(limit, "127.0.0.1", "/api/convert", cost=limit.amount)
+
+    requests = [f"/api/convert?token={token}&amount=1&from=USD&to=EUR"]
+    expected = await run(False, requests, exhaust_convert_limit)
+    assert expected[0][0]["status"] == 429
+    assert await run(True, requests, exhaust_convert_limit) == expected
+
+
+def test_installed_slowapi_supports_fast_path_limits(app_module):
+    assert app_module.FAST_RATE_LIMIT_SUPPORTED
@@ -0,0 +1,94 @@
+"""
+Kconvert - Streaming File Conversion Tests
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import csv
+import io
+import json
+
+import pytest
+
+import file_convert
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1024])
+async def test_lines_survive_any_chunking(size):
+    data = "amount,note\r\n1,café\r\n2,€中\r\n3".encode()
+    lines = await collect(file_convert.iter_lines(chunked(data, size)))
+    assert lines == ["amount,note", "1,café", "2,€中", "3"]
+
+
+async def test_over_long_line_is_rejected():
+    data = b"x" * 100
+    with pytest.raises(file_convert.RecordTooLong):
+        await collect(file_convert.iter_lines(chunked(data, 7), max_length=50))
+    with pytest.raises(file_convert.RecordTooLong):
+        await collect(file_convert.iter_lines(chunked(data + b"\n", 1000), max_length=50))
+
+
+async def test_csv_records_keep_quoted_newlines():
+    data = b'amount,note\n1,"two\nlines"\n2,"a ""quoted"", ok"\n3,5"\n'
+    records = file_convert.iter_csv_records(file_convert.iter_lines(chunked(data, 4)))
+    rows = list(csv.reader(await collect(records)))
+    assert rows == [["amount", "note"], ["1", "two\nlines"], ["2", 'a "quoted", ok'], ["3", '5"']]
+
+
+async def test_unterminated_quote_is_bounded():
+    data = b'amount,note\n1,"open\n' + b"2,x\n" * 50
+    records = file_convert.iter_csv_records(file_convert.iter_lines(chunked(data, 16)), max_length=64)
+    with pytest.raises(file_convert.RecordTooLong):
+        await collect(records)
+
+
+def test_csv_rows_mark_invalid_amounts():
+    text, rows, invalid = file_convert.convert_csv_rows(["10,a", "x,b", "", '2.5,"c\nd"'], 0, [("EUR", 0.5)])
+    assert (rows, invalid) == (3, 1)
+    assert list(csv.reader(io.StringIO(text))) == [["10", "a", "5.0"], ["x", "b", ""], ["2.5", "c\nd", "1.25"]]
+
+
+def test_ndjson_rows_mark_invalid_records():
+    lines = ['{"amount": 4}', "not json", "[1]", '{"amount": "x"}', ""]
+    text, rows, invalid = file_convert.convert_ndjson_rows(lines, "amount", [("EUR", 0.5), ("JPY", 100)])
+    records = [json.loads(line) for line in text.splitlines()]
+    assert (rows, invalid) == (4, 3)
+    assert records[0] == {"amount": 4, "converted": {"EUR": 2.0, "JPY": 400.0}}
+    assert records[1]["error"] == records[2]["error"] == "invalid_json"
+    assert records[3]["converted"] == {"EUR": None, "JPY": None}
+
+
+async def test_upload_endpoint_streams_csv(app_module, client, reset, upstream, token):
+    before = dict(app_module.file_convert_stats)
+    body = 'id,amount\r\n1,10\r\n2,"1,5"\r\n3,2\r\n'.encode()
+    response = await client.post(
+        f"/api/convert/file?token={token}&from=USD&to=EUR", content=body, headers={"content-type": "text/csv"}
+    )
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text)))
+    rate = upstream.snapshot("USD")["conversion_rates"]["EUR"]
+    assert rows[0] == ["id", "amount", "converted_EUR"]
+    assert rows[1][:2] == ["1", "10"] and float(rows[1][2]) == pytest.approx(10 * rate)
+    assert rows[2] == ["2", "1,5", ""]
+    stats = (await client.get("/api/convert/file/stats")).json()
+    assert stats["rows"] - before["rows"] == 3
+    assert stats["invalid_rows"] - before["invalid_rows"] == 1
+
+
+async def test_upload_endpoint_rejects_over_long_header(app_module, client, reset, token, monkeypatch):
+    monkeypatch.setattr(app_module, "FILE_CONVERT_MAX_RECORD", 32)
+    response = await client.post(
+        f"/api/convert/file?token={token}&from=USD&to=EUR", content=b"amount," + b"x" * 64 + b"\n1\n",
+        headers={"content-type": "text/csv"}
+    )
+    assert response.status_code == 413
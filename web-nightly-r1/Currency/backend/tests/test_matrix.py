@@ -0,0 +1,33 @@
+"""
+Kconvert - Rate Matrix Tests
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import numpy as np
+
+
+async def test_matrix_cells_are_cross_rates(client, reset, token):
+    response = await client.get(f"/api/matrix?token={token}&codes=USD,EUR,GBP")
+    body = response.json()
+    assert body["codes"] == ["USD", "EUR", "GBP"]
+    rates = np.array(body["rates"]).reshape(3, 3)
+    assert np.allclose(np.diag(rates), 1.0)
+    assert np.allclose(rates * rates.T, 1.0)
+
+
+async def test_only_the_full_set_is_cached(app_module, client, reset, token):
+    app_module.matrix_cache.clear()
+    snapshots = len(app_module.cache.l1)
+    for codes in ("USD,EUR", "EUR,GBP", "GBP,JPY"):
+        assert (await client.get(f"/api/matrix?token={token}&codes={codes}")).status_code == 200
+    assert len(app_module.matrix_cache) == 0
+    assert len(app_module.cache.l1) == snapshots
+
+    full = await client.get(f"/api/matrix?token={token}&format=f64")
+    again = await client.get(f"/api/matrix?token={token}&format=f64")
+    assert full.content == again.content
+    n = int(full.headers["x-matrix-size"])
+    assert len(full.content) == n * n * 8
+    assert len(app_module.matrix_cache) == 1
@@ -0,0 +1,49 @@
+"""
+Kconvert - Popularity Tracker Tests
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import time
+
+import pytest
+
+from popularity import DecayedCounter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_scores_halve_every_half_life(clock):
+    counter = DecayedCounter(half_life=10)
+    counter.record("USD", 4)
+    clock[0] += 20
+    counter.record("EUR")
+    assert counter.score("USD") == pytest.approx(1.0)
+    assert counter.top(2) == [("USD", pytest.approx(1.0)), ("EUR", pytest.approx(1.0))]
+
+
+def test_long_idle_period_does_not_overflow(clock):
+    counter = DecayedCounter(half_life=1)
+    counter.record("USD")
+    clock[0] += 1100
+    assert counter.score("USD") == 0.0
+    assert counter.top(1) == [("USD", 0.0)]
+    counter.record("EUR")
+    assert counter.top(1) == [("EUR", 1.0)]
+
+
+def test_rescaling_keeps_relative_scores(clock):
+    counter = DecayedCounter(half_life=1)
+    counter.record("USD", 2)
+    clock[0] += 300
+    counter.record("EUR")
+    clock[0] += 300
+    counter.record("GBP")
+    assert counter.score("GBP") == pytest.approx(1.0)
+    assert counter.score("EUR") == pytest.approx(2.0 ** -300)
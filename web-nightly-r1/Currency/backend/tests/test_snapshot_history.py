@@ -0,0 +1,58 @@
+"""
+Kconvert - Snapshot History Tests
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import time
+
+import pytest
+
+from snapshot_history import SnapshotHistory, parse_window
+
+
+@pytest.mark.parametrize("window, seconds", [("90m", 5400), ("24h", 86400), ("7d", 604800), (" 3600 ", 3600)])
+def test_parse_window(window, seconds):
+    assert parse_window(window) == seconds
+
+
+@pytest.mark.parametrize("window", ["nan", "inf", "-infh", "nand", "-1", "0", "0h", "", "h", "1w"])
+def test_parse_window_rejects(window):
+    with pytest.raises(ValueError):
+        parse_window(window)
+
+
+def test_record_keeps_one_point_per_upstream_update():
+    history = SnapshotHistory(["USD", "EUR"], capacity=4)
+    assert history.record("USD", 100.0, {"USD": 1.0, "EUR": 0.9})
+    assert not history.record("USD", 100.0, {"USD": 1.0, "EUR": 0.9})
+    assert history.record("USD", 200.0, {"USD": 1.0, "EUR": 0.8})
+    timestamps, series = history.pair_series("USD", "EUR", since=0)
+    assert timestamps.tolist() == [100.0, 200.0]
+    assert series.tolist() == [0.9, 0.8]
+
+
+@pytest.mark.parametrize("window", ["nan", "inf", "-5h", "1h"])
+async def test_analytics_rejects_bad_or_short_windows(client, token, window):
+    response = await client.get(f"/api/analytics/USD/EUR?token={token}&window={window}")
+    assert response.status_code == 400
+
+
+async def test_analytics_defaults_match_daily_resolution(app_module, client, token, monkeypatch):
+    history = SnapshotHistory(["USD", "EUR"], capacity=64)
+    monkeypatch.setattr(app_module, "history", history)
+    monkeypatch.setattr(app_module, "UPSTREAM_UPDATE_SECONDS", 86400.0)
+    now = time.time()
+    for day in range(40, 0, -1):
+        history.record("USD", now - day * 86400 + 60, {"USD": 1.0, "EUR": 0.9 + day / 1000})
+
+    body = (await client.get(f"/api/analytics/USD/EUR?token={token}")).json()
+    assert body["resolution_seconds"] == 86400
+    assert body["window_seconds"] == 30 * 86400
+    assert body["points"] == 30
+    assert body["rolling_window"] == 7
+    assert len(body["rolling_volatility"]) == 29 - 7 + 1
+
+    body = (await client.get(f"/api/analytics/USD/EUR?token={token}&window=7d&rolling=3")).json()
+    assert (body["points"], len(body["rolling_volatility"])) == (7, 4)
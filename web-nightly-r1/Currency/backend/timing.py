@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Server-Timing Instrumentation
+
+Per-request phase timings (monotonic clock) emitted as a Server-Timing header.
+Handlers wrap work in `phase("name")`; anything after the last measured phase
+until headers go out (response building + JSON encoding) is reported as
+`serialize`.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from starlette.datastructures import MutableHeaders
+
+
+class RequestTiming:
+    """Accumulated phase durations for one request"""
+
+    __slots__ = ("start", "last_mark", "phases")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last_mark = self.start
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, duration: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + duration
+        self.last_mark = time.perf_counter()
+
+    def elapsed(self) -> float:
+        """Seconds since the request entered the app"""
+        return time.perf_counter() - self.start
+
+    def header_value(self) -> str:
+        now = time.perf_counter()
+        parts = [f"{name};dur={duration * 1000:.3f}" for name, duration in self.phases.items()]
+        parts.append(f"serialize;dur={(now - self.last_mark) * 1000:.3f}")
+        parts.append(f"total;dur={(now - self.start) * 1000:.3f}")
+        return ", ".join(parts)
+
+
+_current_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+def current_timing() -> Optional[RequestTiming]:
+    """Timing object of the request being served, if any"""
+    return _current_timing.get()
+
+
+@contextmanager
+def phase(name: str):
+    """Measure a block and attribute it to `name` on the current request"""
+    timing = _current_timing.get()
+    if timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, time.perf_counter() - start)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware that attaches a Server-Timing header to every response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _current_timing.set(timing)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timing.header_value())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timing.reset(token)
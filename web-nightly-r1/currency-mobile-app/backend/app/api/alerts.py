@@ -0,0 +1,75 @@
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.models.alert import AlertCreateRequest, AlertResponse
+from app.services.alert_service import AlertService
+from app.services.currency_service import CurrencyService
+
+alert_router = APIRouter()
+
+@alert_router.post("/alerts", response_model=AlertResponse)
+async def create_alert(request: AlertCreateRequest):
+    """Register a one-shot rate threshold alert"""
+    from_currency = request.from_currency.upper()
+    to_currency = request.to_currency.upper()
+    
+    if not CurrencyService.is_valid_currency(from_currency):
+        raise HTTPException(status_code=400, detail=f"Invalid currency: {from_currency}")
+    
+    if not CurrencyService.is_valid_currency(to_currency):
+        raise HTTPException(status_code=400, detail=f"Invalid currency: {to_currency}")
+    
+    alert_id = AlertService.register(
+        request.client_id,
+        from_currency,
+        to_currency,
+        request.direction,
+        request.threshold,
+        request.webhook_url
+    )
+    return AlertService.describe(alert_id)
+
+@alert_router.get("/alerts/stats")
+async def alert_stats():
+    """Registered, active and delivered alert counts"""
+    return AlertService.stats()
+
+# Alerts belong to the client_id that registered them; other clients get a 404 as if they did not exist
+OwnerQuery = Query(..., min_length=1, max_length=128, description="client_id the alert was registered with")
+
+@alert_router.get("/alerts/{alert_id}", response_model=AlertResponse)
+async def get_alert(alert_id: int, client_id: str = OwnerQuery):
+    if not AlertService.owns(client_id, alert_id):
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return AlertService.describe(alert_id)
+
+@alert_router.delete("/alerts/{alert_id}")
+async def cancel_alert(alert_id: int, client_id: str = OwnerQuery):
+    if not AlertService.owns(client_id, alert_id) or not AlertService.cancel(alert_id):
+        raise HTTPException(status_code=404, detail="Alert not found or already fired")
+    return {"alert_id": alert_id, "cancelled": True}
+
+@alert_router.get("/alerts/stream/{client_id}")
+async def stream_alerts(client_id: str):
+    """Server-sent events channel delivering fired alerts for a client with registered alerts"""
+    if not AlertService.has_client(client_id):
+        raise HTTPException(status_code=404, detail="No alerts registered for this client")
+    queue = AlertService.subscribe(client_id)
+    if queue is None:
+        raise HTTPException(status_code=503, detail="Too many alert streams, retry later", headers={"Retry-After": "30"})
+    
+    async def events():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: alert\ndata: {json.dumps(event)}\n\n"
+        finally:
+            # Runs when the client disconnects, so its queue does not outlive the stream
+            AlertService.unsubscribe(client_id)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -1,14 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
+from typing import Dict, Optional
 from datetime import datetime
 from app.models.currency import (
     ConversionRequest, 
     ConversionResponse, 
     ExchangeRatesResponse,
     CurrencyListResponse,
+    CurrencySearchResponse,
+    PortfolioValuationRequest,
+    PortfolioValuationResponse,
     APIError
 )
+from currency_shared import currency_registry
 from app.services.currency_service import CurrencyService
+from app.services.portfolio_service import PortfolioService, UnpricedCurrencies
+from app.utils import wire_format
 
 currency_router = APIRouter()
 
@@ -19,12 +25,38 @@ async def get_currencies():
     return CurrencyListResponse(
         currencies=currencies,
         count=len(currencies),
-        timestamp=datetime.now()
+        timestamp=datetime.now(),
+        registry_version=currency_registry.REGISTRY_VERSION
+    )
+
+@currency_router.get("/currencies/search", response_model=CurrencySearchResponse)
+async def search_currencies(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=64),
+    limit: int = Query(10, ge=1, le=50),
+    include_obsolete: bool = False
+):
+    """Type-ahead search so clients need not download the full currency list"""
+    results = CurrencyService.search_currencies(q, limit=limit, include_obsolete=include_obsolete)
+    # Results only change with the registry version
+    response.headers["Cache-Control"] = "public, max-age=86400"
+    return CurrencySearchResponse(
+        query=q,
+        results=results,
+        count=len(results),
+        registry_version=currency_registry.REGISTRY_VERSION
     )
 
+@currency_router.get("/currencies/ordinals")
+async def get_currency_ordinals(response: Response):
+    """Ordinal table that indexes compact (f64) rate payloads; cache per registry version"""
+    response.headers["Cache-Control"] = "public, max-age=604800"
+    response.headers["ETag"] = f'"registry-{currency_registry.REGISTRY_VERSION}"'
+    return wire_format.ordinal_table()
+
 @currency_router.post("/convert", response_model=ConversionResponse)
-async def convert_currency(request: ConversionRequest):
-    """Convert currency amount"""
+async def convert_currency(request: ConversionRequest, response: Response, accept: Optional[str] = Header(default=None)):
+    """Convert currency amount (JSON, msgpack or f64 per the Accept header)"""
     # Validate currency codes
     if not CurrencyService.is_valid_currency(request.from_currency):
         raise HTTPException(
@@ -42,7 +74,8 @@ async def convert_currency(request: ConversionRequest):
     result = await CurrencyService.convert_currency(
         request.from_currency.upper(),
         request.to_currency.upper(),
-        request.amount
+        request.amount,
+        request.mode
     )
     
     if not result:
@@ -51,11 +84,23 @@ async def convert_currency(request: ConversionRequest):
             detail="Currency conversion service temporarily unavailable"
         )
     
+    media_type = wire_format.negotiate(accept)
+    if media_type == wire_format.MSGPACK:
+        payload = result.model_dump()
+        payload["timestamp"] = result.timestamp.timestamp()
+        return Response(wire_format.encode_msgpack(payload), media_type=media_type, headers={"Vary": "Accept"})
+    if media_type == wire_format.F64:
+        body = wire_format.encode_conversion_f64(
+            result.from_currency, result.to_currency, result.amount,
+            result.converted_amount, result.exchange_rate, result.timestamp.timestamp()
+        )
+        return Response(body, media_type=media_type, headers={"Vary": "Accept"})
+    response.headers["Vary"] = "Accept"
     return result
 
 @currency_router.get("/rates/{base_currency}", response_model=ExchangeRatesResponse)
-async def get_exchange_rates(base_currency: str):
-    """Get all exchange rates for a base currency"""
+async def get_exchange_rates(base_currency: str, response: Response, accept: Optional[str] = Header(default=None)):
+    """Get all exchange rates for a base currency (JSON, msgpack or f64 per the Accept header)"""
     base_currency = base_currency.upper()
     
     if not CurrencyService.is_valid_currency(base_currency):
@@ -72,10 +117,25 @@ async def get_exchange_rates(base_currency: str):
             detail="Exchange rate service temporarily unavailable"
         )
     
+    timestamp = datetime.now()
+    media_type = wire_format.negotiate(accept)
+    if media_type == wire_format.MSGPACK:
+        payload = {
+            "base_currency": base_currency,
+            "rates": rates,
+            "timestamp": timestamp.timestamp(),
+            "source": "exchangerate-api"
+        }
+        return Response(wire_format.encode_msgpack(payload), media_type=media_type, headers={"Vary": "Accept"})
+    if media_type == wire_format.F64:
+        body = wire_format.encode_rates_f64(base_currency, rates, timestamp.timestamp())
+        return Response(body, media_type=media_type, headers={"Vary": "Accept"})
+    
+    response.headers["Vary"] = "Accept"
     return ExchangeRatesResponse(
         base_currency=base_currency,
         rates=rates,
-        timestamp=datetime.now(),
+        timestamp=timestamp,
         source="exchangerate-api"
     )
 
@@ -105,3 +165,27 @@ async def get_single_rate(from_currency: str, to_currency: str):
         "exchange_rate": rates[to_currency],
         "timestamp": datetime.now()
     }
+
+@currency_router.post("/portfolio/value", response_model=PortfolioValuationResponse)
+async def value_portfolio(request: PortfolioValuationRequest):
+    """Value balances in several display currencies from one consistent snapshot"""
+    holdings = [(holding.currency.upper(), holding.amount) for holding in request.holdings]
+    targets = list(dict.fromkeys(target.upper() for target in request.targets))
+    
+    invalid = sorted({code for code, _ in holdings if not CurrencyService.is_valid_currency(code)} |
+                     {code for code in targets if not CurrencyService.is_valid_currency(code)})
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid currencies: {', '.join(invalid)}")
+    
+    try:
+        valuation = await PortfolioService.value(holdings, targets)
+    except UnpricedCurrencies as e:
+        # The snapshot loaded fine but has no rate for these; retrying will not help
+        raise HTTPException(status_code=422, detail=str(e))
+    if not valuation:
+        raise HTTPException(
+            status_code=503,
+            detail="Exchange rate service temporarily unavailable"
+        )
+    
+    return PortfolioValuationResponse(**valuation, timestamp=datetime.now())
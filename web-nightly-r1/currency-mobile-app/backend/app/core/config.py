@@ -15,10 +15,58 @@ class Settings(BaseSettings):
     FIXER_API_KEY: Optional[str] = None
     FIXER_API_URL: str = "https://api.fixer.io/v1"
     
+    # Upstream HTTP client (shared keep-alive pool)
+    UPSTREAM_HTTP2: bool = True
+    UPSTREAM_MAX_CONNECTIONS: int = 20
+    UPSTREAM_MAX_KEEPALIVE: int = 10
+    UPSTREAM_KEEPALIVE_EXPIRY: float = 30.0
+    UPSTREAM_CONNECT_TIMEOUT: float = 3.0
+    UPSTREAM_ATTEMPT_TIMEOUT: float = 5.0
+    UPSTREAM_MAX_ATTEMPTS: int = 3
+    UPSTREAM_BACKOFF_BASE: float = 0.2
+    UPSTREAM_BACKOFF_MAX: float = 2.0
+    UPSTREAM_RETRY_BUDGET_RATIO: float = 0.2  # Retries allowed per request, on average
+    
     # Cache Configuration
     CACHE_TTL: int = 3600  # 1 hour in seconds
+    CACHE_L1_TTL: int = 60  # In-process layer in front of Redis
+    CACHE_L1_MAX_ENTRIES: int = 512
+    CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"
     RATE_LIMIT_PER_MINUTE: int = 100
     
+    # Upstream quota (0 disables a limit); TTLs are planned between CACHE_TTL and QUOTA_MAX_TTL
+    QUOTA_MONTHLY_LIMIT: int = 0
+    QUOTA_DAILY_LIMIT: int = 0
+    QUOTA_RESET_DAY: int = 1  # Day of month the plan quota resets (UTC)
+    QUOTA_RESERVE_RATIO: float = 0.05  # Share of the quota kept out of the refresh plan
+    QUOTA_MAX_TTL: int = 86400
+    QUOTA_PLAN_BASES: int = 20
+    
+    # Conversion arithmetic: "float" or "fixed" (exact scaled integers, banker's rounding
+    # to each currency's minor units); a request's "mode" field overrides it
+    CONVERSION_MODE: str = "float"
+    
+    # Micro-batching of /convert: cache hits arriving in the same loop ticks share one
+    # snapshot read and one arithmetic pass; a batch stays open at most the window
+    CONVERT_BATCH_ENABLED: bool = False
+    CONVERT_BATCH_WINDOW_US: int = 500
+    CONVERT_BATCH_MAX: int = 256
+    
+    # Portfolio valuation: every holding and target is priced from this base's snapshot
+    PORTFOLIO_PIVOT: str = "USD"
+    
+    # Rate alerts
+    ALERT_REFRESH_INTERVAL: int = 300  # Seconds between snapshot checks for watched bases
+    ALERT_QUEUE_SIZE: int = 100  # Undelivered events kept per connected client
+    ALERT_MAX_STREAMS: int = 1000  # Open /alerts/stream connections across all clients
+    
+    # Traffic recording for capacity planning: off unless a path is set. Sampling is per
+    # client; tokens and IPs are stored as HMAC pseudonyms keyed by TRAFFIC_RECORD_KEY
+    TRAFFIC_RECORD_PATH: Optional[str] = None
+    TRAFFIC_RECORD_SAMPLE: float = 0.01
+    TRAFFIC_RECORD_KEY: Optional[str] = None
+    TRAFFIC_RECORD_MAX_MB: int = 256
+    
     # App Configuration
     DEBUG: bool = True
     API_V1_STR: str = "/api/v1"
@@ -1,18 +1,43 @@
+import asyncio
+from contextlib import suppress
+from functools import partial
+from datetime import datetime, timezone
 from fastapi import FastAPI, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import redis.asyncio as redis
 from app.core.config import settings
 from app.api.routes import currency_router
+from app.api.alerts import alert_router
 from app.services.redis_service import RedisService
+from app.services.currency_service import CurrencyService
+from currency_shared.tiered_cache import RedisCache
+from app.services.upstream_client import UpstreamClient
+from app.services.alert_service import AlertService
+from currency_shared.recorder import TrafficRecorder, TrafficRecorderMiddleware
 
 # Global Redis connection
 redis_client = None
 
+traffic_recorder = TrafficRecorder(
+    settings.TRAFFIC_RECORD_PATH,
+    sample_rate=settings.TRAFFIC_RECORD_SAMPLE,
+    key=settings.TRAFFIC_RECORD_KEY,
+    app_name="mobile",
+    # Webhook URLs often embed a bearer token
+    secret_body_fields=("webhook_url",),
+    max_bytes=settings.TRAFFIC_RECORD_MAX_MB * 1024 * 1024
+) if settings.TRAFFIC_RECORD_PATH else None
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     global redis_client
+    UpstreamClient.start()
     try:
         redis_client = redis.Redis(
             host=settings.REDIS_HOST,
@@ -21,16 +46,32 @@ async def lifespan(app: FastAPI):
         )
         await redis_client.ping()
         RedisService.set_client(redis_client)
+        CurrencyService.rates_cache.l2 = RedisCache(redis_client)
+        CurrencyService.rates_cache.start()
+        CurrencyService.quota.attach(redis_client, prefix="mobile:")
         print("✅ Connected to Redis")
     except Exception as e:
+        redis_client = None
+        # L1 is the only tier now, so it must hold entries for their full planned TTL
+        CurrencyService.rates_cache.l1.ttl = settings.QUOTA_MAX_TTL
         print(f"⚠️  Redis connection failed: {e}")
-        print("📱 Running without cache")
+        print("📱 Running with in-process cache only")
+    
+    # Alert polling reads rates without counting as demand in the quota plan
+    alert_task = asyncio.create_task(AlertService.refresh_loop(partial(CurrencyService.get_exchange_rates, count_demand=False)))
     
     yield
     
     # Shutdown
+    alert_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await alert_task
+    await CurrencyService.rates_cache.stop()
     if redis_client:
         await redis_client.close()
+    await UpstreamClient.close()
+    if traffic_recorder:
+        traffic_recorder.close()
 
 app = FastAPI(
     title="Currency Converter API",
@@ -48,8 +89,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so recorded durations cover CORS as well
+if traffic_recorder:
+    app.add_middleware(TrafficRecorderMiddleware, recorder=traffic_recorder)
+
 # Include routers
 app.include_router(currency_router, prefix="/api/v1", tags=["currency"])
+app.include_router(alert_router, prefix="/api/v1", tags=["alerts"])
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request, exc: RequestValidationError):
+    try:
+        return await request_validation_exception_handler(request, exc)
+    except ValueError:
+        # JSON Infinity/NaN inputs cannot be echoed back in the error body
+        errors = [{key: value for key, value in error.items() if key != "input"} for error in exc.errors()]
+        return JSONResponse(status_code=422, content={"detail": jsonable_encoder(errors)})
 
 @app.get("/")
 async def root():
@@ -61,15 +116,28 @@ async def root():
             "currencies": "/api/v1/currencies",
             "convert": "/api/v1/convert",
             "rates": "/api/v1/rates/{base_currency}",
-            "health": "/health"
+            "alerts": "/api/v1/alerts",
+            "health": "/health",
+            "metrics": "/metrics"
         }
     }
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "upstream": UpstreamClient.stats(),
+        "cache": CurrencyService.rates_cache.stats(),
+        "quota": CurrencyService.quota_report(),
+        "microbatch": CurrencyService.batching_stats()
+    }
+
 @app.get("/health")
 async def health_check():
-    redis_status = "connected" if redis_client else "disconnected"
+    # The L2 records the outcome of its last call, so this never waits on Redis
+    l2 = CurrencyService.rates_cache.l2
+    redis_status = "connected" if l2 is not None and l2.connected else "disconnected"
     return {
         "status": "healthy",
         "redis": redis_status,
-        "timestamp": "2025-09-06T00:43:23+08:00"
+        "timestamp": datetime.now(timezone.utc).isoformat()
     }
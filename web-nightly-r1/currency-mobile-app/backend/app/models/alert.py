@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+
+class AlertCreateRequest(BaseModel):
+    client_id: str = Field(..., min_length=1, max_length=128, description="Device or user identifier")
+    from_currency: str = Field(..., min_length=3, max_length=3, description="Base currency code")
+    to_currency: str = Field(..., min_length=3, max_length=3, description="Quote currency code")
+    direction: Literal["above", "below"] = Field(..., description="Fire when the rate crosses above or below")
+    threshold: float = Field(..., gt=0, allow_inf_nan=False, description="Target exchange rate")
+    webhook_url: Optional[str] = Field(None, max_length=2048, description="Optional webhook for delivery")
+
+class AlertResponse(BaseModel):
+    alert_id: int
+    client_id: str
+    from_currency: str
+    to_currency: str
+    direction: str
+    threshold: float
+    active: bool
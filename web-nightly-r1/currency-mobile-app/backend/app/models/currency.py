@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 class CurrencyCode(BaseModel):
@@ -11,6 +11,7 @@ class ConversionRequest(BaseModel):
     from_currency: str = Field(..., min_length=3, max_length=3, description="Source currency code")
     to_currency: str = Field(..., min_length=3, max_length=3, description="Target currency code")
     amount: float = Field(..., gt=0, le=1000000, description="Amount to convert")
+    mode: Optional[str] = Field(None, pattern="^(float|fixed)$", description="Arithmetic: float or fixed (exact minor units)")
 
 class ConversionResponse(BaseModel):
     from_currency: str
@@ -20,6 +21,9 @@ class ConversionResponse(BaseModel):
     exchange_rate: float
     timestamp: datetime
     formatted_result: str
+    # Set in fixed mode, as in Kconvert's /api/convert: the exact result and the target's decimal places
+    converted_minor_units: Optional[int] = None
+    minor_units: Optional[int] = None
 
 class ExchangeRatesResponse(BaseModel):
     base_currency: str
@@ -31,6 +35,43 @@ class CurrencyListResponse(BaseModel):
     currencies: Dict[str, str]  # code -> country_code mapping
     count: int
     timestamp: datetime
+    registry_version: int = 1
+
+class CurrencyInfo(BaseModel):
+    code: str
+    name: str
+    country: str
+    country_name: str
+    minor_units: int
+    obsolete: bool
+    replaced_by: Optional[str] = None
+    ordinal: int
+
+class CurrencySearchResponse(BaseModel):
+    query: str
+    results: List[CurrencyInfo]
+    count: int
+    registry_version: int
+
+class Holding(BaseModel):
+    currency: str = Field(..., min_length=3, max_length=3, description="Balance currency code")
+    amount: float = Field(..., ge=0, le=1000000000000, description="Balance amount")
+
+class PortfolioValuationRequest(BaseModel):
+    holdings: List[Holding] = Field(..., min_length=1, max_length=200)
+    targets: List[str] = Field(..., min_length=1, max_length=10, description="Display currency codes")
+
+class HoldingValuation(BaseModel):
+    currency: str
+    amount: float
+    values: Dict[str, float]  # target -> value, rounded to the target's minor units
+
+class PortfolioValuationResponse(BaseModel):
+    pivot_currency: str
+    targets: List[str]
+    holdings: List[HoldingValuation]
+    totals: Dict[str, float]
+    timestamp: datetime
 
 class HistoricalRateRequest(BaseModel):
     base_currency: str = Field(..., min_length=3, max_length=3)
@@ -0,0 +1,359 @@
+import asyncio
+import logging
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from operator import itemgetter
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ABOVE = 0
+BELOW = 1
+DIRECTIONS = {"above": ABOVE, "below": BELOW}
+DIRECTION_NAMES = {ABOVE: "above", BELOW: "below"}
+
+# Alert ids carry the slot in the low bits and the slot's reuse count above them
+SLOT_BITS = 32
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
+
+class _PairAlerts:
+    """
+    Thresholds of one pair kept sorted, with alert slots in parallel arrays.
+    "above" alerts fire for threshold <= rate (a prefix), "below" alerts
+    for threshold >= rate (a suffix), so a refresh is two bisects and a slice.
+    New alerts are buffered and merged in on the next evaluation, so bulk
+    registration does not pay an array memmove per insert.
+    """
+
+    __slots__ = ("thresholds", "ids", "pending")
+
+    # Above this many buffered alerts a full re-sort beats one insort each
+    MERGE_REBUILD_THRESHOLD = 256
+
+    def __init__(self):
+        self.thresholds = (array("d"), array("d"))
+        self.ids = (array("q"), array("q"))
+        self.pending = ([], [])
+
+    def add(self, direction: int, threshold: float, slot: int):
+        self.pending[direction].append((threshold, slot))
+
+    def _merge(self, direction: int):
+        pending = self.pending[direction]
+        if not pending:
+            return
+        thresholds, ids = self.thresholds[direction], self.ids[direction]
+        if len(pending) <= self.MERGE_REBUILD_THRESHOLD:
+            for threshold, slot in pending:
+                i = bisect_right(thresholds, threshold)
+                thresholds.insert(i, threshold)
+                ids.insert(i, slot)
+        else:
+            merged = list(zip(thresholds, ids))
+            merged.extend(pending)
+            merged.sort(key=itemgetter(0))
+            self.thresholds[direction][:] = array("d", map(itemgetter(0), merged))
+            self.ids[direction][:] = array("q", map(itemgetter(1), merged))
+        pending.clear()
+
+    def remove(self, direction: int, threshold: float, slot: int) -> bool:
+        pending = self.pending[direction]
+        for i, (_, pending_slot) in enumerate(pending):
+            if pending_slot == slot:
+                del pending[i]
+                return True
+        thresholds, ids = self.thresholds[direction], self.ids[direction]
+        i = bisect_left(thresholds, threshold)
+        while i < len(thresholds) and thresholds[i] == threshold:
+            if ids[i] == slot:
+                del thresholds[i]
+                del ids[i]
+                return True
+            i += 1
+        return False
+
+    def pop_triggered(self, rate: float) -> List[int]:
+        self._merge(ABOVE)
+        self._merge(BELOW)
+
+        above_th, above_ids = self.thresholds[ABOVE], self.ids[ABOVE]
+        k = bisect_right(above_th, rate)
+        fired = above_ids[:k].tolist()
+        del above_th[:k]
+        del above_ids[:k]
+
+        below_th, below_ids = self.thresholds[BELOW], self.ids[BELOW]
+        k = bisect_left(below_th, rate)
+        fired.extend(below_ids[k:].tolist())
+        del below_th[k:]
+        del below_ids[k:]
+        return fired
+
+    def __len__(self):
+        return sum(len(ids) for ids in self.ids) + sum(len(p) for p in self.pending)
+
+
+class AlertService:
+    """One-shot rate threshold alerts evaluated on every snapshot refresh"""
+
+    # Per-alert metadata in flat arrays indexed by slot (~24 bytes per alert).
+    # Fired and cancelled slots are reused oldest first, so they stay readable
+    # until then; an alert id is the slot plus its reuse generation, and goes
+    # stale once the slot holds another alert.
+    _client_of = array("l")
+    _pair_of = array("l")
+    _threshold_of = array("d")
+    _direction_of = bytearray()
+    _active = bytearray()
+    _generation = array("l")
+    _free_slots: deque = deque()
+    _active_count = 0
+
+    # Interned clients and pairs. A client is released once no slot and no
+    # open stream refers to it, and its index is reused.
+    _client_ids: List[str] = []
+    _client_index: Dict[str, int] = {}
+    _client_refs = array("l")
+    _free_clients: List[int] = []
+    _webhooks: Dict[int, str] = {}
+    _pair_names: List[str] = []
+    _pair_index: Dict[str, int] = {}
+
+    # base -> target -> sorted thresholds
+    _books: Dict[str, Dict[str, _PairAlerts]] = {}
+
+    # client index -> pending deliveries and open streams; dropped when the last stream closes
+    _queues: Dict[int, asyncio.Queue] = {}
+    _streams: Dict[int, int] = {}
+    _stream_count = 0
+
+    _stats = {"registered": 0, "triggered": 0, "evaluations": 0, "pushed": 0, "dropped": 0,
+              "unsubscribed": 0, "webhook_stub": 0, "streams_rejected": 0}
+
+    @classmethod
+    def _acquire_client(cls, client_id: str) -> int:
+        index = cls._client_index.get(client_id)
+        if index is None:
+            if cls._free_clients:
+                index = cls._free_clients.pop()
+                cls._client_ids[index] = client_id
+            else:
+                index = len(cls._client_ids)
+                cls._client_ids.append(client_id)
+                cls._client_refs.append(0)
+            cls._client_index[client_id] = index
+        cls._client_refs[index] += 1
+        return index
+
+    @classmethod
+    def _release_client(cls, index: int):
+        cls._client_refs[index] -= 1
+        if cls._client_refs[index] == 0:
+            del cls._client_index[cls._client_ids[index]]
+            cls._client_ids[index] = ""
+            cls._webhooks.pop(index, None)
+            cls._free_clients.append(index)
+
+    @classmethod
+    def _intern_pair(cls, pair: str) -> int:
+        index = cls._pair_index.get(pair)
+        if index is None:
+            index = len(cls._pair_names)
+            cls._pair_names.append(pair)
+            cls._pair_index[pair] = index
+        return index
+
+    @classmethod
+    def _slot(cls, alert_id: int) -> Optional[int]:
+        """Slot of a current alert id, None for unknown or stale ids"""
+        slot = alert_id & SLOT_MASK
+        if alert_id < 0 or slot >= len(cls._active) or cls._generation[slot] != alert_id >> SLOT_BITS:
+            return None
+        return slot
+
+    @classmethod
+    def _alert_id(cls, slot: int) -> int:
+        return (cls._generation[slot] << SLOT_BITS) | slot
+
+    @classmethod
+    def register(cls, client_id: str, from_currency: str, to_currency: str,
+                 direction: str, threshold: float, webhook_url: Optional[str] = None) -> int:
+        client = cls._acquire_client(client_id)
+        if webhook_url:
+            cls._webhooks[client] = webhook_url
+        pair = cls._intern_pair(f"{from_currency}:{to_currency}")
+        code = DIRECTIONS[direction]
+
+        if cls._free_slots:
+            slot = cls._free_slots.popleft()
+            cls._release_client(cls._client_of[slot])
+            cls._generation[slot] += 1
+            cls._client_of[slot] = client
+            cls._pair_of[slot] = pair
+            cls._threshold_of[slot] = threshold
+            cls._direction_of[slot] = code
+            cls._active[slot] = 1
+        else:
+            slot = len(cls._active)
+            cls._client_of.append(client)
+            cls._pair_of.append(pair)
+            cls._threshold_of.append(threshold)
+            cls._direction_of.append(code)
+            cls._active.append(1)
+            cls._generation.append(0)
+        cls._active_count += 1
+        cls._stats["registered"] += 1
+
+        book = cls._books.setdefault(from_currency, {})
+        book.setdefault(to_currency, _PairAlerts()).add(code, threshold, slot)
+        return cls._alert_id(slot)
+
+    @classmethod
+    def owns(cls, client_id: str, alert_id: int) -> bool:
+        """Whether `alert_id` is a current alert registered by `client_id`"""
+        slot = cls._slot(alert_id)
+        return slot is not None and cls._client_index.get(client_id) == cls._client_of[slot]
+
+    @classmethod
+    def describe(cls, alert_id: int) -> Optional[dict]:
+        slot = cls._slot(alert_id)
+        return None if slot is None else cls._describe_slot(slot)
+
+    @classmethod
+    def _describe_slot(cls, slot: int) -> dict:
+        from_currency, to_currency = cls._pair_names[cls._pair_of[slot]].split(":")
+        return {
+            "alert_id": cls._alert_id(slot),
+            "client_id": cls._client_ids[cls._client_of[slot]],
+            "from_currency": from_currency,
+            "to_currency": to_currency,
+            "direction": DIRECTION_NAMES[cls._direction_of[slot]],
+            "threshold": cls._threshold_of[slot],
+            "active": bool(cls._active[slot]),
+        }
+
+    @classmethod
+    def _retire(cls, slot: int):
+        cls._active[slot] = 0
+        cls._active_count -= 1
+        cls._free_slots.append(slot)
+
+    @classmethod
+    def cancel(cls, alert_id: int) -> bool:
+        slot = cls._slot(alert_id)
+        if slot is None or not cls._active[slot]:
+            return False
+        from_currency, to_currency = cls._pair_names[cls._pair_of[slot]].split(":")
+        book = cls._books.get(from_currency, {}).get(to_currency)
+        if book is not None:
+            book.remove(cls._direction_of[slot], cls._threshold_of[slot], slot)
+        cls._retire(slot)
+        return True
+
+    @classmethod
+    def active_bases(cls) -> List[str]:
+        return [base for base, book in cls._books.items() if any(len(p) for p in book.values())]
+
+    @classmethod
+    def evaluate(cls, base_currency: str, rates: Dict[str, float]) -> int:
+        """Fire every alert crossed by a new snapshot of `base_currency`"""
+        book = cls._books.get(base_currency)
+        if not book:
+            return 0
+        cls._stats["evaluations"] += 1
+        now = time.time()
+        fired_total = 0
+        for target, pair_alerts in book.items():
+            rate = rates.get(target)
+            if rate is None or not len(pair_alerts):
+                continue
+            for slot in pair_alerts.pop_triggered(rate):
+                cls._deliver(slot, rate, now)
+                cls._retire(slot)
+                fired_total += 1
+        cls._stats["triggered"] += fired_total
+        return fired_total
+
+    @classmethod
+    def _deliver(cls, slot: int, rate: float, triggered_at: float):
+        event = cls._describe_slot(slot)
+        event.update(active=False, rate=rate, triggered_at=triggered_at)
+        client = cls._client_of[slot]
+
+        queue = cls._queues.get(client)
+        if queue is None:
+            # Nobody is listening; the fired state stays readable through GET
+            cls._stats["unsubscribed"] += 1
+        else:
+            if queue.full():
+                queue.get_nowait()
+                cls._stats["dropped"] += 1
+            queue.put_nowait(event)
+            cls._stats["pushed"] += 1
+
+        webhook_url = cls._webhooks.get(client)
+        if webhook_url:
+            # Delivery stub: outbound webhooks are not wired to a sender yet
+            cls._stats["webhook_stub"] += 1
+            logger.info(f"Webhook stub for {webhook_url}: alert {event['alert_id']} fired at rate {rate}")
+
+    @classmethod
+    def has_client(cls, client_id: str) -> bool:
+        return client_id in cls._client_index
+
+    @classmethod
+    def subscribe(cls, client_id: str) -> Optional[asyncio.Queue]:
+        """Delivery queue for a new stream of a known client, None once ALERT_MAX_STREAMS are open"""
+        if cls._stream_count >= settings.ALERT_MAX_STREAMS:
+            cls._stats["streams_rejected"] += 1
+            return None
+        client = cls._acquire_client(client_id)
+        cls._stream_count += 1
+        cls._streams[client] = cls._streams.get(client, 0) + 1
+        queue = cls._queues.get(client)
+        if queue is None:
+            queue = cls._queues[client] = asyncio.Queue(maxsize=settings.ALERT_QUEUE_SIZE)
+        return queue
+
+    @classmethod
+    def unsubscribe(cls, client_id: str):
+        client = cls._client_index.get(client_id)
+        if client is None or not cls._streams.get(client):
+            return
+        cls._stream_count -= 1
+        cls._streams[client] -= 1
+        if not cls._streams[client]:
+            del cls._streams[client]
+            del cls._queues[client]
+        cls._release_client(client)
+
+    @classmethod
+    async def refresh_loop(cls, fetch_rates):
+        """Periodically pull snapshots for every base that has pending alerts"""
+        while True:
+            await asyncio.sleep(settings.ALERT_REFRESH_INTERVAL)
+            for base in cls.active_bases():
+                try:
+                    rates = await fetch_rates(base)
+                    if rates:
+                        cls.evaluate(base, rates)
+                except Exception as e:
+                    logger.error(f"Alert refresh failed for {base}: {e}")
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            **cls._stats,
+            "active": cls._active_count,
+            "slots": len(cls._active),
+            "free_slots": len(cls._free_slots),
+            "pairs": len(cls._pair_names),
+            "clients": len(cls._client_index),
+            "streams": cls._stream_count,
+            "bases_watched": len(cls.active_bases()),
+        }
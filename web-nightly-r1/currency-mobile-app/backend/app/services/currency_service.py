@@ -1,109 +1,239 @@
-import httpx
 import json
-from typing import Dict, Optional, Tuple
+import logging
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from app.core.config import settings
-from app.services.redis_service import RedisService
+from currency_shared import currency_registry
+from currency_shared.tiered_cache import LocalCache, TieredCache
+from app.services.upstream_client import UpstreamClient
+from app.services.alert_service import AlertService
+from currency_shared.quota import QuotaBudget, RefreshPlanner
 from app.models.currency import ConversionResponse, ExchangeRatesResponse
+from currency_shared import fixed_point
+from currency_shared.microbatch import MicroBatcher
+
+logger = logging.getLogger(__name__)
 
 class CurrencyService:
     
-    # Currency mappings from original project
-    CURRENCY_COUNTRIES = {
-        "AED": "AE", "AFN": "AF", "XCD": "AG", "ALL": "AL", "AMD": "AM", "ANG": "AN",
-        "AOA": "AO", "AQD": "AQ", "ARS": "AR", "AUD": "AU", "AZN": "AZ", "BAM": "BA",
-        "BBD": "BB", "BDT": "BD", "XOF": "BE", "BGN": "BG", "BHD": "BH", "BIF": "BI",
-        "BMD": "BM", "BND": "BN", "BOB": "BO", "BRL": "BR", "BSD": "BS", "NOK": "BV",
-        "BWP": "BW", "BYR": "BY", "BZD": "BZ", "CAD": "CA", "CDF": "CD", "XAF": "CF",
-        "CHF": "CH", "CLP": "CL", "CNY": "CN", "COP": "CO", "CRC": "CR", "CUP": "CU",
-        "CVE": "CV", "CYP": "CY", "CZK": "CZ", "DJF": "DJ", "DKK": "DK", "DOP": "DO",
-        "DZD": "DZ", "ECS": "EC", "EEK": "EE", "EGP": "EG", "ETB": "ET", "EUR": "FR",
-        "FJD": "FJ", "FKP": "FK", "GBP": "GB", "GEL": "GE", "GGP": "GG", "GHS": "GH",
-        "GIP": "GI", "GMD": "GM", "GNF": "GN", "GTQ": "GT", "GYD": "GY", "HKD": "HK",
-        "HNL": "HN", "HRK": "HR", "HTG": "HT", "HUF": "HU", "IDR": "ID", "ILS": "IL",
-        "INR": "IN", "IQD": "IQ", "IRR": "IR", "ISK": "IS", "JMD": "JM", "JOD": "JO",
-        "JPY": "JP", "KES": "KE", "KGS": "KG", "KHR": "KH", "KMF": "KM", "KPW": "KP",
-        "KRW": "KR", "KWD": "KW", "KYD": "KY", "KZT": "KZ", "LAK": "LA", "LBP": "LB",
-        "LKR": "LK", "LRD": "LR", "LSL": "LS", "LTL": "LT", "LVL": "LV", "LYD": "LY",
-        "MAD": "MA", "MDL": "MD", "MGA": "MG", "MKD": "MK", "MMK": "MM", "MNT": "MN",
-        "MOP": "MO", "MRO": "MR", "MTL": "MT", "MUR": "MU", "MVR": "MV", "MWK": "MW",
-        "MXN": "MX", "MYR": "MY", "MZN": "MZ", "NAD": "NA", "XPF": "NC", "NGN": "NG",
-        "NIO": "NI", "NPR": "NP", "NZD": "NZ", "OMR": "OM", "PAB": "PA", "PEN": "PE",
-        "PGK": "PG", "PHP": "PH", "PKR": "PK", "PLN": "PL", "PYG": "PY", "QAR": "QA",
-        "RON": "RO", "RSD": "RS", "RUB": "RU", "RWF": "RW", "SAR": "SA", "SBD": "SB",
-        "SCR": "SC", "SDG": "SD", "SEK": "SE", "SGD": "SG", "SKK": "SK", "SLL": "SL",
-        "SOS": "SO", "SRD": "SR", "STD": "ST", "SVC": "SV", "SYP": "SY", "SZL": "SZ",
-        "THB": "TH", "TJS": "TJ", "TMT": "TM", "TND": "TN", "TOP": "TO", "TRY": "TR",
-        "TTD": "TT", "TWD": "TW", "TZS": "TZ", "UAH": "UA", "UGX": "UG", "USD": "US",
-        "UYU": "UY", "UZS": "UZ", "VEF": "VE", "VND": "VN", "VUV": "VU", "YER": "YE",
-        "ZAR": "ZA", "ZMK": "ZM", "ZWD": "ZW"
-    }
+    # L1 in front of Redis; the L2 is attached at startup when Redis is reachable
+    rates_cache = TieredCache(
+        LocalCache(max_entries=settings.CACHE_L1_MAX_ENTRIES, ttl=settings.CACHE_L1_TTL),
+        default_ttl=settings.CACHE_TTL,
+        channel=settings.CACHE_INVALIDATION_CHANNEL
+    )
+    
+    # Upstream quota and the per-base TTL plan it drives
+    quota = QuotaBudget(
+        monthly_limit=settings.QUOTA_MONTHLY_LIMIT,
+        daily_limit=settings.QUOTA_DAILY_LIMIT,
+        reset_day=settings.QUOTA_RESET_DAY,
+        reserve_ratio=settings.QUOTA_RESERVE_RATIO
+    )
+    refresh_planner = RefreshPlanner(quota, min_ttl=settings.CACHE_TTL, max_ttl=settings.QUOTA_MAX_TTL)
+    REPLAN_INTERVAL = 60
+    
+    # Requests per base, halved on every replan so old traffic fades
+    _demand: Dict[str, float] = {}
+    # Last good rates per base, served once the quota is spent
+    _last_rates: Dict[str, Dict[str, float]] = {}
+    quota_stats = {"stale_served": 0, "rejected": 0}
+    
+    # Created on first use when CONVERT_BATCH_ENABLED is set
+    _batcher: Optional[MicroBatcher] = None
+    
+    # Currency -> flag country, from the shared registry (active codes only)
+    CURRENCY_COUNTRIES = currency_registry.country_codes()
     
     @classmethod
-    async def get_exchange_rates(cls, base_currency: str) -> Optional[Dict[str, float]]:
-        """Get exchange rates for a base currency with caching"""
+    async def get_exchange_rates(cls, base_currency: str, count_demand: bool = True) -> Optional[Dict[str, float]]:
+        """Get exchange rates for a base currency with caching
+
+        Background readers (alert polling) pass count_demand=False, so only
+        client requests steer the refresh plan.
+        """
         cache_key = f"rates:{base_currency}"
+        if count_demand:
+            cls._demand[base_currency] = cls._demand.get(base_currency, 0.0) + 1.0
         
-        # Try cache first
-        cached_rates = await RedisService.get_json(cache_key)
+        # Try cache first (L1, then Redis)
+        cached_rates = await cls.rates_cache.get(cache_key)
         if cached_rates:
             return cached_rates
         
-        # Fetch from API
+        # Spend upstream quota only while there is some left
+        if cls.quota.exhausted():
+            return cls._quota_spent(base_currency)
+        
+        # Fetch from API; every upstream attempt, retries included, is charged to the quota
         rates = await cls._fetch_rates_from_api(base_currency)
+        if rates is None and cls.quota.exhausted():
+            # Spent during this fetch, here or on another replica
+            return cls._quota_spent(base_currency)
         if rates:
-            # Cache for 1 hour
-            await RedisService.set(cache_key, rates, ttl=3600)
+            cls._last_rates[base_currency] = rates
+            cls.refresh_planner.mark_refreshed(base_currency)
+            # Cache for as long as the quota plan allows (CACHE_TTL when unlimited)
+            await cls.rates_cache.set(cache_key, rates, ttl=cls.planned_ttl(base_currency))
+            AlertService.evaluate(base_currency, rates)
         
         return rates
     
+    @classmethod
+    def _quota_spent(cls, base_currency: str) -> Optional[Dict[str, float]]:
+        """Last good rates for a base once the quota is spent, None if there are none"""
+        rates = cls._last_rates.get(base_currency)
+        if rates:
+            cls.quota_stats["stale_served"] += 1
+            logger.warning(f"Upstream quota spent, serving last rates for {base_currency}")
+        else:
+            cls.quota_stats["rejected"] += 1
+        return rates
+    
+    @classmethod
+    def planned_ttl(cls, base_currency: str) -> float:
+        """Quota-aware cache TTL, replanned from recent demand at most once a minute"""
+        planner = cls.refresh_planner
+        if planner.plan_age() > cls.REPLAN_INTERVAL:
+            hottest = sorted(cls._demand.items(), key=lambda item: item[1], reverse=True)
+            planner.plan(dict(hottest[:settings.QUOTA_PLAN_BASES]))
+            cls._demand = {base: count / 2 for base, count in cls._demand.items() if count >= 1.0}
+        return planner.ttl_for(base_currency)
+    
+    @classmethod
+    def quota_report(cls) -> dict:
+        return {**cls.quota.stats(), **cls.quota_stats, "plan": cls.refresh_planner.stats()}
+    
     @classmethod
     async def _fetch_rates_from_api(cls, base_currency: str) -> Optional[Dict[str, float]]:
         """Fetch rates from external API"""
         url = f"{settings.EXCHANGE_API_URL}/{settings.EXCHANGE_API_KEY}/latest/{base_currency}"
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, timeout=10.0)
-                response.raise_for_status()
-                data = response.json()
-                
-                if data.get("result") == "success":
-                    return data.get("conversion_rates", {})
-                else:
-                    print(f"API Error: {data.get('error-type', 'Unknown error')}")
-                    return None
-                    
-            except httpx.RequestError as e:
-                print(f"Request error: {e}")
-                return None
-            except httpx.HTTPStatusError as e:
-                print(f"HTTP error: {e}")
-                return None
+        data = await UpstreamClient.get_json(url, quota=cls.quota)
+        if not data:
+            return None
+        
+        if data.get("result") == "success":
+            return data.get("conversion_rates", {})
+        
+        logger.error(f"API Error for {base_currency}: {data.get('error-type', 'Unknown error')}")
+        return None
     
     @classmethod
-    async def convert_currency(cls, from_currency: str, to_currency: str, amount: float) -> Optional[ConversionResponse]:
+    async def convert_currency(cls, from_currency: str, to_currency: str, amount: float,
+                               mode: Optional[str] = None) -> Optional[ConversionResponse]:
         """Convert currency with caching and formatting"""
+        mode = mode or settings.CONVERSION_MODE
+        batcher = cls.conversion_batcher()
+        if batcher is not None:
+            result = await batcher.submit((from_currency, to_currency, amount, mode))
+            if result is not None:
+                return result
+        
         rates = await cls.get_exchange_rates(from_currency)
         
         if not rates or to_currency not in rates:
             return None
         
-        exchange_rate = rates[to_currency]
-        converted_amount = round(amount * exchange_rate, 2)
-        
-        # Format result similar to original project
-        formatted_result = f"{amount:.2f} {from_currency} = {converted_amount:.2f} {to_currency}"
+        converted_minor_units = None
+        if mode == "fixed":
+            from_minor = fixed_point.minor_units(from_currency)
+            converted_minor_units = fixed_point.convert_minor(
+                fixed_point.to_minor(amount, from_minor),
+                fixed_point.rate_table(rates)[to_currency],
+                from_minor, fixed_point.minor_units(to_currency)
+            )
+        return cls._conversion_response(
+            from_currency, to_currency, amount, rates[to_currency], datetime.now(), converted_minor_units
+        )
+    
+    @classmethod
+    def _conversion_response(cls, from_currency: str, to_currency: str, amount: float, exchange_rate: float,
+                             timestamp: datetime, converted_minor_units: Optional[int] = None,
+                             validate: bool = True) -> ConversionResponse:
+        """Response for one conversion; float arithmetic unless minor units were computed"""
+        to_minor = None
+        if converted_minor_units is not None:
+            from_minor = fixed_point.minor_units(from_currency)
+            to_minor = fixed_point.minor_units(to_currency)
+            converted_amount = fixed_point.minor_to_float(converted_minor_units, to_minor)
+            formatted_result = (
+                f"{fixed_point.format_minor(fixed_point.to_minor(amount, from_minor), from_minor)} {from_currency} = "
+                f"{fixed_point.format_minor(converted_minor_units, to_minor)} {to_currency}"
+            )
+        else:
+            converted_amount = round(amount * exchange_rate, 2)
+            
+            # Format result similar to original project
+            formatted_result = f"{amount:.2f} {from_currency} = {converted_amount:.2f} {to_currency}"
         
-        return ConversionResponse(
+        fields = dict(
             from_currency=from_currency,
             to_currency=to_currency,
             amount=amount,
             converted_amount=converted_amount,
             exchange_rate=exchange_rate,
-            timestamp=datetime.now(),
-            formatted_result=formatted_result
+            timestamp=timestamp,
+            formatted_result=formatted_result,
+            converted_minor_units=converted_minor_units,
+            minor_units=to_minor
         )
+        # Batched fields arrive as the declared types (rates cast to float), so validation is skipped
+        return ConversionResponse(**fields) if validate else ConversionResponse.model_construct(**fields)
+    
+    @classmethod
+    def conversion_batcher(cls) -> Optional[MicroBatcher]:
+        if cls._batcher is None and settings.CONVERT_BATCH_ENABLED:
+            cls._batcher = MicroBatcher(
+                cls._resolve_conversions,
+                window=settings.CONVERT_BATCH_WINDOW_US / 1e6,
+                max_batch=settings.CONVERT_BATCH_MAX
+            )
+        return cls._batcher
+    
+    @classmethod
+    def batching_stats(cls) -> Optional[dict]:
+        return cls._batcher.stats() if cls._batcher else None
+    
+    @classmethod
+    def _resolve_conversions(cls, batch: List[Tuple[str, str, float, str]]) -> List[Optional[ConversionResponse]]:
+        """Cache-hit conversions for a micro-batch; None where the rates must be fetched"""
+        snapshots: Dict[str, Optional[Dict[str, float]]] = {}
+        timestamp = datetime.now()
+        results: List[Optional[ConversionResponse]] = [None] * len(batch)
+        fixed_rows = []
+        for index, (from_currency, to_currency, amount, mode) in enumerate(batch):
+            if from_currency not in snapshots:
+                snapshots[from_currency] = cls.rates_cache.get_local(f"rates:{from_currency}")
+            rates = snapshots[from_currency]
+            if not rates or to_currency not in rates:
+                continue
+            cls._demand[from_currency] = cls._demand.get(from_currency, 0.0) + 1.0
+            if mode == "fixed":
+                fixed_rows.append(index)
+            else:
+                results[index] = cls._conversion_response(
+                    from_currency, to_currency, amount, float(rates[to_currency]), timestamp, validate=False
+                )
+        
+        if fixed_rows:
+            # One int64 pass for every fixed-mode row, whatever its pair
+            amounts, units, shifts = [], [], []
+            for index in fixed_rows:
+                from_currency, to_currency, amount, _ = batch[index]
+                from_minor = fixed_point.minor_units(from_currency)
+                scaled = fixed_point.rate_table(snapshots[from_currency])[to_currency]
+                amounts.append(fixed_point.to_minor(amount, from_minor))
+                units.append(scaled.units)
+                shifts.append(scaled.exponent + from_minor - fixed_point.minor_units(to_currency))
+            values = fixed_point.convert_minor_array(amounts, units, shifts).tolist()
+            for index, value in zip(fixed_rows, values):
+                from_currency, to_currency, amount, _ = batch[index]
+                results[index] = cls._conversion_response(
+                    from_currency, to_currency, amount, float(snapshots[from_currency][to_currency]),
+                    timestamp, value, validate=False
+                )
+        return results
     
     @classmethod
     def get_supported_currencies(cls) -> Dict[str, str]:
@@ -113,4 +243,12 @@ class CurrencyService:
     @classmethod
     def is_valid_currency(cls, currency_code: str) -> bool:
         """Check if currency code is supported"""
-        return currency_code.upper() in cls.CURRENCY_COUNTRIES
+        return currency_registry.is_active(currency_code.upper())
+    
+    @classmethod
+    def search_currencies(cls, query: str, limit: int = 10, include_obsolete: bool = False) -> List[dict]:
+        """Ranked type-ahead matches on code, name and country"""
+        return [
+            currency_registry.to_dict(currency)
+            for currency in currency_registry.search(query, limit=limit, include_obsolete=include_obsolete)
+        ]
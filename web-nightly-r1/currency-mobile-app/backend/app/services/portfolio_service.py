@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from currency_shared import currency_registry
+from app.core.config import settings
+from app.services.currency_service import CurrencyService
+
+logger = logging.getLogger(__name__)
+
+_ORDINALS = {currency.code: currency.ordinal for currency in currency_registry.all_currencies(include_obsolete=True)}
+
+
+class UnpricedCurrencies(ValueError):
+    """Valid currencies the pivot snapshot has no rate for"""
+
+    def __init__(self, codes: List[str]):
+        super().__init__(f"No exchange rate available for: {', '.join(codes)}")
+        self.codes = codes
+
+
+class PortfolioService:
+    
+    # Every holding and target is priced from one snapshot of the pivot base. With p the
+    # pivot rate vector, M[i, j] = p[target_j] / p[holding_i] and the totals are h @ M
+    
+    # Pivot rates laid out by registry ordinal (NaN where the upstream has no rate),
+    # rebuilt only when the cache hands out a new snapshot
+    _vector_source: Optional[Dict[str, float]] = None
+    _vector: Optional[np.ndarray] = None
+    # One pivot load shared by every request that arrives while the cache is cold
+    _loading: Optional[asyncio.Task] = None
+    stats = {"valuations": 0, "holdings": 0, "snapshot_builds": 0}
+    
+    @classmethod
+    async def _pivot_rates(cls) -> Optional[Dict[str, float]]:
+        if cls._loading is None or cls._loading.done():
+            # A warm L1 answers without suspending, so no shared task is needed
+            if CurrencyService.rates_cache.l1.peek(f"rates:{settings.PORTFOLIO_PIVOT}") is not None:
+                return await CurrencyService.get_exchange_rates(settings.PORTFOLIO_PIVOT)
+            cls._loading = asyncio.ensure_future(CurrencyService.get_exchange_rates(settings.PORTFOLIO_PIVOT))
+        # Shielded so a cancelled client does not cancel the load for everyone else
+        return await asyncio.shield(cls._loading)
+    
+    @classmethod
+    def _rate_vector(cls, rates: Dict[str, float]) -> np.ndarray:
+        if rates is not cls._vector_source:
+            vector = np.full(len(_ORDINALS), np.nan)
+            for code, rate in rates.items():
+                ordinal = _ORDINALS.get(code)
+                if ordinal is not None and rate:
+                    vector[ordinal] = rate
+            cls._vector, cls._vector_source = vector, rates
+            cls.stats["snapshot_builds"] += 1
+        return cls._vector
+    
+    @classmethod
+    async def value(cls, holdings: List[Tuple[str, float]], targets: List[str]) -> Optional[dict]:
+        """
+        Per-holding and total values of (currency, amount) pairs in each target.
+        None when no snapshot could be loaded; UnpricedCurrencies when the
+        snapshot lacks a holding or target currency.
+        """
+        rates = await cls._pivot_rates()
+        if not rates:
+            return None
+        pivot = cls._rate_vector(rates)
+        
+        codes = [code for code, _ in holdings]
+        source = pivot[[_ORDINALS[code] for code in codes]]
+        target = pivot[[_ORDINALS[code] for code in targets]]
+        if np.isnan(source).any() or np.isnan(target).any():
+            raise UnpricedCurrencies(sorted(
+                {code for code, rate in zip(codes, source) if np.isnan(rate)} |
+                {code for code, rate in zip(targets, target) if np.isnan(rate)}
+            ))
+        
+        amounts = np.fromiter((amount for _, amount in holdings), dtype=np.float64, count=len(holdings))
+        cross = np.divide.outer(1.0 / source, 1.0 / target)
+        values = amounts[:, None] * cross
+        totals = amounts @ cross
+        
+        # Round to each target's minor units (half-to-even), after summing
+        scale = np.array([10.0 ** currency_registry.get(code).minor_units for code in targets])
+        values = np.round(values * scale) / scale
+        totals = np.round(totals * scale) / scale
+        
+        cls.stats["valuations"] += 1
+        cls.stats["holdings"] += len(holdings)
+        return {
+            "pivot_currency": settings.PORTFOLIO_PIVOT,
+            "targets": targets,
+            "holdings": [
+                {"currency": code, "amount": amount, "values": dict(zip(targets, row))}
+                for (code, amount), row in zip(holdings, values.tolist())
+            ],
+            "totals": dict(zip(targets, totals.tolist())),
+        }
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RetryBudget:
+    """Token bucket that caps retries to a fraction of recent requests"""
+
+    def __init__(self, ratio: float, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def deposit(self):
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class _HandshakeTrace:
+    """httpcore trace hook measuring TCP connect + TLS time of one request"""
+
+    def __init__(self):
+        self.new_connection = False
+        self.handshake_seconds = 0.0
+        self._started: Dict[str, float] = {}
+
+    async def __call__(self, event_name: str, info: dict):
+        if event_name in ("connection.connect_tcp.started", "connection.start_tls.started"):
+            self.new_connection = True
+            self._started[event_name.rsplit(".", 1)[0]] = time.perf_counter()
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            started = self._started.pop(event_name.rsplit(".", 1)[0], None)
+            if started is not None:
+                self.handshake_seconds += time.perf_counter() - started
+
+
+class UpstreamClient:
+    """Shared keep-alive client for exchange rate providers, managed by the app lifespan"""
+
+    _client: Optional[httpx.AsyncClient] = None
+    _http2 = False
+    _retry_budget = RetryBudget(settings.UPSTREAM_RETRY_BUDGET_RATIO)
+    _stats = {
+        "requests": 0,
+        "attempts": 0,
+        "retries": 0,
+        "retries_denied": 0,
+        "rate_limited": 0,
+        "quota_denied": 0,
+        "failures": 0,
+        "new_connections": 0,
+        "reused_connections": 0,
+        "handshake_seconds": 0.0,
+    }
+
+    @classmethod
+    def start(cls):
+        if cls._client is not None:
+            return
+        http2 = settings.UPSTREAM_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("UPSTREAM_HTTP2 is enabled but h2 is not installed; using HTTP/1.1")
+                http2 = False
+        cls._http2 = http2
+        cls._client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE,
+                keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(settings.UPSTREAM_ATTEMPT_TIMEOUT, connect=settings.UPSTREAM_CONNECT_TIMEOUT),
+        )
+
+    @classmethod
+    async def close(cls):
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
+    @classmethod
+    def _backoff(cls, attempt: int) -> float:
+        # Full jitter keeps retries from a burst of misses from re-synchronising
+        cap = min(settings.UPSTREAM_BACKOFF_MAX, settings.UPSTREAM_BACKOFF_BASE * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        """Seconds asked for by a Retry-After header (delay or HTTP date), None when absent or invalid"""
+        value = response.headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    @classmethod
+    def _record_trace(cls, trace: _HandshakeTrace):
+        if trace.new_connection:
+            cls._stats["new_connections"] += 1
+            cls._stats["handshake_seconds"] += trace.handshake_seconds
+        else:
+            cls._stats["reused_connections"] += 1
+
+    @classmethod
+    async def get_json(cls, url: str, quota=None) -> Optional[dict]:
+        """GET a JSON document with per-attempt timeouts and budgeted, jittered retries
+
+        With a QuotaBudget, every attempt is charged to it, and the request
+        gives up once it refuses one.
+        """
+        if cls._client is None:
+            cls.start()
+
+        cls._stats["requests"] += 1
+        cls._retry_budget.deposit()
+
+        retry_delay = None
+        for attempt in range(settings.UPSTREAM_MAX_ATTEMPTS):
+            if attempt:
+                if quota is not None and quota.exhausted():
+                    cls._stats["quota_denied"] += 1
+                    break
+                if not cls._retry_budget.try_withdraw():
+                    cls._stats["retries_denied"] += 1
+                    break
+                cls._stats["retries"] += 1
+                await asyncio.sleep(cls._backoff(attempt) if retry_delay is None else retry_delay)
+                retry_delay = None
+
+            if quota is not None and not await quota.acquire():
+                cls._stats["quota_denied"] += 1
+                break
+            cls._stats["attempts"] += 1
+            trace = _HandshakeTrace()
+            try:
+                response = await cls._client.get(url, extensions={"trace": trace})
+            except httpx.RequestError as e:
+                logger.warning(f"Upstream request error (attempt {attempt + 1}): {e!r}")
+                continue
+            finally:
+                cls._record_trace(trace)
+
+            if response.status_code == 429:
+                cls._stats["rate_limited"] += 1
+                # Only worth another call when the provider says how long to wait and quota is left
+                retry_delay = cls._retry_after(response)
+                if retry_delay is None or retry_delay > settings.UPSTREAM_BACKOFF_MAX or \
+                        (quota is not None and quota.exhausted()):
+                    logger.warning(f"Upstream rate limited the request (attempt {attempt + 1}), not retrying")
+                    break
+                logger.warning(f"Upstream rate limited the request (attempt {attempt + 1}), "
+                               f"retrying after {retry_delay:.2f}s")
+                continue
+            if response.status_code >= 500:
+                logger.warning(f"Upstream returned {response.status_code} (attempt {attempt + 1})")
+                continue
+            if response.status_code >= 400:
+                logger.error(f"Upstream rejected request with {response.status_code}")
+                break
+            try:
+                return response.json()
+            except ValueError:
+                logger.error("Upstream returned invalid JSON")
+                break
+
+        cls._stats["failures"] += 1
+        return None
+
+    @classmethod
+    def stats(cls) -> dict:
+        stats = dict(cls._stats)
+        new = stats["new_connections"]
+        avg_handshake = stats["handshake_seconds"] / new if new else 0.0
+        stats["handshake_seconds"] = round(stats["handshake_seconds"], 4)
+        stats["avg_handshake_ms"] = round(avg_handshake * 1000, 2)
+        stats["handshake_ms_saved"] = round(stats["reused_connections"] * avg_handshake * 1000, 2)
+        stats["http2"] = cls._http2
+        stats["retry_budget_tokens"] = round(cls._retry_budget.tokens, 2)
+        return stats
@@ -0,0 +1,147 @@
+"""
+Compact response encodings for mobile clients, picked from the Accept header.
+
+- application/json (default): the regular pydantic response
+- application/msgpack: the same fields, timestamps as epoch seconds
+- application/vnd.currency.f64: fixed little-endian layout, no keys at all
+
+f64 layout, version 1 (24-byte header, then float64 values):
+
+    0   3s  magic b"FXR"
+    3   B   format version
+    4   H   registry version (ordinal table the values are indexed by)
+    6   B   kind: 1 = rates, 2 = conversion
+    7   x   padding
+    8   H   base ordinal
+    10  H   rates: value count / conversion: target ordinal
+    12  4x  padding
+    16  d   timestamp (epoch seconds)
+    24      rates: one float64 per registry ordinal, NaN where unavailable
+            conversion: amount, converted_amount, exchange_rate
+
+Codes outside the registry are only present in the JSON and msgpack forms.
+Clients fetch the ordinal table once per registry version from
+/currencies/ordinals.
+"""
+
+import math
+import struct
+import sys
+from array import array
+from typing import Dict, Optional
+
+import msgpack
+
+from currency_shared import currency_registry
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+F64 = "application/vnd.currency.f64"
+
+FORMAT_VERSION = 1
+KIND_RATES = 1
+KIND_CONVERSION = 2
+
+_MAGIC = b"FXR"
+_HEADER = struct.Struct("<3sBHBxHH4xd")
+_SWAP = sys.byteorder == "big"
+_ORDINALS = {currency.code: currency.ordinal for currency in currency_registry.all_currencies(include_obsolete=True)}
+_EMPTY_RATES = array("d", [math.nan]) * len(_ORDINALS)
+_MSGPACK_ALIASES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """Best supported media type for an Accept header, honouring q-values"""
+    if not accept:
+        return JSON
+    best, best_q = JSON, 0.0
+    for part in accept.split(","):
+        media_type, _, params = part.strip().partition(";")
+        media_type = media_type.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type in _MSGPACK_ALIASES:
+            candidate = MSGPACK
+        elif media_type == F64:
+            candidate = F64
+        elif media_type in (JSON, "application/*", "*/*"):
+            candidate = JSON
+        else:
+            continue
+        # On equal q the compact formats win, since a client only names them on purpose
+        if q > best_q or (q == best_q and q > 0 and candidate != JSON):
+            best, best_q = candidate, q
+    return best
+
+
+def _header(kind: int, base: str, second: int, timestamp: float) -> bytes:
+    return _HEADER.pack(
+        _MAGIC, FORMAT_VERSION, currency_registry.REGISTRY_VERSION, kind,
+        _ORDINALS[base], second, timestamp
+    )
+
+
+def encode_rates_f64(base: str, rates: Dict[str, float], timestamp: float) -> bytes:
+    values = array("d", _EMPTY_RATES)
+    ordinals = _ORDINALS
+    for code, rate in rates.items():
+        ordinal = ordinals.get(code)
+        if ordinal is not None:
+            values[ordinal] = rate
+    if _SWAP:
+        values.byteswap()
+    return _header(KIND_RATES, base, len(values), timestamp) + values.tobytes()
+
+
+def encode_conversion_f64(from_currency: str, to_currency: str, amount: float,
+                          converted_amount: float, exchange_rate: float, timestamp: float) -> bytes:
+    target = _ORDINALS[to_currency]
+    values = array("d", (amount, converted_amount, exchange_rate))
+    if _SWAP:
+        values.byteswap()
+    return _header(KIND_CONVERSION, from_currency, target, timestamp) + values.tobytes()
+
+
+def decode_f64(payload: bytes) -> dict:
+    """Reference decoder, mirrors what clients implement"""
+    if len(payload) < _HEADER.size:
+        raise ValueError("Truncated payload")
+    magic, version, registry_version, kind, base, second, timestamp = _HEADER.unpack_from(payload)
+    if magic != _MAGIC or version != FORMAT_VERSION or kind not in (KIND_RATES, KIND_CONVERSION):
+        raise ValueError("Unsupported payload")
+    # Ordinals of another registry version are resolved against that version's table
+    if registry_version == currency_registry.REGISTRY_VERSION and (
+            base >= len(_ORDINALS) or (kind == KIND_CONVERSION and second >= len(_ORDINALS))):
+        raise ValueError("Unknown ordinal")
+    body = payload[_HEADER.size:]
+    if len(body) != 8 * (second if kind == KIND_RATES else 3):
+        raise ValueError("Truncated payload")
+    values = array("d")
+    values.frombytes(body)
+    if _SWAP:
+        values.byteswap()
+    result = {"registry_version": registry_version, "kind": kind, "base_ordinal": base, "timestamp": timestamp}
+    if kind == KIND_RATES:
+        result["values"] = values.tolist()
+    else:
+        result["target_ordinal"] = second
+        result["amount"], result["converted_amount"], result["exchange_rate"] = values
+    return result
+
+
+def encode_msgpack(payload: dict) -> bytes:
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def ordinal_table() -> dict:
+    return {
+        "format_version": FORMAT_VERSION,
+        "registry_version": currency_registry.REGISTRY_VERSION,
+        "codes": [currency.code for currency in currency_registry.all_currencies(include_obsolete=True)],
+    }
@@ -0,0 +1,70 @@
+"""
+Wallet valuation cost: one /portfolio/value pass versus a /convert per holding.
+
+    python benchmarks/portfolio_bench.py [holdings] [concurrent]
+
+Snapshots are seeded into the in-process cache, so no upstream or Redis is
+needed and the numbers are pure per-worker CPU cost.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from currency_shared import currency_registry  # noqa: E402
+from app.services.currency_service import CurrencyService  # noqa: E402
+from app.services.portfolio_service import PortfolioService  # noqa: E402
+
+TARGETS = ["USD", "EUR", "IDR"]
+
+
+def seed(codes):
+    random.seed(7)
+    pivot = {code: random.uniform(0.1, 20000) for code in codes}
+    pivot["USD"] = 1.0
+    for base in codes:
+        rates = {code: value / pivot[base] for code, value in pivot.items()}
+        CurrencyService.rates_cache.set_local(f"rates:{base}", rates, ttl=3600)
+
+
+async def per_holding(holdings):
+    totals = dict.fromkeys(TARGETS, 0.0)
+    for code, amount in holdings:
+        for target in TARGETS:
+            result = await CurrencyService.convert_currency(code, target, amount)
+            totals[target] += result.converted_amount
+    return totals
+
+
+async def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    concurrent = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    codes = [currency.code for currency in currency_registry.all_currencies()]
+    seed(codes)
+    holdings = [(code, round(random.uniform(1, 50000), 2)) for code in random.sample(codes, count)]
+
+    loop_us = await timed(lambda: per_holding(holdings), 200)
+    value_us = await timed(lambda: PortfolioService.value(holdings, TARGETS), 2000)
+    print(f"{count} holdings x {len(TARGETS)} targets")
+    print(f"convert per holding {loop_us:>10.1f} us")
+    print(f"portfolio valuation {value_us:>10.1f} us  ({loop_us / value_us:.1f}x)")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(PortfolioService.value(holdings, TARGETS) for _ in range(concurrent)))
+    elapsed = time.perf_counter() - start
+    print(f"{concurrent} concurrent valuations in {elapsed * 1000:.1f} ms ({concurrent / elapsed:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
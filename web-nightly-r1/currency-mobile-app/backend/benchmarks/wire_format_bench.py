@@ -0,0 +1,82 @@
+"""
+Payload size and encode/decode cost of the /rates and /convert wire formats.
+
+    python benchmarks/wire_format_bench.py [iterations]
+
+Uses a synthetic snapshot covering every registry currency, so the numbers
+match a real ~160-rate upstream response.
+"""
+
+import gzip
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import msgpack  # noqa: E402
+
+from currency_shared import currency_registry  # noqa: E402
+from app.models.currency import ConversionResponse, ExchangeRatesResponse  # noqa: E402
+from app.utils import wire_format  # noqa: E402
+
+
+def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def report(label, payload, encode, decode, iterations):
+    print(
+        f"{label:<10} {len(payload):>7} B {len(gzip.compress(payload)):>7} B gz "
+        f"{timed(encode, iterations):>9.2f} us enc {timed(decode, iterations):>9.2f} us dec"
+    )
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    random.seed(7)
+    rates = {c.code: random.uniform(0.0001, 20000) for c in currency_registry.all_currencies()}
+    now = datetime.now()
+
+    print(f"rates: {len(rates)} currencies, {iterations} iterations")
+    model = ExchangeRatesResponse(base_currency="USD", rates=rates, timestamp=now)
+    as_json = model.model_dump_json().encode()
+    report("json", as_json, model.model_dump_json, lambda: json.loads(as_json), iterations)
+
+    packed = {"base_currency": "USD", "rates": rates, "timestamp": now.timestamp(), "source": "exchangerate-api"}
+    as_msgpack = wire_format.encode_msgpack(packed)
+    report("msgpack", as_msgpack, lambda: wire_format.encode_msgpack(packed),
+           lambda: msgpack.unpackb(as_msgpack), iterations)
+
+    as_f64 = wire_format.encode_rates_f64("USD", rates, now.timestamp())
+    report("f64", as_f64, lambda: wire_format.encode_rates_f64("USD", rates, now.timestamp()),
+           lambda: wire_format.decode_f64(as_f64), iterations)
+
+    print("\nconvert:")
+    conversion = ConversionResponse(
+        from_currency="USD", to_currency="IDR", amount=125.5, converted_amount=2046335.25,
+        exchange_rate=16305.46, timestamp=now, formatted_result="125.50 USD = 2046335.25 IDR"
+    )
+    as_json = conversion.model_dump_json().encode()
+    report("json", as_json, conversion.model_dump_json, lambda: json.loads(as_json), iterations)
+
+    payload = conversion.model_dump()
+    payload["timestamp"] = now.timestamp()
+    as_msgpack = wire_format.encode_msgpack(payload)
+    report("msgpack", as_msgpack, lambda: wire_format.encode_msgpack(payload),
+           lambda: msgpack.unpackb(as_msgpack), iterations)
+
+    def encode_f64():
+        return wire_format.encode_conversion_f64("USD", "IDR", 125.5, 2046335.25, 16305.46, now.timestamp())
+    as_f64 = encode_f64()
+    report("f64", as_f64, encode_f64, lambda: wire_format.decode_f64(as_f64), iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import os
+import sys
+from array import array
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.services.alert_service import AlertService  # noqa: E402
+
+
+@pytest.fixture
+def alerts(monkeypatch):
+    """AlertService with empty class-level state, restored after the test"""
+    fresh = {
+        "_client_of": array("l"), "_pair_of": array("l"), "_threshold_of": array("d"),
+        "_direction_of": bytearray(), "_active": bytearray(), "_generation": array("l"),
+        "_free_slots": deque(), "_active_count": 0,
+        "_client_ids": [], "_client_index": {}, "_client_refs": array("l"), "_free_clients": [],
+        "_webhooks": {}, "_pair_names": [], "_pair_index": {}, "_books": {},
+        "_queues": {}, "_streams": {}, "_stream_count": 0,
+        "_stats": dict.fromkeys(AlertService._stats, 0),
+    }
+    for name, value in fresh.items():
+        monkeypatch.setattr(AlertService, name, value)
+    return AlertService
+
+
+@pytest.fixture
+async def client():
+    # No lifespan: routes under test need neither Redis nor the upstream API
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://mobile") as client:
+        yield client
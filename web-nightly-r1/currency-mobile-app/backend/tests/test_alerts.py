@@ -0,0 +1,140 @@
+import asyncio
+from functools import partial
+
+import pytest
+
+from app.core.config import settings
+from app.services.currency_service import CurrencyService
+from currency_shared.tiered_cache import LocalCache, TieredCache
+
+
+def register(alerts, client_id="phone-1", direction="above", threshold=1.1, pair=("USD", "EUR")):
+    return alerts.register(client_id, pair[0], pair[1], direction, threshold)
+
+
+def test_evaluate_fires_crossed_thresholds_once(alerts):
+    above = [register(alerts, threshold=t) for t in (1.0, 1.1, 1.2)]
+    below = [register(alerts, direction="below", threshold=t) for t in (0.8, 0.9)]
+
+    assert alerts.evaluate("USD", {"EUR": 1.1}) == 2
+    assert [alerts.describe(i)["active"] for i in above] == [False, False, True]
+    assert alerts.evaluate("USD", {"EUR": 0.85}) == 1
+    assert [alerts.describe(i)["active"] for i in below] == [True, False]
+    assert alerts.evaluate("USD", {"EUR": 0.85}) == 0
+    assert alerts.stats()["active"] == 2
+
+
+def test_reused_slot_makes_the_old_id_stale(alerts):
+    first = register(alerts)
+    assert alerts.cancel(first)
+    second = register(alerts, client_id="phone-2")
+    assert second != first
+    assert alerts.describe(first) is None
+    assert not alerts.cancel(first)
+    assert alerts.stats()["slots"] == 1
+
+
+def test_ownership(alerts):
+    alert_id = register(alerts)
+    assert alerts.owns("phone-1", alert_id)
+    assert not alerts.owns("phone-2", alert_id)
+    assert not alerts.owns("phone-1", alert_id + 1)
+    assert not alerts.owns("phone-1", -1)
+
+
+def test_clients_are_released_with_their_last_slot(alerts):
+    for alert_id in [register(alerts, client_id=client_id) for client_id in ("a", "b", "c")]:
+        alerts.cancel(alert_id)
+    # Each new alert takes the oldest freed slot, releasing the client that held it
+    register(alerts, client_id="d")
+    assert not alerts.has_client("a")
+    assert alerts.has_client("b")
+    register(alerts, client_id="e")
+    assert not alerts.has_client("b")
+    assert alerts.has_client("c")
+    # "e" took over the index "a" left behind
+    assert len(alerts._client_ids) == 4
+
+
+async def test_streams_receive_events_and_drop_their_queue(alerts):
+    alert_id = register(alerts)
+    queue = alerts.subscribe("phone-1")
+    alerts.evaluate("USD", {"EUR": 2.0})
+    event = queue.get_nowait()
+    assert (event["alert_id"], event["active"], event["rate"]) == (alert_id, False, 2.0)
+
+    alerts.unsubscribe("phone-1")
+    assert alerts._queues == {} and alerts.stats()["streams"] == 0
+    register(alerts, threshold=1.0)
+    alerts.evaluate("USD", {"EUR": 2.0})
+    assert alerts.stats()["unsubscribed"] == 1
+
+
+async def test_stream_limit(alerts, monkeypatch):
+    monkeypatch.setattr(settings, "ALERT_MAX_STREAMS", 1)
+    register(alerts)
+    assert alerts.subscribe("phone-1") is not None
+    assert alerts.subscribe("phone-1") is None
+    assert alerts.stats()["streams_rejected"] == 1
+    alerts.unsubscribe("phone-1")
+    assert alerts.subscribe("phone-1") is not None
+
+
+async def test_routes_scope_alerts_to_their_client(alerts, client):
+    body = {"client_id": "phone-1", "from_currency": "usd", "to_currency": "eur", "direction": "above", "threshold": 1.2}
+    created = (await client.post("/api/v1/alerts", json=body)).json()
+    alert_id = created["alert_id"]
+    assert created["from_currency"] == "USD" and created["active"]
+
+    assert (await client.get(f"/api/v1/alerts/{alert_id}?client_id=phone-2")).status_code == 404
+    assert (await client.get(f"/api/v1/alerts/{alert_id}")).status_code == 422
+    assert (await client.get(f"/api/v1/alerts/{alert_id}?client_id=phone-1")).json() == created
+
+    assert (await client.delete(f"/api/v1/alerts/{alert_id}?client_id=phone-2")).status_code == 404
+    response = await client.delete(f"/api/v1/alerts/{alert_id}?client_id=phone-1")
+    assert response.json() == {"alert_id": alert_id, "cancelled": True}
+    assert (await client.delete(f"/api/v1/alerts/{alert_id}?client_id=phone-1")).status_code == 404
+
+
+@pytest.mark.parametrize("currency", ["XXX", "US1"])
+async def test_create_rejects_unknown_currencies(alerts, client, currency):
+    body = {"client_id": "phone-1", "from_currency": currency, "to_currency": "EUR", "direction": "above", "threshold": 1}
+    assert (await client.post("/api/v1/alerts", json=body)).status_code == 400
+
+
+async def test_stream_refuses_unknown_clients_and_full_server(alerts, client, monkeypatch):
+    assert (await client.get("/api/v1/alerts/stream/nobody")).status_code == 404
+    register(alerts)
+    monkeypatch.setattr(settings, "ALERT_MAX_STREAMS", 0)
+    response = await client.get("/api/v1/alerts/stream/phone-1")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "30"
+
+
+@pytest.mark.parametrize("threshold", ["Infinity", "NaN", '"inf"'])
+async def test_create_rejects_non_finite_thresholds(alerts, client, threshold):
+    content = ('{"client_id": "phone-1", "from_currency": "USD", "to_currency": "EUR", '
+               f'"direction": "above", "threshold": {threshold}}}')
+    response = await client.post("/api/v1/alerts", content=content, headers={"content-type": "application/json"})
+    assert response.status_code == 422
+    assert alerts.stats()["active"] == 0
+
+
+async def test_refresh_loop_does_not_count_as_demand(alerts, monkeypatch):
+    cache = TieredCache(LocalCache(max_entries=4, ttl=60), default_ttl=60)
+    await cache.set("rates:USD", {"EUR": 2.0})
+    monkeypatch.setattr(CurrencyService, "rates_cache", cache)
+    monkeypatch.setattr(CurrencyService, "_demand", {})
+    monkeypatch.setattr(settings, "ALERT_REFRESH_INTERVAL", 0)
+    alert_id = register(alerts)
+
+    task = asyncio.ensure_future(
+        alerts.refresh_loop(partial(CurrencyService.get_exchange_rates, count_demand=False)))
+    for _ in range(5):
+        await asyncio.sleep(0)
+    task.cancel()
+
+    assert not alerts.describe(alert_id)["active"]
+    assert CurrencyService._demand == {}
+    await CurrencyService.get_exchange_rates("USD")
+    assert CurrencyService._demand == {"USD": 1.0}
@@ -0,0 +1,53 @@
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services.upstream_client import RetryBudget, UpstreamClient
+from currency_shared.quota import QuotaBudget
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """UpstreamClient answering from a list of responses, without sleeping between attempts"""
+    responses, requests = [], []
+
+    def handler(request):
+        requests.append(request)
+        return responses.pop(0)
+
+    monkeypatch.setattr(UpstreamClient, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(UpstreamClient, "_retry_budget", RetryBudget(1.0))
+    monkeypatch.setattr(UpstreamClient, "_stats", dict.fromkeys(UpstreamClient._stats, 0))
+    monkeypatch.setattr(UpstreamClient, "_backoff", classmethod(lambda cls, attempt: 0))
+    monkeypatch.setattr(settings, "UPSTREAM_MAX_ATTEMPTS", 3)
+    return responses, requests
+
+
+async def test_every_attempt_is_charged_to_the_quota(upstream):
+    responses, requests = upstream
+    responses.extend([httpx.Response(503), httpx.Response(503), httpx.Response(200, json={})])
+    quota = QuotaBudget(monthly_limit=2)
+
+    assert await UpstreamClient.get_json("https://rates.test/USD", quota=quota) is None
+    assert len(requests) == 2
+    assert quota.month_used == 2
+    assert UpstreamClient.stats()["quota_denied"] == 1
+
+
+async def test_rate_limited_request_is_not_retried_blindly(upstream):
+    responses, requests = upstream
+    responses.append(httpx.Response(429))
+
+    assert await UpstreamClient.get_json("https://rates.test/USD") is None
+    assert len(requests) == 1
+    assert UpstreamClient.stats()["rate_limited"] == 1
+
+
+@pytest.mark.parametrize("retry_after, attempts", [("0", 2), ("86400", 1)])
+async def test_rate_limited_request_honours_retry_after(upstream, retry_after, attempts):
+    responses, requests = upstream
+    responses.extend([httpx.Response(429, headers={"Retry-After": retry_after}), httpx.Response(200, json={"ok": 1})])
+
+    result = await UpstreamClient.get_json("https://rates.test/USD", quota=QuotaBudget(monthly_limit=5))
+    assert len(requests) == attempts
+    assert result == ({"ok": 1} if attempts == 2 else None)
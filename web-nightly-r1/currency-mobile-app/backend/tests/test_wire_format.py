@@ -0,0 +1,93 @@
+import math
+import struct
+
+import msgpack
+import pytest
+
+from app.utils import wire_format
+from currency_shared import currency_registry
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, wire_format.JSON),
+    ("", wire_format.JSON),
+    ("application/json", wire_format.JSON),
+    ("*/*", wire_format.JSON),
+    ("text/html", wire_format.JSON),
+    ("application/x-msgpack", wire_format.MSGPACK),
+    ("Application/MsgPack", wire_format.MSGPACK),
+    ("application/vnd.currency.f64", wire_format.F64),
+    # Compact formats win a tie, but not a higher q
+    ("application/json, application/msgpack", wire_format.MSGPACK),
+    ("application/json;q=1, application/msgpack;q=0.5", wire_format.JSON),
+    ("application/msgpack;q=0.4, application/vnd.currency.f64;q=0.8", wire_format.F64),
+    ("application/vnd.currency.f64; charset=x; q=0.9, */*;q=0.1", wire_format.F64),
+    # Refused or malformed q-values fall back to JSON
+    ("application/msgpack;q=0", wire_format.JSON),
+    ("application/msgpack;q=high", wire_format.JSON),
+])
+def test_negotiate(accept, expected):
+    assert wire_format.negotiate(accept) == expected
+
+
+def test_rates_round_trip_by_registry_ordinal():
+    rates = {"EUR": 0.92, "JPY": 151.25, "KWD": 0.307}
+    decoded = wire_format.decode_f64(wire_format.encode_rates_f64("USD", rates, 1700000000.5))
+
+    codes = wire_format.ordinal_table()["codes"]
+    assert decoded["registry_version"] == currency_registry.REGISTRY_VERSION
+    assert decoded["kind"] == wire_format.KIND_RATES
+    assert codes[decoded["base_ordinal"]] == "USD"
+    assert decoded["timestamp"] == 1700000000.5
+    assert len(decoded["values"]) == len(codes)
+    assert {codes[i]: value for i, value in enumerate(decoded["values"]) if not math.isnan(value)} == rates
+
+
+def test_conversion_round_trip_by_registry_ordinal():
+    payload = wire_format.encode_conversion_f64("EUR", "IDR", 12.5, 212500.0, 17000.0, 1700000000.0)
+    decoded = wire_format.decode_f64(payload)
+
+    assert len(payload) == wire_format._HEADER.size + 24
+    assert currency_registry.by_ordinal(decoded["base_ordinal"]).code == "EUR"
+    assert currency_registry.by_ordinal(decoded["target_ordinal"]).code == "IDR"
+    assert (decoded["amount"], decoded["converted_amount"], decoded["exchange_rate"]) == (12.5, 212500.0, 17000.0)
+
+
+def test_codes_outside_the_registry_are_left_out_of_f64():
+    decoded = wire_format.decode_f64(wire_format.encode_rates_f64("USD", {"ZZZ": 3.0, "EUR": 0.9}, 0.0))
+    present = [value for value in decoded["values"] if not math.isnan(value)]
+    assert present == [0.9]
+    with pytest.raises(KeyError):
+        wire_format.encode_conversion_f64("USD", "ZZZ", 1.0, 1.0, 1.0, 0.0)
+
+
+def header(kind=wire_format.KIND_CONVERSION, base=0, second=0, registry_version=None, magic=b"FXR", version=1):
+    if registry_version is None:
+        registry_version = currency_registry.REGISTRY_VERSION
+    return wire_format._HEADER.pack(magic, version, registry_version, kind, base, second, 0.0)
+
+
+@pytest.mark.parametrize("payload, error", [
+    (header(second=len(wire_format.ordinal_table()["codes"])) + bytes(24), "Unknown ordinal"),
+    (header(base=0xFFFF) + bytes(24), "Unknown ordinal"),
+    (header(magic=b"XYZ") + bytes(24), "Unsupported payload"),
+    (header(version=2) + bytes(24), "Unsupported payload"),
+    (header(kind=3) + bytes(24), "Unsupported payload"),
+    (header() + bytes(16), "Truncated payload"),
+    (header(kind=wire_format.KIND_RATES, second=4) + bytes(24), "Truncated payload"),
+    (b"FXR", "Truncated payload"),
+])
+def test_decode_rejects_unknown_ordinals_and_malformed_payloads(payload, error):
+    with pytest.raises(ValueError, match=error):
+        wire_format.decode_f64(payload)
+
+
+def test_ordinals_of_another_registry_version_are_passed_through():
+    payload = header(base=0xFFFF, second=0xFFFE, registry_version=currency_registry.REGISTRY_VERSION + 1)
+    decoded = wire_format.decode_f64(payload + struct.pack("<3d", 1.0, 2.0, 2.0))
+    assert (decoded["base_ordinal"], decoded["target_ordinal"]) == (0xFFFF, 0xFFFE)
+
+
+def test_msgpack_keeps_the_json_fields():
+    payload = {"base_currency": "USD", "rates": {"EUR": 0.92}, "timestamp": 1700000000.0}
+    assert msgpack.unpackb(wire_format.encode_msgpack(payload)) == payload
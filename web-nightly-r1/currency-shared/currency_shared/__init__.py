@@ -0,0 +1,9 @@
+"""
+Kconvert - Shared Backend Modules
+
+Used by both the Kconvert API (Currency/backend) and the mobile backend
+(currency-mobile-app/backend).
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Currency Registry
+
+Single source of currency metadata: ISO code, name, flag country, ISO 4217
+minor units and obsolete status. Everything is built once at import into
+read-only indexes, including a prefix trie over code, name and country whose
+nodes hold precomputed rankings, so a type-ahead lookup is one walk of at most
+len(query) nodes.
+
+Ordinals are the position in _CURRENCY_DATA and are part of the wire format
+of compact responses: only append rows, never reorder or delete them, and bump
+REGISTRY_VERSION when rows are added or changed (it is also the ETag of the
+currency list).
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import unicodedata
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+REGISTRY_VERSION = 2
+
+
+class Currency(NamedTuple):
+    code: str
+    name: str
+    country: str  # ISO 3166 alpha-2 of the flag shown, or EU (reserved alpha-2) for the euro
+    country_name: str
+    minor_units: int
+    obsolete: bool
+    replaced_by: Optional[str]
+    ordinal: int
+
+
+# (code, name, country, country name, minor units, replaced by) -- append only
+_CURRENCY_DATA = (
+    ("USD", "US Dollar", "US", "United States", 2, None),
+    ("EUR", "Euro", "EU", "European Union", 2, None),
+    ("GBP", "British Pound", "GB", "United Kingdom", 2, None),
+    ("JPY", "Japanese Yen", "JP", "Japan", 0, None),
+    ("AUD", "Australian Dollar", "AU", "Australia", 2, None),
+    ("CAD", "Canadian Dollar", "CA", "Canada", 2, None),
+    ("CHF", "Swiss Franc", "CH", "Switzerland", 2, None),
+    ("CNY", "Chinese Yuan", "CN", "China", 2, None),
+    ("SEK", "Swedish Krona", "SE", "Sweden", 2, None),
+    ("NZD", "New Zealand Dollar", "NZ", "New Zealand", 2, None),
+    ("MXN", "Mexican Peso", "MX", "Mexico", 2, None),
+    ("SGD", "Singapore Dollar", "SG", "Singapore", 2, None),
+    ("HKD", "Hong Kong Dollar", "HK", "Hong Kong", 2, None),
+    ("NOK", "Norwegian Krone", "NO", "Norway", 2, None),
+    ("TRY", "Turkish Lira", "TR", "Turkey", 2, None),
+    ("RUB", "Russian Ruble", "RU", "Russia", 2, None),
+    ("INR", "Indian Rupee", "IN", "India", 2, None),
+    ("BRL", "Brazilian Real", "BR", "Brazil", 2, None),
+    ("ZAR", "South African Rand", "ZA", "South Africa", 2, None),
+    ("KRW", "South Korean Won", "KR", "South Korea", 0, None),
+    ("PLN", "Polish Zloty", "PL", "Poland", 2, None),
+    ("THB", "Thai Baht", "TH", "Thailand", 2, None),
+    ("MYR", "Malaysian Ringgit", "MY", "Malaysia", 2, None),
+    ("AED", "UAE Dirham", "AE", "United Arab Emirates", 2, None),
+    ("SAR", "Saudi Riyal", "SA", "Saudi Arabia", 2, None),
+    ("ILS", "Israeli Shekel", "IL", "Israel", 2, None),
+    ("CLP", "Chilean Peso", "CL", "Chile", 0, None),
+    ("COP", "Colombian Peso", "CO", "Colombia", 2, None),
+    ("ARS", "Argentine Peso", "AR", "Argentina", 2, None),
+    ("TWD", "Taiwan Dollar", "TW", "Taiwan", 2, None),
+    ("DKK", "Danish Krone", "DK", "Denmark", 2, None),
+    ("CZK", "Czech Koruna", "CZ", "Czech Republic", 2, None),
+    ("HUF", "Hungarian Forint", "HU", "Hungary", 2, None),
+    ("RON", "Romanian Leu", "RO", "Romania", 2, None),
+    ("BGN", "Bulgarian Lev", "BG", "Bulgaria", 2, None),
+    ("HRK", "Croatian Kuna", "HR", "Croatia", 2, "EUR"),
+    ("ISK", "Icelandic Krona", "IS", "Iceland", 0, None),
+    ("ALL", "Albanian Lek", "AL", "Albania", 2, None),
+    ("BAM", "Bosnia-Herzegovina Convertible Mark", "BA", "Bosnia and Herzegovina", 2, None),
+    ("MKD", "Macedonian Denar", "MK", "North Macedonia", 2, None),
+    ("RSD", "Serbian Dinar", "RS", "Serbia", 2, None),
+    ("MDL", "Moldovan Leu", "MD", "Moldova", 2, None),
+    ("PHP", "Philippine Peso", "PH", "Philippines", 2, None),
+    ("IDR", "Indonesian Rupiah", "ID", "Indonesia", 2, None),
+    ("VND", "Vietnamese Dong", "VN", "Vietnam", 0, None),
+    ("KHR", "Cambodian Riel", "KH", "Cambodia", 2, None),
+    ("LAK", "Laotian Kip", "LA", "Laos", 2, None),
+    ("MMK", "Myanmar Kyat", "MM", "Myanmar", 2, None),
+    ("BDT", "Bangladeshi Taka", "BD", "Bangladesh", 2, None),
+    ("PKR", "Pakistani Rupee", "PK", "Pakistan", 2, None),
+    ("NPR", "Nepalese Rupee", "NP", "Nepal", 2, None),
+    ("LKR", "Sri Lankan Rupee", "LK", "Sri Lanka", 2, None),
+    ("MVR", "Maldivian Rufiyaa", "MV", "Maldives", 2, None),
+    ("BTN", "Bhutanese Ngultrum", "BT", "Bhutan", 2, None),
+    ("AFN", "Afghan Afghani", "AF", "Afghanistan", 2, None),
+    ("UZS", "Uzbekistani Som", "UZ", "Uzbekistan", 2, None),
+    ("KZT", "Kazakhstani Tenge", "KZ", "Kazakhstan", 2, None),
+    ("KGS", "Kyrgystani Som", "KG", "Kyrgyzstan", 2, None),
+    ("TJS", "Tajikistani Somoni", "TJ", "Tajikistan", 2, None),
+    ("TMT", "Turkmenistani Manat", "TM", "Turkmenistan", 2, None),
+    ("MNT", "Mongolian Tugrik", "MN", "Mongolia", 2, None),
+    ("KPW", "North Korean Won", "KP", "North Korea", 2, None),
+    ("QAR", "Qatari Riyal", "QA", "Qatar", 2, None),
+    ("KWD", "Kuwaiti Dinar", "KW", "Kuwait", 3, None),
+    ("BHD", "Bahraini Dinar", "BH", "Bahrain", 3, None),
+    ("OMR", "Omani Rial", "OM", "Oman", 3, None),
+    ("JOD", "Jordanian Dinar", "JO", "Jordan", 3, None),
+    ("LBP", "Lebanese Pound", "LB", "Lebanon", 2, None),
+    ("SYP", "Syrian Pound", "SY", "Syria", 2, None),
+    ("IQD", "Iraqi Dinar", "IQ", "Iraq", 3, None),
+    ("IRR", "Iranian Rial", "IR", "Iran", 2, None),
+    ("GEL", "Georgian Lari", "GE", "Georgia", 2, None),
+    ("AMD", "Armenian Dram", "AM", "Armenia", 2, None),
+    ("AZN", "Azerbaijani Manat", "AZ", "Azerbaijan", 2, None),
+    ("EGP", "Egyptian Pound", "EG", "Egypt", 2, None),
+    ("NGN", "Nigerian Naira", "NG", "Nigeria", 2, None),
+    ("KES", "Kenyan Shilling", "KE", "Kenya", 2, None),
+    ("GHS", "Ghanaian Cedi", "GH", "Ghana", 2, None),
+    ("MAD", "Moroccan Dirham", "MA", "Morocco", 2, None),
+    ("TND", "Tunisian Dinar", "TN", "Tunisia", 3, None),
+    ("DZD", "Algerian Dinar", "DZ", "Algeria", 2, None),
+    ("LYD", "Libyan Dinar", "LY", "Libya", 3, None),
+    ("ETB", "Ethiopian Birr", "ET", "Ethiopia", 2, None),
+    ("UGX", "Ugandan Shilling", "UG", "Uganda", 0, None),
+    ("TZS", "Tanzanian Shilling", "TZ", "Tanzania", 2, None),
+    ("RWF", "Rwandan Franc", "RW", "Rwanda", 0, None),
+    ("XOF", "West African CFA Franc", "SN", "Senegal", 0, None),
+    ("XAF", "Central African CFA Franc", "CF", "Central African Republic", 0, None),
+    ("MGA", "Malagasy Ariary", "MG", "Madagascar", 2, None),
+    ("MUR", "Mauritian Rupee", "MU", "Mauritius", 2, None),
+    ("SCR", "Seychellois Rupee", "SC", "Seychelles", 2, None),
+    ("SZL", "Swazi Lilangeni", "SZ", "Eswatini", 2, None),
+    ("LSL", "Lesotho Loti", "LS", "Lesotho", 2, None),
+    ("BWP", "Botswanan Pula", "BW", "Botswana", 2, None),
+    ("NAD", "Namibian Dollar", "NA", "Namibia", 2, None),
+    ("ZMW", "Zambian Kwacha", "ZM", "Zambia", 2, None),
+    ("ZWL", "Zimbabwean Dollar", "ZW", "Zimbabwe", 2, None),
+    ("MWK", "Malawian Kwacha", "MW", "Malawi", 2, None),
+    ("MZN", "Mozambican Metical", "MZ", "Mozambique", 2, None),
+    ("AOA", "Angolan Kwanza", "AO", "Angola", 2, None),
+    ("CVE", "Cape Verdean Escudo", "CV", "Cape Verde", 2, None),
+    ("GMD", "Gambian Dalasi", "GM", "Gambia", 2, None),
+    ("GNF", "Guinean Franc", "GN", "Guinea", 0, None),
+    ("LRD", "Liberian Dollar", "LR", "Liberia", 2, None),
+    ("SLL", "Sierra Leonean Leone", "SL", "Sierra Leone", 2, None),
+    ("STD", "São Tomé and Príncipe Dobra (1977-2017)", "ST", "São Tomé and Príncipe", 2, "STN"),
+    ("CDF", "Congolese Franc", "CD", "DR Congo", 2, None),
+    ("DJF", "Djiboutian Franc", "DJ", "Djibouti", 0, None),
+    ("ERN", "Eritrean Nakfa", "ER", "Eritrea", 2, None),
+    ("SOS", "Somali Shilling", "SO", "Somalia", 2, None),
+    ("SDP", "Sudanese Pound (1956-1992)", "SD", "Sudan", 2, "SDG"),
+    ("SSP", "South Sudanese Pound", "SS", "South Sudan", 2, None),
+    ("BYN", "Belarusian Ruble", "BY", "Belarus", 2, None),
+    ("UAH", "Ukrainian Hryvnia", "UA", "Ukraine", 2, None),
+    ("JMD", "Jamaican Dollar", "JM", "Jamaica", 2, None),
+    ("TTD", "Trinidad and Tobago Dollar", "TT", "Trinidad and Tobago", 2, None),
+    ("BBD", "Barbadian Dollar", "BB", "Barbados", 2, None),
+    ("BSD", "Bahamian Dollar", "BS", "Bahamas", 2, None),
+    ("BZD", "Belize Dollar", "BZ", "Belize", 2, None),
+    ("XCD", "East Caribbean Dollar", "AG", "Antigua and Barbuda", 2, None),
+    ("HTG", "Haitian Gourde", "HT", "Haiti", 2, None),
+    ("DOP", "Dominican Peso", "DO", "Dominican Republic", 2, None),
+    ("CUP", "Cuban Peso", "CU", "Cuba", 2, None),
+    ("KYD", "Cayman Islands Dollar", "KY", "Cayman Islands", 2, None),
+    ("AWG", "Aruban Florin", "AW", "Aruba", 2, None),
+    ("ANG", "Netherlands Antillean Guilder", "CW", "Curaçao", 2, None),
+    ("SRD", "Surinamese Dollar", "SR", "Suriname", 2, None),
+    ("GYD", "Guyanese Dollar", "GY", "Guyana", 2, None),
+    ("FJD", "Fijian Dollar", "FJ", "Fiji", 2, None),
+    ("TOP", "Tongan Pa'anga", "TO", "Tonga", 2, None),
+    ("WST", "Samoan Tala", "WS", "Samoa", 2, None),
+    ("VUV", "Vanuatu Vatu", "VU", "Vanuatu", 0, None),
+    ("SBD", "Solomon Islands Dollar", "SB", "Solomon Islands", 2, None),
+    ("PGK", "Papua New Guinean Kina", "PG", "Papua New Guinea", 2, None),
+    ("XPF", "CFP Franc", "NC", "New Caledonia", 0, None),
+    ("AQD", "Antarctic Dollar", "AQ", "Antarctica", 2, None),
+    ("BIF", "Burundian Franc", "BI", "Burundi", 0, None),
+    ("BMD", "Bermudian Dollar", "BM", "Bermuda", 2, None),
+    ("BND", "Brunei Dollar", "BN", "Brunei", 2, None),
+    ("BOB", "Bolivian Boliviano", "BO", "Bolivia", 2, None),
+    ("BYR", "Belarusian Ruble (2000-2016)", "BY", "Belarus", 0, "BYN"),
+    ("CRC", "Costa Rican Colón", "CR", "Costa Rica", 2, None),
+    ("CYP", "Cypriot Pound", "CY", "Cyprus", 2, "EUR"),
+    ("ECS", "Ecuadorian Sucre", "EC", "Ecuador", 0, "USD"),
+    ("EEK", "Estonian Kroon", "EE", "Estonia", 2, "EUR"),
+    ("FKP", "Falkland Islands Pound", "FK", "Falkland Islands", 2, None),
+    ("GGP", "Guernsey Pound", "GG", "Guernsey", 2, None),
+    ("GIP", "Gibraltar Pound", "GI", "Gibraltar", 2, None),
+    ("GTQ", "Guatemalan Quetzal", "GT", "Guatemala", 2, None),
+    ("HNL", "Honduran Lempira", "HN", "Honduras", 2, None),
+    ("KMF", "Comorian Franc", "KM", "Comoros", 0, None),
+    ("LTL", "Lithuanian Litas", "LT", "Lithuania", 2, "EUR"),
+    ("LVL", "Latvian Lats", "LV", "Latvia", 2, "EUR"),
+    ("MOP", "Macanese Pataca", "MO", "Macau", 2, None),
+    ("MRO", "Mauritanian Ouguiya (1973-2017)", "MR", "Mauritania", 2, "MRU"),
+    ("MTL", "Maltese Lira", "MT", "Malta", 2, "EUR"),
+    ("NIO", "Nicaraguan Córdoba", "NI", "Nicaragua", 2, None),
+    ("PAB", "Panamanian Balboa", "PA", "Panama", 2, None),
+    ("PEN", "Peruvian Sol", "PE", "Peru", 2, None),
+    ("PYG", "Paraguayan Guarani", "PY", "Paraguay", 0, None),
+    ("SDG", "Sudanese Pound", "SD", "Sudan", 2, None),
+    ("SKK", "Slovak Koruna", "SK", "Slovakia", 2, "EUR"),
+    ("SVC", "Salvadoran Colón", "SV", "El Salvador", 2, None),
+    ("UYU", "Uruguayan Peso", "UY", "Uruguay", 2, None),
+    ("VEF", "Venezuelan Bolívar (2008-2018)", "VE", "Venezuela", 2, "VES"),
+    ("YER", "Yemeni Rial", "YE", "Yemen", 2, None),
+    ("ZMK", "Zambian Kwacha (1968-2012)", "ZM", "Zambia", 2, "ZMW"),
+    ("ZWD", "Zimbabwean Dollar (1980-2008)", "ZW", "Zimbabwe", 2, "ZWL"),
+    ("MRU", "Mauritanian Ouguiya", "MR", "Mauritania", 2, None),
+    ("STN", "São Tomé and Príncipe Dobra", "ST", "São Tomé and Príncipe", 2, None),
+    ("VES", "Venezuelan Bolívar", "VE", "Venezuela", 2, None),
+    ("SLE", "Sierra Leonean Leone", "SL", "Sierra Leone", 2, None),
+)
+
+# Withdrawn codes (or, for AQD, never ISO 4217) kept so old clients still resolve
+_OBSOLETE_CODES = frozenset({
+    "AQD", "BYR", "CYP", "ECS", "EEK", "HRK", "LTL", "LVL", "MRO", "MTL",
+    "SDP", "SKK", "STD", "VEF", "ZMK", "ZWD",
+})
+
+# Match scores, highest first (mirrors the web client's type-ahead ranking)
+_SCORE_CODE_EXACT = 100
+_SCORE_NAME_EXACT = 90
+_SCORE_COUNTRY_EXACT = 85
+_SCORE_CODE_PREFIX = 80
+_SCORE_NAME_PREFIX = 70
+_SCORE_COUNTRY_PREFIX = 65
+_SCORE_WORD_PREFIX = 60
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and collapse whitespace for matching"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.lower().split())
+
+
+class _TrieNode:
+    __slots__ = ("children", "scores", "ranked")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # ordinal -> best score while building; frozen into `ranked` afterwards
+        self.scores: Dict[int, int] = {}
+        self.ranked: Tuple[int, ...] = ()
+
+
+def _insert(root: _TrieNode, key: str, ordinal: int, prefix_score: int, exact_score: int) -> None:
+    node = root
+    for ch in key:
+        node = node.children.setdefault(ch, _TrieNode())
+        if node.scores.get(ordinal, 0) < prefix_score:
+            node.scores[ordinal] = prefix_score
+    if node.scores[ordinal] < exact_score:
+        node.scores[ordinal] = exact_score
+
+
+def _freeze(root: _TrieNode) -> None:
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        # Ties break on ordinal, which lists the major currencies first
+        node.ranked = tuple(sorted(node.scores, key=lambda ordinal: (-node.scores[ordinal], ordinal)))
+        node.scores = {}
+        stack.extend(node.children.values())
+
+
+def _build():
+    currencies = tuple(
+        Currency(code, name, country, country_name, minor_units, code in _OBSOLETE_CODES, replaced_by, ordinal)
+        for ordinal, (code, name, country, country_name, minor_units, replaced_by) in enumerate(_CURRENCY_DATA)
+    )
+    root = _TrieNode()
+    for currency in currencies:
+        ordinal = currency.ordinal
+        _insert(root, currency.code.lower(), ordinal, _SCORE_CODE_PREFIX, _SCORE_CODE_EXACT)
+        _insert(root, currency.country.lower(), ordinal, _SCORE_COUNTRY_PREFIX, _SCORE_COUNTRY_EXACT)
+        for text, prefix_score, exact_score in (
+            (currency.name, _SCORE_NAME_PREFIX, _SCORE_NAME_EXACT),
+            (currency.country_name, _SCORE_COUNTRY_PREFIX, _SCORE_COUNTRY_EXACT),
+        ):
+            key = normalize(text)
+            _insert(root, key, ordinal, prefix_score, exact_score)
+            words = key.split()
+            for i in range(1, len(words)):
+                _insert(root, " ".join(words[i:]), ordinal, _SCORE_WORD_PREFIX, _SCORE_WORD_PREFIX)
+    _freeze(root)
+    return currencies, root
+
+
+_BY_ORDINAL, _TRIE = _build()
+
+BY_CODE: Mapping[str, Currency] = MappingProxyType({c.code: c for c in _BY_ORDINAL})
+ACTIVE_CODES: Tuple[str, ...] = tuple(c.code for c in _BY_ORDINAL if not c.obsolete)
+_ACTIVE = frozenset(ACTIVE_CODES)
+
+
+def get(code: str) -> Optional[Currency]:
+    return BY_CODE.get(code.upper())
+
+
+def by_ordinal(ordinal: int) -> Currency:
+    return _BY_ORDINAL[ordinal]
+
+
+def all_currencies(include_obsolete: bool = False) -> Tuple[Currency, ...]:
+    if include_obsolete:
+        return _BY_ORDINAL
+    return tuple(c for c in _BY_ORDINAL if not c.obsolete)
+
+
+def is_active(code: str) -> bool:
+    return code in _ACTIVE
+
+
+def names(include_obsolete: bool = False) -> Dict[str, str]:
+    """code -> display name"""
+    return {c.code: c.name for c in all_currencies(include_obsolete)}
+
+
+def country_codes(include_obsolete: bool = False) -> Dict[str, str]:
+    """code -> flag country (ISO 3166 alpha-2)"""
+    return {c.code: c.country for c in all_currencies(include_obsolete)}
+
+
+def search(query: str, limit: int = 10, include_obsolete: bool = False) -> List[Currency]:
+    """Ranked prefix matches on code, name (or any word of it) and country"""
+    node = _TRIE
+    for ch in normalize(query):
+        node = node.children.get(ch)
+        if node is None:
+            return []
+    if node is _TRIE:
+        return []
+    results = []
+    for ordinal in node.ranked:
+        currency = _BY_ORDINAL[ordinal]
+        if currency.obsolete and not include_obsolete:
+            continue
+        results.append(currency)
+        if len(results) >= limit:
+            break
+    return results
+
+
+def to_dict(currency: Currency) -> Dict:
+    return currency._asdict()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Fixed-Point Money Arithmetic
+
+Exact conversions on scaled integers instead of floats or Decimal.
+
+Amounts are integers in the currency's minor units (cents, fils, yen). A rate
+is an integer mantissa with RATE_DIGITS significant digits and a decimal
+exponent, rate = units / 10**exponent. A conversion is then one integer
+multiply and one division with banker's rounding into the target's minor
+units (JPY 0, USD 2, KWD 3).
+
+convert_minor_array does the same on NumPy int64 with no 128-bit
+intermediate: the mantissa is split into base-10**6 limbs so every partial
+product stays under 2**63. Rows that could still overflow fall back to exact
+Python integers, so the guard never changes a result.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+from collections import OrderedDict
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import Dict, NamedTuple, Union
+
+import numpy as np
+
+from currency_shared import currency_registry
+
+RATE_DIGITS = 12
+# Caps the divisor at 10**18 so it fits int64; rates below ~1e-4 keep fewer digits
+MAX_RATE_EXPONENT = 15
+DEFAULT_MINOR_UNITS = 2
+
+_LIMB = 10 ** 6
+_INT64_MAX = 2 ** 63 - 1
+
+
+class ScaledRate(NamedTuple):
+    units: int
+    exponent: int
+
+    def __float__(self) -> float:
+        return self.units / 10 ** self.exponent
+
+
+def _decimal(value: Union[float, int, str, Decimal]) -> Decimal:
+    # repr() gives the shortest decimal that round-trips, not the binary expansion
+    return Decimal(repr(value)) if isinstance(value, float) else Decimal(value)
+
+
+def scale_rate(rate: Union[float, str, Decimal]) -> ScaledRate:
+    """Rate as an integer mantissa of RATE_DIGITS significant digits"""
+    value = _decimal(rate)
+    if not value.is_finite() or value <= 0:
+        raise ValueError(f"Invalid rate: {rate}")
+    exponent = min(MAX_RATE_EXPONENT, max(0, RATE_DIGITS - 1 - value.adjusted()))
+    return ScaledRate(int(value.scaleb(exponent).to_integral_value(ROUND_HALF_EVEN)), exponent)
+
+
+def minor_units(code: str) -> int:
+    currency = currency_registry.get(code)
+    return currency.minor_units if currency else DEFAULT_MINOR_UNITS
+
+
+def to_minor(amount: Union[float, int, str, Decimal], minor: int) -> int:
+    """Amount in minor units, rounded half-to-even"""
+    return int(_decimal(amount).scaleb(minor).to_integral_value(ROUND_HALF_EVEN))
+
+
+def minor_to_float(value: int, minor: int) -> float:
+    return value / 10 ** minor
+
+
+def format_minor(value: int, minor: int) -> str:
+    """Exact decimal string, e.g. (123456, 3) -> "123.456" """
+    sign, digits = ("-" if value < 0 else ""), str(abs(value))
+    if minor == 0:
+        return sign + digits
+    digits = digits.rjust(minor + 1, "0")
+    return f"{sign}{digits[:-minor]}.{digits[-minor:]}"
+
+
+def _div_half_even(numerator: int, divisor: int) -> int:
+    quotient, remainder = divmod(numerator, divisor)
+    twice = 2 * remainder
+    if twice > divisor or (twice == divisor and quotient & 1):
+        quotient += 1
+    return quotient
+
+
+def convert_minor(amount_minor: int, rate: ScaledRate, from_minor: int, to_minor: int) -> int:
+    """Exact conversion between minor units with banker's rounding"""
+    shift = rate.exponent + from_minor - to_minor
+    product = amount_minor * rate.units
+    if shift <= 0:
+        return product * 10 ** -shift
+    return _div_half_even(product, 10 ** shift)
+
+
+def convert_minor_array(amounts, units, shifts) -> np.ndarray:
+    """
+    Vectorised convert_minor on int64: amounts * units / 10**shifts, half-to-even.
+    Arguments broadcast; shifts = exponent + from_minor - to_minor per element.
+    """
+    amounts, units, shifts = np.broadcast_arrays(
+        np.asarray(amounts, dtype=np.int64), np.asarray(units, dtype=np.int64), np.asarray(shifts, dtype=np.int64)
+    )
+    sign = np.sign(amounts)
+    magnitude = np.abs(amounts)
+
+    # Fold shifts below one limb into the mantissa so every row divides by >= 10**6
+    pad = 10 ** np.maximum(6 - shifts, 0)
+    safe = units <= _INT64_MAX // pad
+    mantissa = units * np.where(safe, pad, 1)
+    divisor_exponent = np.maximum(shifts, 6)
+
+    high, low = np.divmod(mantissa, _LIMB)
+    safe &= magnitude <= np.minimum(_INT64_MAX // (high + 1), _INT64_MAX // _LIMB)
+    magnitude = np.where(safe, magnitude, 0)
+
+    # a*m / 10**s = (a*high + (a*low) // 10**6 + ((a*low) % 10**6) / 10**6) / 10**(s-6)
+    carry, tail = np.divmod(magnitude * low, _LIMB)
+    quotient, remainder = np.divmod(magnitude * high + carry, 10 ** (divisor_exponent - 6))
+    remainder = remainder * _LIMB + tail
+    half = 10 ** divisor_exponent - remainder
+    quotient += (remainder > half) | ((remainder == half) & ((quotient & 1) == 1))
+    result = sign * quotient
+
+    for index in zip(*np.nonzero(~safe)):
+        exact = convert_minor(int(amounts[index]), ScaledRate(int(units[index]), int(shifts[index])), 0, 0)
+        if abs(exact) > _INT64_MAX:
+            raise OverflowError("Converted amount exceeds the 64-bit fixed-point range")
+        result[index] = exact
+    return result
+
+
+class RateTable:
+    """Scaled rates of one snapshot, computed on first use per code"""
+
+    __slots__ = ("rates", "_scaled")
+
+    def __init__(self, rates: Dict[str, float]):
+        self.rates = rates
+        self._scaled: Dict[str, ScaledRate] = {}
+
+    def __getitem__(self, code: str) -> ScaledRate:
+        scaled = self._scaled.get(code)
+        if scaled is None:
+            scaled = self._scaled[code] = scale_rate(self.rates[code])
+        return scaled
+
+
+_tables: "OrderedDict[int, RateTable]" = OrderedDict()
+_MAX_TABLES = 64
+
+
+def rate_table(rates: Dict[str, float]) -> RateTable:
+    """Shared RateTable per snapshot dict (by identity; the table keeps the dict alive)"""
+    table = _tables.get(id(rates))
+    if table is None or table.rates is not rates:
+        table = _tables[id(rates)] = RateTable(rates)
+        while len(_tables) > _MAX_TABLES:
+            _tables.popitem(last=False)
+    else:
+        _tables.move_to_end(id(rates))
+    return table
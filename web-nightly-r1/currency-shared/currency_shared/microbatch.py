@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Request Micro-Batching
+
+Coalesces work submitted in the same event-loop ticks into one synchronous
+resolve() call, for example single conversions resolved against one snapshot
+read.
+
+The first submission opens a batch and schedules a check for the next loop
+iteration. The batch stays open only while submissions keep arriving
+between checks, and never longer than `window`. It flushes at the first
+check that saw no new arrivals, at the first check or submission after the
+window has passed, or as soon as it holds max_batch items. So a lone
+request waits one loop iteration, not the whole window. Under load,
+batching adds at most `window` plus the callback that was running when it
+expired. Timers are not used: asyncio rounds their timeouts up to whole
+milliseconds, which would turn a sub-millisecond window into one of 1-2 ms.
+
+Each future then resolves with its own result. If resolve() raises, or
+returns a different number of results than it was given items, every future
+in the batch gets the exception. resolve() runs on the event loop,
+so it must not block.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class MicroBatcher:
+    """Gathers submissions for up to `window` seconds and resolves them in one call"""
+
+    def __init__(self, resolve: Callable[[List[Any]], List[Any]], window: float = 0.0005, max_batch: int = 256):
+        self.resolve = resolve
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._opened = 0.0
+        self._arrivals = 0  # Since the last check
+        self._check_handle: Optional[asyncio.Handle] = None
+        self.batches = 0
+        self.items = 0
+        self.largest = 0
+        self.flushes = {"idle": 0, "window": 0, "full": 0}
+        self.wait_seconds = 0.0
+        self.max_wait = 0.0
+
+    def submit(self, item: Any) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        now = loop.time()
+        if not self._pending:
+            self._opened = now
+            self._arrivals = 0
+            self._check_handle = loop.call_soon(self._check)
+        self._pending.append((item, future))
+        self._arrivals += 1
+        if len(self._pending) >= self.max_batch:
+            self._flush("full")
+        elif now - self._opened >= self.window:
+            # One long loop iteration must not hold the batch past its window
+            self._flush("window")
+        return future
+
+    def _check(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop.time() - self._opened >= self.window:
+            self._flush("window")
+        elif self._arrivals == 0:
+            self._flush("idle")
+        else:
+            self._arrivals = 0
+            self._check_handle = loop.call_soon(self._check)
+
+    def _flush(self, reason: str) -> None:
+        pending, self._pending = self._pending, []
+        if self._check_handle is not None:
+            self._check_handle.cancel()
+            self._check_handle = None
+        waited = asyncio.get_running_loop().time() - self._opened
+        self.batches += 1
+        self.items += len(pending)
+        self.largest = max(self.largest, len(pending))
+        self.flushes[reason] += 1
+        self.wait_seconds += waited
+        self.max_wait = max(self.max_wait, waited)
+
+        try:
+            results = self.resolve([item for item, _ in pending])
+            if len(results) != len(pending):
+                # zip() would leave the unmatched futures pending forever
+                raise RuntimeError(f"resolve() returned {len(results)} results for {len(pending)} items")
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(pending, results):
+            # Done already when the caller went away (client disconnect)
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        return {
+            "window_us": round(self.window * 1e6),
+            "max_batch": self.max_batch,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest,
+            "flushes": dict(self.flushes),
+            "avg_wait_us": round(self.wait_seconds / self.batches * 1e6, 1) if self.batches else 0.0,
+            "max_wait_us": round(self.max_wait * 1e6, 1),
+        }
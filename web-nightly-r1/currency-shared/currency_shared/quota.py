@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Upstream Quota Budget
+
+Counts exchangerate-api calls against a monthly billing cycle and an
+optional daily cap, and plans per-base cache TTLs that spend the remaining
+budget where it buys the most freshness.
+
+Planning minimises popularity-weighted staleness sum(w_i * ttl_i) subject to
+sum(1 / ttl_i) <= sustainable call rate, which gives ttl_i proportional to
+1 / sqrt(w_i). As the budget burns down the sustainable rate drops and every
+TTL stretches, down to serving the last snapshot once the quota is spent.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import calendar
+import logging
+import math
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DAY_SECONDS = 86400
+
+
+class QuotaBudget:
+    """Upstream call counter for the billing cycle and UTC day; 0 disables a limit"""
+
+    def __init__(self, monthly_limit: int = 0, daily_limit: int = 0, reset_day: int = 1, reserve_ratio: float = 0.05):
+        self.monthly_limit = max(0, monthly_limit)
+        self.daily_limit = max(0, daily_limit)
+        self.reset_day = min(max(1, reset_day), 31)
+        self.reserve_ratio = reserve_ratio
+        self.month_used = 0
+        self.day_used = 0
+        self.denied = 0
+        self.errors = 0
+        self._cycle: Tuple[float, float] = (0.0, 0.0)
+        self._day_start = 0.0
+        self._recent: deque = deque(maxlen=10000)
+        # Optional shared counter (redis.asyncio client) for multi-replica deployments
+        self.client = None
+        self.prefix = ""
+
+    def attach(self, client, prefix: str = "") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def _anchor(self, year: int, month: int) -> datetime:
+        day = min(self.reset_day, calendar.monthrange(year, month)[1])
+        return datetime(year, month, day, tzinfo=timezone.utc)
+
+    def cycle_bounds(self, now: float) -> Tuple[float, float]:
+        """(start, end) of the billing cycle containing `now`"""
+        current = datetime.fromtimestamp(now, timezone.utc)
+        start = self._anchor(current.year, current.month)
+        if current < start:
+            year, month = (current.year, current.month - 1) if current.month > 1 else (current.year - 1, 12)
+            start = self._anchor(year, month)
+        year, month = (start.year, start.month + 1) if start.month < 12 else (start.year + 1, 1)
+        return start.timestamp(), self._anchor(year, month).timestamp()
+
+    def _rollover(self, now: float) -> None:
+        if not self._cycle[0] <= now < self._cycle[1]:
+            self._cycle = self.cycle_bounds(now)
+            self.month_used = 0
+        day_start = now - now % DAY_SECONDS
+        if day_start != self._day_start:
+            self._day_start = day_start
+            self.day_used = 0
+
+    def month_remaining(self) -> Optional[int]:
+        return max(0, self.monthly_limit - self.month_used) if self.monthly_limit else None
+
+    def day_remaining(self) -> Optional[int]:
+        return max(0, self.daily_limit - self.day_used) if self.daily_limit else None
+
+    def exhausted(self, now: Optional[float] = None) -> bool:
+        self._rollover(now or time.time())
+        return self.month_remaining() == 0 or self.day_remaining() == 0
+
+    def retry_after(self, now: Optional[float] = None) -> int:
+        """Seconds until the binding limit resets"""
+        now = now or time.time()
+        self._rollover(now)
+        if self.month_remaining() == 0:
+            return max(1, int(self._cycle[1] - now))
+        return max(1, int(self._day_start + DAY_SECONDS - now))
+
+    async def acquire(self, now: Optional[float] = None) -> bool:
+        """Count one upstream call, or refuse it when the quota is spent"""
+        now = now or time.time()
+        if self.exhausted(now):
+            self.denied += 1
+            return False
+
+        if self.client is not None:
+            try:
+                month_key = f"{self.prefix}quota:month:{int(self._cycle[0])}"
+                day_key = f"{self.prefix}quota:day:{int(self._day_start)}"
+                pipe = self.client.pipeline()
+                pipe.incr(month_key)
+                pipe.expire(month_key, int(self._cycle[1] - now) + DAY_SECONDS)
+                pipe.incr(day_key)
+                pipe.expire(day_key, 2 * DAY_SECONDS)
+                month_used, _, day_used, _ = await pipe.execute()
+                self.month_used, self.day_used = int(month_used), int(day_used)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Shared quota counter unavailable, counting locally: {e}")
+                self.month_used += 1
+                self.day_used += 1
+        else:
+            self.month_used += 1
+            self.day_used += 1
+
+        # Another replica may have taken the last call first
+        if (self.monthly_limit and self.month_used > self.monthly_limit) or \
+                (self.daily_limit and self.day_used > self.daily_limit):
+            self.denied += 1
+            return False
+
+        self._recent.append(now)
+        return True
+
+    def recent_rate(self, now: float, window: float = 3600.0) -> float:
+        """Calls per second made by this process over the trailing window"""
+        recent = self._recent
+        while recent and recent[0] < now - window:
+            recent.popleft()
+        return len(recent) / window
+
+    def sustainable_rate(self, now: Optional[float] = None) -> Optional[float]:
+        """Calls per second that spend the plannable budget evenly; None when unlimited"""
+        now = now or time.time()
+        self._rollover(now)
+        rates = []
+        if self.monthly_limit:
+            plannable = self.month_remaining() - self.monthly_limit * self.reserve_ratio
+            rates.append(max(0.0, plannable) / max(self._cycle[1] - now, 1.0))
+        if self.daily_limit:
+            plannable = self.day_remaining() - self.daily_limit * self.reserve_ratio
+            rates.append(max(0.0, plannable) / max(self._day_start + DAY_SECONDS - now, 1.0))
+        return min(rates) if rates else None
+
+    def stats(self, now: Optional[float] = None) -> Dict:
+        now = now or time.time()
+        self._rollover(now)
+        rate = self.recent_rate(now)
+        remaining = self.month_remaining()
+        exhaustion_at = None
+        if remaining is not None and rate > 0:
+            exhaustion_at = now + remaining / rate
+        return {
+            "monthly_limit": self.monthly_limit or None,
+            "daily_limit": self.daily_limit or None,
+            "cycle_start": self._cycle[0],
+            "cycle_end": self._cycle[1],
+            "month_used": self.month_used,
+            "month_remaining": remaining,
+            "day_used": self.day_used,
+            "day_remaining": self.day_remaining(),
+            "calls_per_hour": round(rate * 3600, 2),
+            "sustainable_calls_per_hour": None if self.sustainable_rate(now) is None else round(self.sustainable_rate(now) * 3600, 2),
+            "projected_exhaustion_at": exhaustion_at,
+            "exhausts_before_cycle_end": exhaustion_at is not None and exhaustion_at < self._cycle[1],
+            "exhausted": self.exhausted(now),
+            "denied": self.denied,
+            "shared_counter": self.client is not None,
+            "errors": self.errors,
+        }
+
+
+class RefreshPlanner:
+    """Per-base TTLs that fit the sustainable call rate, hottest bases freshest"""
+
+    def __init__(self, budget: QuotaBudget, min_ttl: float = 300, max_ttl: float = 86400, hot_share: float = 0.8):
+        self.budget = budget
+        self.min_ttl = min_ttl
+        self.max_ttl = max(min_ttl, max_ttl)
+        # Fraction of the rate planned for the weighted bases; the rest covers the long tail
+        self.hot_share = hot_share
+        self.tail_ttl = min_ttl
+        self.planned_at = 0.0
+        self._ttls: Dict[str, float] = {}
+        self._refreshed: Dict[str, float] = {}
+
+    def _clamp(self, ttl: float) -> float:
+        return min(self.max_ttl, max(self.min_ttl, ttl))
+
+    def plan(self, weights: Dict[str, float], now: Optional[float] = None) -> Dict[str, float]:
+        now = now or time.time()
+        self.planned_at = now
+        weights = {base: weight for base, weight in weights.items() if weight > 0}
+        rate = self.budget.sustainable_rate(now)
+
+        if rate is None:
+            self._ttls = {base: self.min_ttl for base in weights}
+            self.tail_ttl = self.min_ttl
+        elif rate <= 0:
+            self._ttls = {base: self.max_ttl for base in weights}
+            self.tail_ttl = self.max_ttl
+        elif not weights:
+            # No traffic signal yet: budget for a single refreshing base
+            self._ttls = {}
+            self.tail_ttl = self._clamp(1.0 / rate)
+        else:
+            roots = {base: math.sqrt(weight) for base, weight in weights.items()}
+            total = sum(roots.values())
+            hot_rate = rate * self.hot_share
+            self._ttls = {base: self._clamp(total / (hot_rate * root)) for base, root in roots.items()}
+            # Unplanned bases refresh no more often than the coldest planned one
+            self.tail_ttl = max(self._ttls.values())
+        return dict(self._ttls)
+
+    def plan_age(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.planned_at
+
+    def ttl_for(self, base: str) -> float:
+        return self._ttls.get(base, self.tail_ttl)
+
+    def mark_refreshed(self, base: str, now: Optional[float] = None) -> None:
+        self._refreshed[base] = now or time.time()
+
+    def due(self, base: str, lead: float = 0.0, now: Optional[float] = None) -> bool:
+        """Whether the base would expire within `lead` seconds"""
+        refreshed = self._refreshed.get(base)
+        if refreshed is None:
+            return True
+        return (now or time.time()) + lead >= refreshed + self.ttl_for(base)
+
+    def stats(self) -> Dict:
+        return {
+            "min_ttl_seconds": self.min_ttl,
+            "max_ttl_seconds": self.max_ttl,
+            "tail_ttl_seconds": round(self.tail_ttl, 1),
+            "planned_at": self.planned_at,
+            "planned_ttls": {base: round(ttl, 1) for base, ttl in sorted(self._ttls.items(), key=lambda item: item[1])},
+        }
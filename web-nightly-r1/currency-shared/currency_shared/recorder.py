@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Traffic Recorder
+
+Opt-in, sampled recording of request shapes for capacity planning, replayed
+by benchmarks/replay.py.
+
+Sampling is per client, not per request: a client's pseudonym decides once
+whether all of its requests are kept. Token reuse, base affinity and page
+load sequences therefore survive sampling. Tokens (and any other
+secret_params in the query string) and client IPs are replaced by keyed
+HMAC-SHA256 pseudonyms. The same value maps to the same pseudonym within one
+key, but without the key a pseudonym cannot be reversed or matched against a
+guess. Only a small set of non-identifying headers is kept. Request bodies
+are kept up to max_body bytes, with the top-level JSON fields named in
+secret_body_fields (such as a webhook URL, which often embeds a bearer
+token) pseudonymized the same way. A body that may carry such a field but
+is not a JSON object is not kept at all.
+
+The log is JSON lines, optionally gzipped (a path ending in .gz), with short
+keys and defaults omitted:
+
+    {"t": 12.031, "p": "/api/convert", "q": "token=~4f1c...&amount=10&from=USD&to=EUR",
+     "c": "9a0e...", "r": "/api/convert", "s": 200, "d": 1.84}
+
+t is seconds since recording started, c the client pseudonym, r the route
+template, s the status and d the duration in ms. m (method, when not GET), h
+(kept headers), b (body) and bt (body over max_body, not kept) appear only
+when present, as does bx (body withheld because it could not be
+anonymized). Every run of the recorder starts with a header line giving the
+app name, sample rate and wall-clock start, so a log appended to across
+restarts holds one header per run.
+
+Writing happens on a background thread fed by a queue, so the request path
+only formats one line.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import gzip
+import hashlib
+import hmac
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+LOG_VERSION = 1
+KEPT_HEADERS = (b"accept", b"accept-encoding", b"content-type", b"origin")
+EXCLUDED_PREFIXES = ("/livez", "/readyz", "/health", "/favicon.ico", "/api/admin", "/metrics")
+
+
+def route_template(scope) -> str:
+    """Matched route template, e.g. /api/rates/{base}, falling back to the raw path"""
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        # The raw fast path leaves its own template; unmatched requests have none
+        return scope.get("fast_path") or scope["path"]
+    # Routes of an included router may carry their template without the router prefix;
+    # every {param} matches one segment, so the prefix is what the template leaves over
+    segments = scope["path"].split("/")
+    depth = template.count("/")
+    return "/".join(segments[:len(segments) - depth]) + template if len(segments) > depth else template
+
+
+class TrafficRecorder:
+    """Anonymizes sampled requests and appends them to the log from a writer thread"""
+
+    def __init__(self, path: str, sample_rate: float = 0.01, key: Optional[str] = None,
+                 app_name: str = "kconvert", max_body: int = 16384, max_bytes: int = 256 * 1024 * 1024,
+                 secret_params: Tuple[str, ...] = ("token",), secret_body_fields: Tuple[str, ...] = (),
+                 excluded: Tuple[str, ...] = EXCLUDED_PREFIXES):
+        self.path = path
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        if not key:
+            logger.warning("TRAFFIC_RECORD_KEY is not set; pseudonyms are only consistent within this process")
+        self._key = key.encode() if key else os.urandom(32)
+        self.app_name = app_name
+        self.max_body = max_body
+        self.max_bytes = max_bytes
+        self.secret_params = frozenset(secret_params)
+        self.secret_body_fields = frozenset(secret_body_fields)
+        self.excluded = excluded
+        self.started = time.monotonic()
+        self.started_at = time.time()
+        self.stats_counters = {"recorded": 0, "unsampled": 0, "dropped": 0, "bytes_written": 0}
+        self._queue: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+
+    def pseudonym(self, value: str) -> str:
+        return hmac.new(self._key, value.encode(), hashlib.sha256).hexdigest()[:16]
+
+    def sampled(self, client: str) -> bool:
+        """Stable per-client decision: the pseudonym's leading 32 bits against the rate"""
+        return int(client[:8], 16) < self.sample_rate * 2 ** 32
+
+    def excluded_path(self, path: str) -> bool:
+        return path.startswith(self.excluded)
+
+    def anonymize_query(self, query_string: bytes) -> str:
+        if not query_string:
+            return ""
+        pairs = parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)
+        if not any(name in self.secret_params for name, _ in pairs):
+            return query_string.decode("latin-1")
+        return urlencode([
+            (name, "~" + self.pseudonym(value) if name in self.secret_params else value)
+            for name, value in pairs
+        ])
+
+    def anonymize_body(self, body: bytes) -> Optional[str]:
+        """Body with secret_body_fields pseudonymized, None when they cannot be found safely"""
+        text = body.decode("utf-8", "replace")
+        if not self.secret_body_fields:
+            return text
+        try:
+            document = json.loads(text)
+        except ValueError:
+            return None
+        if not isinstance(document, dict):
+            return None
+        if not self.secret_body_fields.intersection(document):
+            return text
+        for name in self.secret_body_fields.intersection(document):
+            if document[name] is not None:
+                document[name] = "~" + self.pseudonym(str(document[name]))
+        return json.dumps(document, separators=(",", ":"))
+
+    def start(self) -> None:
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="traffic-recorder", daemon=True)
+            self._writer.start()
+            logger.info(f"Recording {self.sample_rate:.2%} of clients to {self.path}")
+
+    def record(self, entry: Dict) -> None:
+        if self.stats_counters["bytes_written"] >= self.max_bytes:
+            self.stats_counters["dropped"] += 1
+            return
+        self.start()
+        self._queue.put(json.dumps(entry, separators=(",", ":")) + "\n")
+        self.stats_counters["recorded"] += 1
+
+    def _write_loop(self) -> None:
+        opener = gzip.open if self.path.endswith(".gz") else open
+        header = {
+            "log": "kconvert-traffic", "version": LOG_VERSION, "app": self.app_name,
+            "sample_rate": self.sample_rate, "started_at": self.started_at,
+        }
+        try:
+            with opener(self.path, "at", encoding="utf-8") as handle:
+                handle.write(json.dumps(header, separators=(",", ":")) + "\n")
+                while True:
+                    line = self._queue.get()
+                    if line is None:
+                        break
+                    handle.write(line)
+                    self.stats_counters["bytes_written"] += len(line)
+                    # Flush once a burst has drained rather than on every line
+                    if self._queue.empty():
+                        handle.flush()
+        except OSError as e:
+            logger.error(f"Traffic recording stopped: {e}")
+            self.max_bytes = 0
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join(timeout=5)
+            self._writer = None
+
+    def stats(self) -> Dict:
+        return {
+            "path": self.path,
+            "sample_rate": self.sample_rate,
+            "recording_seconds": round(time.monotonic() - self.started, 1),
+            **self.stats_counters,
+        }
+
+
+class TrafficRecorderMiddleware:
+    """ASGI middleware feeding sampled HTTP requests to a TrafficRecorder"""
+
+    def __init__(self, app, recorder: TrafficRecorder):
+        self.app = app
+        self.recorder = recorder
+
+    async def __call__(self, scope, receive, send):
+        recorder = self.recorder
+        if scope["type"] != "http" or recorder.excluded_path(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        forwarded = headers.get(b"x-forwarded-for")
+        if forwarded:
+            address = forwarded.split(b",")[0].strip().decode("latin-1")
+        else:
+            address = scope["client"][0] if scope.get("client") else "unknown"
+        client = recorder.pseudonym(address)
+        if not recorder.sampled(client):
+            recorder.stats_counters["unsampled"] += 1
+            await self.app(scope, receive, send)
+            return
+
+        start = time.monotonic()
+        body = bytearray()
+        status = [500]
+
+        async def recording_receive():
+            message = await receive()
+            if message["type"] == "http.request" and len(body) <= recorder.max_body:
+                body.extend(message.get("body", b""))
+            return message
+
+        async def recording_send(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, recording_receive, recording_send)
+        finally:
+            entry = {
+                "t": round(start - recorder.started, 4),
+                "p": scope["path"],
+                "q": recorder.anonymize_query(scope["query_string"]),
+                "c": client,
+            }
+            if scope["method"] != "GET":
+                entry["m"] = scope["method"]
+            kept = {name.decode(): headers[name].decode("latin-1") for name in KEPT_HEADERS if name in headers}
+            if kept:
+                entry["h"] = kept
+            if body:
+                # An oversized body cannot be replayed faithfully; only mark it
+                if len(body) > recorder.max_body:
+                    entry["bt"] = True
+                else:
+                    kept_body = recorder.anonymize_body(bytes(body))
+                    if kept_body is None:
+                        entry["bx"] = True
+                    else:
+                        entry["b"] = kept_body
+            entry["r"] = route_template(scope)
+            entry["s"] = status[0]
+            entry["d"] = round((time.monotonic() - start) * 1000, 3)
+            recorder.record(entry)
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Kconvert - Tiered L1/L2 Cache
+
+In-process L1 (size-bounded LRU, short TTL) in front of an optional Redis L2.
+Writes that go through the tiered path are published on a Redis channel so
+other processes drop their L1 copy and re-read the new snapshot from L2.
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCache:
+    """Size-bounded LRU with per-entry expiry; all operations are O(1)"""
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 300):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        # key -> (value, stored_at, expires_at)
+        self._entries: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, _, expires_at = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Unexpired value without touching LRU order or hit/miss counters"""
+        entry = self._entries.get(key)
+        if entry is None or time.time() >= entry[2]:
+            return None
+        return entry[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._entries[key] = (value, now, now + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        return self._entries.pop(key, None) is not None
+
+    def clear(self) -> int:
+        count = len(self._entries)
+        self._entries.clear()
+        return count
+
+    def entries(self) -> Iterator[Tuple[str, float, float]]:
+        """(key, stored_at, expires_at) from least to most recently used"""
+        for key, (_, stored_at, expires_at) in self._entries.items():
+            yield key, stored_at, expires_at
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+
+class RedisCache:
+    """JSON values in Redis under a key prefix; failures degrade to misses"""
+
+    def __init__(self, client, prefix: str = ""):
+        self.client = client
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        # Wall-clock time of the last successful and failed call, for health probes
+        self.last_ok: Optional[float] = None
+        self.last_error: Optional[float] = None
+
+    @property
+    def connected(self) -> bool:
+        """Whether the most recent call to Redis succeeded"""
+        return self.last_error is None or (self.last_ok or 0) > self.last_error
+
+    def _failed(self) -> None:
+        self.errors += 1
+        self.last_error = time.time()
+
+    async def ping(self, timeout: float = 1.0) -> bool:
+        try:
+            await asyncio.wait_for(self.client.ping(), timeout)
+        except Exception as e:
+            self.last_error = time.time()
+            logger.warning(f"L2 ping failed: {e!r}")
+            return False
+        self.last_ok = time.time()
+        return True
+
+    async def get(self, key: str) -> Optional[Any]:
+        value, _ = await self.get_with_ttl(key)
+        return value
+
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        """Value and its remaining lifetime in seconds (None when the key never expires)"""
+        try:
+            pipe = self.client.pipeline()
+            pipe.get(self.prefix + key)
+            pipe.pttl(self.prefix + key)
+            raw, pttl = await pipe.execute()
+        except Exception as e:
+            self._failed()
+            logger.warning(f"L2 get failed for {key}: {e}")
+            return None, None
+        self.last_ok = time.time()
+        if raw is None:
+            self.misses += 1
+            return None, None
+        try:
+            value = json.loads(raw)
+        except (TypeError, ValueError):
+            self.misses += 1
+            return None, None
+        self.hits += 1
+        # PTTL is -1 for a key without expiry and -2 if it expired between the two commands
+        if pttl == -1:
+            return value, None
+        return value, max(pttl, 0) / 1000
+
+    async def set(self, key: str, value: Any, ttl: float) -> bool:
+        try:
+            await self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+        except Exception as e:
+            self._failed()
+            logger.warning(f"L2 set failed for {key}: {e}")
+            return False
+        self.last_ok = time.time()
+        return True
+
+    async def delete(self, key: str) -> bool:
+        try:
+            await self.client.delete(self.prefix + key)
+        except Exception:
+            self._failed()
+            return False
+        self.last_ok = time.time()
+        return True
+
+    async def clear(self) -> int:
+        """Delete every key under the prefix (SCAN-based, admin use only)"""
+        count = 0
+        try:
+            async for key in self.client.scan_iter(match=f"{self.prefix}*"):
+                await self.client.delete(key)
+                count += 1
+        except Exception:
+            self._failed()
+        return count
+
+
+class TieredCache:
+    """L1 in front of an optional L2 with pub/sub L1 invalidation"""
+
+    def __init__(self, l1: LocalCache, l2: Optional[RedisCache] = None,
+                 default_ttl: float = 300, channel: str = "cache:invalidate"):
+        self.l1 = l1
+        self.l2 = l2
+        self.default_ttl = default_ttl
+        self.channel = channel
+        self.node_id = uuid.uuid4().hex
+        self.invalidations_received = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    def get_local(self, key: str) -> Optional[Any]:
+        """L1-only lookup, safe to call from synchronous code"""
+        return self.l1.get(key)
+
+    def set_local(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """L1-only write for cheap derived entries that need not be shared"""
+        self.l1.set(key, value, ttl)
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.l1.get(key)
+        if value is not None or self.l2 is None:
+            return value
+        value, remaining = await self.l2.get_with_ttl(key)
+        if value is not None:
+            # Never keep the L1 copy longer than the L2 entry it came from
+            ttl = self.default_ttl if remaining is None else min(remaining, self.default_ttl)
+            if ttl > 0:
+                self.l1.set(key, value, ttl)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        self.l1.set(key, value, ttl)
+        if self.l2 is not None and await self.l2.set(key, value, ttl):
+            await self._publish(key)
+
+    async def delete(self, key: str) -> None:
+        self.l1.delete(key)
+        if self.l2 is not None:
+            await self.l2.delete(key)
+            await self._publish(key)
+
+    async def clear(self) -> int:
+        count = self.l1.clear()
+        if self.l2 is not None:
+            count += await self.l2.clear()
+            await self._publish("*")
+        return count
+
+    async def _publish(self, key: str) -> None:
+        try:
+            await self.l2.client.publish(self.channel, json.dumps({"node": self.node_id, "key": key}))
+        except Exception as e:
+            logger.warning(f"Cache invalidation publish failed: {e}")
+
+    def _apply_invalidation(self, raw) -> None:
+        try:
+            message = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if message.get("node") == self.node_id:
+            return
+        self.invalidations_received += 1
+        key = message.get("key")
+        if key == "*":
+            self.l1.clear()
+        elif key:
+            self.l1.delete(key)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.l2.client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._apply_invalidation(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Entries may be stale while disconnected; drop L1 to be safe
+                logger.warning(f"Cache invalidation listener error: {e}")
+                self.l1.clear()
+                await asyncio.sleep(1.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def start(self) -> None:
+        """Begin consuming invalidations (no-op without L2)"""
+        if self.l2 is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def stats(self) -> dict:
+        l1_lookups = self.l1.hits + self.l1.misses
+        result = {
+            "l1": {
+                "entries": len(self.l1),
+                "max_entries": self.l1.max_entries,
+                "ttl_seconds": self.l1.ttl,
+                "hits": self.l1.hits,
+                "misses": self.l1.misses,
+                "hit_ratio": round(self.l1.hits / max(l1_lookups, 1), 3),
+                "evictions": self.l1.evictions,
+                "expirations": self.l1.expirations,
+            },
+            "l2": None,
+            "invalidations_received": self.invalidations_received,
+        }
+        if self.l2 is not None:
+            result["l2"] = {
+                "hits": self.l2.hits, "misses": self.l2.misses, "errors": self.l2.errors,
+                "connected": self.l2.connected,
+            }
+        return result
@@ -0,0 +1,94 @@
+"""
+Kconvert - Fixed-Point Arithmetic Tests
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import random
+from decimal import ROUND_HALF_EVEN, Decimal
+
+import numpy as np
+import pytest
+
+from currency_shared.fixed_point import (
+    ScaledRate, convert_minor, convert_minor_array, format_minor, minor_units, rate_table, scale_rate, to_minor,
+)
+
+
+def reference(amount_minor: int, rate: ScaledRate, from_minor: int, to_minor_units: int) -> int:
+    value = Decimal(amount_minor) * Decimal(rate.units) / Decimal(10) ** (rate.exponent + from_minor - to_minor_units)
+    return int(value.to_integral_value(ROUND_HALF_EVEN))
+
+
+@pytest.mark.parametrize("rate, scaled", [
+    (0.85, ScaledRate(850000000000, 12)),
+    (149.5, ScaledRate(149500000000, 9)),
+    ("0.000012345", ScaledRate(12345000000, 15)),
+    (1, ScaledRate(100000000000, 11)),
+])
+def test_scale_rate(rate, scaled):
+    assert scale_rate(rate) == scaled
+
+
+@pytest.mark.parametrize("rate", [0, -1.5, float("nan"), float("inf")])
+def test_scale_rate_rejects(rate):
+    with pytest.raises(ValueError):
+        scale_rate(rate)
+
+
+def test_minor_units_and_formatting():
+    assert (minor_units("JPY"), minor_units("USD"), minor_units("KWD")) == (0, 2, 3)
+    assert minor_units("XYZ") == 2
+    assert to_minor("10.005", 2) == 1000
+    assert to_minor(10.015, 2) == 1002
+    assert format_minor(123456, 3) == "123.456"
+    assert format_minor(-5, 2) == "-0.05"
+    assert format_minor(42, 0) == "42"
+
+
+@pytest.mark.parametrize("amount, expected", [(25, 2), (35, 4), (-25, -2), (-35, -4), (26, 3)])
+def test_convert_minor_rounds_half_to_even(amount, expected):
+    # rate 1 with one digit shifted off: 2.5 -> 2, 3.5 -> 4
+    assert convert_minor(amount, ScaledRate(1, 1), 0, 0) == expected
+
+
+def test_convert_minor_scales_up_without_division():
+    assert convert_minor(150, ScaledRate(1495, 1), 2, 0) == 224  # 1.50 USD * 149.5 = 224.25 JPY
+    assert convert_minor(3, ScaledRate(2, 0), 0, 3) == 6000
+
+
+@pytest.mark.parametrize("amount", [25, 35, 45, -25, -35, 15 * 10 ** 6 + 5])
+def test_array_rounds_ties_to_even(amount):
+    result = convert_minor_array([amount], [1], [1])
+    assert result.tolist() == [convert_minor(amount, ScaledRate(1, 1), 0, 0)]
+
+
+def test_array_matches_exact_integers():
+    rng = random.Random(7)
+    amounts, units, shifts = [], [], []
+    for _ in range(2000):
+        rate = scale_rate(rng.choice([rng.uniform(1e-4, 1), rng.uniform(1, 40000)]))
+        from_minor, to_minor_units = rng.choice([0, 2, 3]), rng.choice([0, 2, 3])
+        amounts.append(rng.choice([rng.randrange(-10 ** 10, 10 ** 10), rng.randrange(0, 1000)]))
+        units.append(rate.units)
+        shifts.append(rate.exponent + from_minor - to_minor_units)
+    result = convert_minor_array(amounts, units, shifts)
+    expected = [reference(a, ScaledRate(u, s), 0, 0) for a, u, s in zip(amounts, units, shifts)]
+    assert result.dtype == np.int64
+    assert result.tolist() == expected
+
+
+def test_array_falls_back_to_exact_integers_near_overflow():
+    amount, units = 2 ** 40, 999999999999
+    assert convert_minor_array([amount], [units], [15]).tolist() == [reference(amount, ScaledRate(units, 15), 0, 0)]
+    with pytest.raises(OverflowError):
+        convert_minor_array([2 ** 62], [units], [0])
+
+
+def test_rate_table_is_shared_per_snapshot():
+    rates = {"EUR": 0.9}
+    table = rate_table(rates)
+    assert rate_table(rates) is table
+    assert table["EUR"] == scale_rate(0.9)
+    assert rate_table(dict(rates)) is not table
@@ -0,0 +1,101 @@
+"""
+Kconvert - Micro-Batching Tests
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import asyncio
+
+import pytest
+
+from currency_shared.microbatch import MicroBatcher
+
+
+class Resolver:
+    """resolve() recording every batch it was called with"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+
+async def test_lone_submission_flushes_on_the_next_iteration():
+    resolver = Resolver()
+    batcher = MicroBatcher(resolver, window=10.0)
+    assert await batcher.submit(21) == 42
+    assert resolver.batches == [[21]]
+    assert batcher.flushes["idle"] == 1
+
+
+async def test_concurrent_submissions_share_one_batch():
+    resolver = Resolver()
+    batcher = MicroBatcher(resolver, window=10.0)
+    results = await asyncio.gather(*(batcher.submit(n) for n in range(5)))
+    assert results == [0, 2, 4, 6, 8]
+    assert resolver.batches == [[0, 1, 2, 3, 4]]
+    assert batcher.stats()["avg_batch_size"] == 5
+
+
+async def test_full_batch_flushes_immediately():
+    resolver = Resolver()
+    batcher = MicroBatcher(resolver, window=10.0, max_batch=2)
+    futures = [batcher.submit(n) for n in range(3)]
+    assert futures[0].done() and futures[1].done() and not futures[2].done()
+    assert await asyncio.gather(*futures) == [0, 2, 4]
+    assert resolver.batches == [[0, 1], [2]]
+    assert batcher.flushes == {"idle": 1, "window": 0, "full": 1}
+
+
+async def test_submission_after_the_window_flushes():
+    resolver = Resolver()
+    batcher = MicroBatcher(resolver, window=0.0)
+    future = batcher.submit(1)
+    assert future.done()
+    assert batcher.flushes["window"] == 1
+
+
+async def test_batch_stays_open_while_arrivals_continue():
+    resolver = Resolver()
+    batcher = MicroBatcher(resolver, window=10.0)
+
+    async def late(n):
+        return await batcher.submit(n)
+
+    first = batcher.submit(0)
+    # The task submits after the first check has already run
+    second = asyncio.ensure_future(late(1))
+    assert await asyncio.gather(first, second) == [0, 2]
+    assert resolver.batches == [[0, 1]]
+
+
+async def test_resolve_error_reaches_every_future():
+    def fail(items):
+        raise RuntimeError("snapshot unavailable")
+
+    batcher = MicroBatcher(fail, window=10.0)
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+    assert [str(result) for result in results] == ["snapshot unavailable"] * 2
+
+
+@pytest.mark.parametrize("results", [[], [2], [2, 4, 6]])
+async def test_wrong_result_count_fails_every_future(results):
+    batcher = MicroBatcher(lambda items: results, window=10.0)
+    outcomes = await asyncio.wait_for(
+        asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True), timeout=1.0
+    )
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert "2 items" in str(outcomes[0])
+
+
+async def test_cancelled_caller_does_not_break_the_batch():
+    resolver = Resolver()
+    batcher = MicroBatcher(resolver, window=10.0)
+    gone, kept = batcher.submit(1), batcher.submit(2)
+    gone.cancel()
+    assert await kept == 4
+    with pytest.raises(asyncio.CancelledError):
+        await gone
@@ -0,0 +1,112 @@
+"""
+Kconvert - Upstream Quota Tests
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+
+from currency_shared.quota import DAY_SECONDS, QuotaBudget, RefreshPlanner
+
+NOW = datetime(2025, 3, 10, 12, tzinfo=timezone.utc).timestamp()
+
+
+def utc(*args) -> float:
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+@pytest.mark.parametrize("reset_day, now, bounds", [
+    (1, utc(2025, 3, 10), (utc(2025, 3, 1), utc(2025, 4, 1))),
+    (15, utc(2025, 3, 10), (utc(2025, 2, 15), utc(2025, 3, 15))),
+    (31, utc(2025, 3, 10), (utc(2025, 2, 28), utc(2025, 3, 31))),
+    (5, utc(2025, 1, 2), (utc(2024, 12, 5), utc(2025, 1, 5))),
+])
+def test_cycle_bounds(reset_day, now, bounds):
+    assert QuotaBudget(reset_day=reset_day).cycle_bounds(now) == bounds
+
+
+async def test_daily_limit_refuses_until_next_day():
+    budget = QuotaBudget(monthly_limit=100, daily_limit=2)
+    assert await budget.acquire(NOW)
+    assert await budget.acquire(NOW)
+    assert budget.exhausted(NOW)
+    assert not await budget.acquire(NOW)
+    assert budget.denied == 1
+    assert budget.retry_after(NOW) == 12 * 3600
+
+    tomorrow = NOW + DAY_SECONDS
+    assert not budget.exhausted(tomorrow)
+    assert await budget.acquire(tomorrow)
+    assert budget.month_used == 3
+
+
+async def test_monthly_limit_resets_with_the_cycle():
+    budget = QuotaBudget(monthly_limit=1)
+    assert await budget.acquire(NOW)
+    assert not await budget.acquire(NOW)
+    assert budget.retry_after(NOW) == int(utc(2025, 4, 1) - NOW)
+    assert await budget.acquire(utc(2025, 4, 1))
+
+
+async def test_unlimited_budget_never_exhausts():
+    budget = QuotaBudget()
+    for _ in range(5):
+        assert await budget.acquire(NOW)
+    assert not budget.exhausted(NOW)
+    assert budget.sustainable_rate(NOW) is None
+
+
+async def test_shared_counter_spans_replicas():
+    redis = FakeAsyncRedis()
+    first, second = QuotaBudget(monthly_limit=3), QuotaBudget(monthly_limit=3)
+    first.attach(redis, prefix="test:")
+    second.attach(redis, prefix="test:")
+    assert await first.acquire(NOW)
+    assert await second.acquire(NOW)
+    assert await first.acquire(NOW)
+    assert second.month_used == 2
+    # The other replica's calls only show up in the counter it increments
+    assert not await second.acquire(NOW)
+    assert second.denied == 1
+
+
+async def test_shared_counter_failure_counts_locally():
+    server = FakeServer()
+    server.connected = False
+    budget = QuotaBudget(monthly_limit=3)
+    budget.attach(FakeAsyncRedis(server=server))
+    assert await budget.acquire(NOW)
+    assert budget.errors == 1
+    assert budget.month_used == 1
+
+
+def test_planner_ttls_scale_with_inverse_sqrt_of_weight():
+    budget = QuotaBudget(monthly_limit=100000)
+    planner = RefreshPlanner(budget, min_ttl=1, max_ttl=10 ** 9)
+    ttls = planner.plan({"USD": 16.0, "EUR": 4.0, "GBP": 1.0}, NOW)
+    assert ttls["EUR"] / ttls["USD"] == pytest.approx(2.0)
+    assert ttls["GBP"] / ttls["USD"] == pytest.approx(4.0)
+    # The planned bases spend exactly their share of the sustainable rate
+    spent = sum(1 / ttl for ttl in ttls.values())
+    assert spent == pytest.approx(budget.sustainable_rate(NOW) * planner.hot_share)
+    assert planner.ttl_for("JPY") == ttls["GBP"]
+
+
+async def test_planner_stretches_to_max_ttl_once_quota_is_spent():
+    budget = QuotaBudget(monthly_limit=1)
+    await budget.acquire(NOW)
+    planner = RefreshPlanner(budget, min_ttl=300, max_ttl=86400)
+    assert planner.plan({"USD": 1.0}, NOW) == {"USD": 86400}
+    assert planner.ttl_for("EUR") == 86400
+
+
+def test_planner_due():
+    planner = RefreshPlanner(QuotaBudget(), min_ttl=300)
+    assert planner.due("USD", now=NOW)
+    planner.mark_refreshed("USD", now=NOW)
+    assert not planner.due("USD", now=NOW + 200)
+    assert planner.due("USD", lead=100, now=NOW + 200)
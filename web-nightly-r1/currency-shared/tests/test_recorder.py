@@ -0,0 +1,36 @@
+"""
+Kconvert - Traffic Recorder Tests
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import json
+
+from currency_shared.recorder import TrafficRecorder
+
+
+def recorder(**kwargs):
+    return TrafficRecorder("/dev/null", key="test-key", **kwargs)
+
+
+def test_secret_query_params_are_pseudonymized():
+    rec = recorder()
+    query = rec.anonymize_query(b"token=abc&amount=10")
+    assert query == f"token=~{rec.pseudonym('abc')}&amount=10"
+    assert rec.anonymize_query(b"amount=10") == "amount=10"
+
+
+def test_secret_body_fields_are_pseudonymized():
+    rec = recorder(secret_body_fields=("webhook_url",))
+    url = "https://hooks.slack.com/services/T000/B000/secret"
+    body = json.loads(rec.anonymize_body(json.dumps({"client_id": "a", "webhook_url": url}).encode()))
+    assert body == {"client_id": "a", "webhook_url": "~" + rec.pseudonym(url)}
+    assert rec.anonymize_body(b'{"client_id": "a"}') == '{"client_id": "a"}'
+
+
+def test_bodies_that_cannot_be_checked_are_withheld():
+    rec = recorder(secret_body_fields=("webhook_url",))
+    assert rec.anonymize_body(b"webhook_url=https://example.test/secret") is None
+    assert rec.anonymize_body(b'["https://example.test/secret"]') is None
+    assert recorder().anonymize_body(b"plain") == "plain"
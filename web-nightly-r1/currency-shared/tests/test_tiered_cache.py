@@ -0,0 +1,96 @@
+"""
+Kconvert - Tiered Cache Tests
+
+Copyright (c) 2025 Team 6
+All rights reserved.
+"""
+
+import time
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from currency_shared.tiered_cache import LocalCache, RedisCache, TieredCache
+
+
+@pytest.fixture
+def redis():
+    return FakeAsyncRedis()
+
+
+def tiered(redis, l1_ttl=300, default_ttl=300):
+    return TieredCache(LocalCache(max_entries=10, ttl=l1_ttl), RedisCache(redis, prefix="test:"), default_ttl=default_ttl)
+
+
+def l1_expiry(cache, key):
+    return next(expires_at for k, _, expires_at in cache.l1.entries() if k == key)
+
+
+def test_local_cache_evicts_least_recently_used():
+    cache = LocalCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_local_cache_caps_ttl_and_expires(monkeypatch):
+    cache = LocalCache(ttl=10)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache.set("a", 1, ttl=60)
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+
+
+async def test_l2_hit_refills_l1_with_remaining_ttl(redis):
+    writer, reader = tiered(redis), tiered(redis)
+    await writer.set("rates:USD", {"EUR": 0.9}, ttl=5)
+
+    before = time.time()
+    assert await reader.get("rates:USD") == {"EUR": 0.9}
+    # The copy must not outlive the L2 entry, although L1 and the default allow 300s
+    assert l1_expiry(reader, "rates:USD") <= before + 5 + 0.01
+    assert reader.l2.hits == 1
+
+    assert await reader.get("rates:USD") == {"EUR": 0.9}
+    assert reader.l2.hits == 1
+
+
+async def test_l2_entry_without_expiry_uses_default_ttl(redis):
+    cache = tiered(redis, default_ttl=30)
+    await redis.set("test:k", '"v"')
+
+    before = time.time()
+    assert await cache.get("k") == "v"
+    assert before + 29 <= l1_expiry(cache, "k") <= time.time() + 30
+
+
+async def test_l2_miss_and_error_degrade_to_none(redis):
+    cache = tiered(redis)
+    assert await cache.get("missing") is None
+    assert cache.l2.misses == 1
+
+    cache.l2.client = None  # Every Redis call now raises
+    assert await cache.get("missing") is None
+    assert cache.l2.errors == 1
+    assert not cache.l2.connected
+
+
+async def test_invalidation_from_another_node_drops_l1(redis):
+    a, b = tiered(redis), tiered(redis)
+    await a.set("k", 1)
+    assert await b.get("k") == 1
+
+    b._apply_invalidation(f'{{"node": "{a.node_id}", "key": "k"}}')
+    assert "k" not in b.l1
+    assert await b.get("k") == 1
+
+    # A node ignores its own messages
+    b._apply_invalidation(f'{{"node": "{b.node_id}", "key": "*"}}')
+    assert "k" in b.l1
+    assert b.invalidations_received == 1